@@ -0,0 +1,44 @@
+"""Dimensional metric rollups (repo, author, branch, list, card type, label)
+
+Revision ID: 002_metric_dimension_rollups
+Revises: 001_initial
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '002_metric_dimension_rollups'
+down_revision = '001_initial'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'metrics_dimension_daily',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('dimension', sa.String(), nullable=False),
+        sa.Column('dimension_value', sa.String(), nullable=False),
+        sa.Column('prs_opened', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('prs_merged', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('lead_time_sum_h', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('pr_size_sum', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('cards_created', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('cards_resolved', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('bugs_resolved', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('lead_time_sketch', sa.LargeBinary(), nullable=True),
+        sa.Column('pr_size_sketch', sa.LargeBinary(), nullable=True),
+        sa.Column('workspace_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('workspaces.id'), nullable=False),
+        sa.UniqueConstraint(
+            'workspace_id', 'dimension', 'dimension_value', 'day',
+            name='uq_metrics_dimension_daily_workspace_id',
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('metrics_dimension_daily')
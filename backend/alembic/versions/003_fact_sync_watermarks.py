@@ -0,0 +1,30 @@
+"""Add synced_at watermarks on pull_requests and trello_cards
+
+Revision ID: 003_fact_sync_watermarks
+Revises: 002_metric_dimension_rollups
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003_fact_sync_watermarks'
+down_revision = '002_metric_dimension_rollups'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    for table in ('pull_requests', 'trello_cards'):
+        op.add_column(
+            table,
+            sa.Column('synced_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        )
+        op.create_index(f'ix_{table}_workspace_synced_at', table, ['workspace_id', 'synced_at'])
+
+
+def downgrade() -> None:
+    for table in ('pull_requests', 'trello_cards'):
+        op.drop_index(f'ix_{table}_workspace_synced_at', table_name=table)
+        op.drop_column(table, 'synced_at')
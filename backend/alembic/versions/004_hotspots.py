@@ -0,0 +1,53 @@
+"""File-level change hotspots (path trie + co-change pairs)
+
+Revision ID: 004_hotspots
+Revises: 003_fact_sync_watermarks
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '004_hotspots'
+down_revision = '003_fact_sync_watermarks'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'hotspot_nodes',
+        sa.Column('id', sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column('path', sa.String(), nullable=False),
+        sa.Column('parent_id', sa.BigInteger(), sa.ForeignKey('hotspot_nodes.id'), nullable=True),
+        sa.Column('depth', sa.SmallInteger(), nullable=False),
+        sa.Column('is_dir', sa.Boolean(), nullable=False, server_default='false'),
+        sa.Column('changes', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('churn', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('score_30', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('score_90', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('last_changed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('repo_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('repos.id'), nullable=False),
+        sa.Column('workspace_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('workspaces.id'), nullable=False),
+        sa.UniqueConstraint('repo_id', 'path', name='uq_hotspot_nodes_repo_id'),
+    )
+    op.create_index('ix_hotspot_nodes_top_30', 'hotspot_nodes', ['workspace_id', 'repo_id', 'is_dir', 'score_30'])
+    op.create_index('ix_hotspot_nodes_top_90', 'hotspot_nodes', ['workspace_id', 'repo_id', 'is_dir', 'score_90'])
+
+    op.create_table(
+        'hotspot_cochanges',
+        sa.Column('node_a_id', sa.BigInteger(), sa.ForeignKey('hotspot_nodes.id'), primary_key=True),
+        sa.Column('node_b_id', sa.BigInteger(), sa.ForeignKey('hotspot_nodes.id'), primary_key=True),
+        sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('score_90', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('last_changed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('repo_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('repos.id'), nullable=False),
+    )
+    op.create_index('ix_hotspot_cochanges_node_b', 'hotspot_cochanges', ['node_b_id'])
+
+
+def downgrade() -> None:
+    op.drop_table('hotspot_cochanges')
+    op.drop_table('hotspot_nodes')
@@ -0,0 +1,35 @@
+"""Append-only Trello card list transitions
+
+Revision ID: 005_card_transitions
+Revises: 004_hotspots
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '005_card_transitions'
+down_revision = '004_hotspots'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'card_transitions',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('action_id', sa.String(), nullable=False, unique=True),
+        sa.Column('board_id', sa.String(), nullable=True),
+        sa.Column('card_external_id', sa.String(), nullable=False, index=True),
+        sa.Column('from_list', sa.String(), nullable=True),
+        sa.Column('to_list', sa.String(), nullable=False),
+        sa.Column('occurred_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('workspace_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('workspaces.id'), nullable=False),
+    )
+    op.create_index('ix_card_transitions_workspace_occurred_at', 'card_transitions', ['workspace_id', 'occurred_at'])
+
+
+def downgrade() -> None:
+    op.drop_table('card_transitions')
@@ -0,0 +1,60 @@
+"""Materialized weekly/monthly metric rollups and risk counts by type
+
+Revision ID: 006_dashboard_rollups
+Revises: 005_card_transitions
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '006_dashboard_rollups'
+down_revision = '005_card_transitions'
+branch_labels = None
+depends_on = None
+
+METRIC_AVERAGES = """
+    avg(lead_time_p50) AS lead_time_p50,
+    avg(lead_time_p85) AS lead_time_p85,
+    avg(wip) AS wip,
+    avg(throughput) AS throughput,
+    avg(review_time_p50) AS review_time_p50,
+    avg(bug_ratio) AS bug_ratio,
+    avg(pr_size_p50) AS pr_size_p50
+"""
+
+
+def upgrade() -> None:
+    for view, unit in (('metrics_weekly', 'week'), ('metrics_monthly', 'month')):
+        op.execute(f"""
+            CREATE MATERIALIZED VIEW {view} AS
+            SELECT
+                workspace_id,
+                date_trunc('{unit}', day)::date AS period_start,
+                max(day) AS last_day,
+                count(*) AS days,
+                {METRIC_AVERAGES}
+            FROM metrics_daily
+            GROUP BY workspace_id, date_trunc('{unit}', day)
+        """)
+        # Unique index: required by REFRESH ... CONCURRENTLY, and serves the dashboard lookups
+        op.execute(f"CREATE UNIQUE INDEX ux_{view}_workspace_period ON {view} (workspace_id, period_start)")
+
+    op.execute("""
+        CREATE MATERIALIZED VIEW risk_counts_by_type AS
+        SELECT
+            workspace_id,
+            type,
+            count(*) AS signals,
+            avg(score) AS avg_score,
+            max(score) AS max_score
+        FROM risk_signals
+        GROUP BY workspace_id, type
+    """)
+    op.execute("CREATE UNIQUE INDEX ux_risk_counts_by_type_workspace_type ON risk_counts_by_type (workspace_id, type)")
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS risk_counts_by_type")
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS metrics_monthly")
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS metrics_weekly")
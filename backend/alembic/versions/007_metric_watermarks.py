@@ -0,0 +1,66 @@
+"""Add updated_at watermark on metrics_daily and carry it into the metric rollups
+
+Revision ID: 007_metric_watermarks
+Revises: 006_dashboard_rollups
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007_metric_watermarks'
+down_revision = '006_dashboard_rollups'
+branch_labels = None
+depends_on = None
+
+METRIC_VIEWS = (('metrics_weekly', 'week'), ('metrics_monthly', 'month'))
+
+METRIC_AVERAGES = """
+    avg(lead_time_p50) AS lead_time_p50,
+    avg(lead_time_p85) AS lead_time_p85,
+    avg(wip) AS wip,
+    avg(throughput) AS throughput,
+    avg(review_time_p50) AS review_time_p50,
+    avg(bug_ratio) AS bug_ratio,
+    avg(pr_size_p50) AS pr_size_p50
+"""
+
+
+def _create_metric_views(with_watermark: bool) -> None:
+    watermark = ",\n                max(updated_at) AS updated_at" if with_watermark else ""
+    for view, unit in METRIC_VIEWS:
+        op.execute(f"""
+            CREATE MATERIALIZED VIEW {view} AS
+            SELECT
+                workspace_id,
+                date_trunc('{unit}', day)::date AS period_start,
+                max(day) AS last_day,
+                count(*) AS days,
+                {METRIC_AVERAGES}{watermark}
+            FROM metrics_daily
+            GROUP BY workspace_id, date_trunc('{unit}', day)
+        """)
+        op.execute(f"CREATE UNIQUE INDEX ux_{view}_workspace_period ON {view} (workspace_id, period_start)")
+
+
+def _drop_metric_views() -> None:
+    for view, _ in METRIC_VIEWS:
+        op.execute(f"DROP MATERIALIZED VIEW IF EXISTS {view}")
+
+
+def upgrade() -> None:
+    _drop_metric_views()
+    op.add_column(
+        'metrics_daily',
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index('ix_metrics_daily_workspace_updated_at', 'metrics_daily', ['workspace_id', 'updated_at'])
+    _create_metric_views(with_watermark=True)
+
+
+def downgrade() -> None:
+    _drop_metric_views()
+    op.drop_index('ix_metrics_daily_workspace_updated_at', table_name='metrics_daily')
+    op.drop_column('metrics_daily', 'updated_at')
+    _create_metric_views(with_watermark=False)
@@ -0,0 +1,33 @@
+"""Per-workspace declarative risk rules
+
+Revision ID: 008_risk_rules
+Revises: 007_metric_watermarks
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '008_risk_rules'
+down_revision = '007_metric_watermarks'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'risk_rules',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('spec', sa.JSON(), nullable=False),
+        sa.Column('enabled', sa.Boolean(), nullable=False, server_default=sa.true()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column('workspace_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('workspaces.id'), nullable=False),
+        sa.UniqueConstraint('workspace_id', 'name'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('risk_rules')
@@ -0,0 +1,67 @@
+"""Fingerprinted risk alerts, signal timestamps and archive tables
+
+Revision ID: 009_alert_fingerprints
+Revises: 008_risk_rules
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '009_alert_fingerprints'
+down_revision = '008_risk_rules'
+branch_labels = None
+depends_on = None
+
+
+def _timestamp(name: str, nullable: bool = False) -> sa.Column:
+    if nullable:
+        return sa.Column(name, sa.DateTime(timezone=True), nullable=True)
+    return sa.Column(name, sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now())
+
+
+def upgrade() -> None:
+    op.add_column('alerts', sa.Column('fingerprint', sa.String(), nullable=True))
+    op.add_column('alerts', sa.Column('risk_type', sa.String(), nullable=True))
+    op.add_column('alerts', sa.Column('score', sa.Float(), nullable=True))
+    op.add_column('alerts', sa.Column('occurrences', sa.Integer(), nullable=False, server_default='1'))
+    for column in ('created_at', 'first_seen_at', 'last_seen_at'):
+        op.add_column('alerts', _timestamp(column))
+    op.add_column('alerts', _timestamp('resolved_at', nullable=True))
+    # Pre-fingerprint risk alerts: typed so the next evaluation resolves the duplicates
+    op.execute("""
+        UPDATE alerts SET risk_type = substr(title, length('Risk Detected: ') + 1)
+        WHERE title LIKE 'Risk Detected: %'
+    """)
+    op.create_index('ix_alerts_fingerprint', 'alerts', ['fingerprint'])
+    op.create_index('ix_alerts_workspace_last_seen_at', 'alerts', ['workspace_id', 'last_seen_at'])
+    op.create_index('ix_alerts_workspace_status_last_seen_at', 'alerts', ['workspace_id', 'status', 'last_seen_at'])
+    op.create_index('ix_alerts_resolved_at', 'alerts', ['resolved_at'])
+
+    op.add_column('risk_signals', sa.Column('fingerprint', sa.String(), nullable=True))
+    op.add_column('risk_signals', _timestamp('created_at'))
+    op.create_index('ix_risk_signals_workspace_created_at', 'risk_signals', ['workspace_id', 'created_at'])
+    op.create_index('ix_risk_signals_created_at', 'risk_signals', ['created_at'])
+
+    # Row-level retention targets, since replaced by partition detach
+    # (app/db/partitions.py) and dropped by 018: same columns, no constraints
+    for table in ('risk_signals', 'alerts'):
+        op.execute(f"CREATE TABLE {table}_archive (LIKE {table} INCLUDING DEFAULTS)")
+
+
+def downgrade() -> None:
+    for table in ('risk_signals', 'alerts'):
+        op.execute(f"DROP TABLE IF EXISTS {table}_archive")
+
+    op.drop_index('ix_risk_signals_created_at', table_name='risk_signals')
+    op.drop_index('ix_risk_signals_workspace_created_at', table_name='risk_signals')
+    op.drop_column('risk_signals', 'created_at')
+    op.drop_column('risk_signals', 'fingerprint')
+
+    for index in ('ix_alerts_resolved_at', 'ix_alerts_workspace_status_last_seen_at',
+                  'ix_alerts_workspace_last_seen_at', 'ix_alerts_fingerprint'):
+        op.drop_index(index, table_name='alerts')
+    for column in ('resolved_at', 'last_seen_at', 'first_seen_at', 'created_at',
+                   'occurrences', 'score', 'risk_type', 'fingerprint'):
+        op.drop_column('alerts', column)
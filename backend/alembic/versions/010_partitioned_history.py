@@ -0,0 +1,150 @@
+"""Range-partition metrics_daily, risk_signals and alerts by month
+
+Revision ID: 010_partitioned_history
+Revises: 009_alert_fingerprints
+Create Date: 2026-10-19
+
+"""
+from datetime import date, datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010_partitioned_history'
+down_revision = '009_alert_fingerprints'
+branch_labels = None
+depends_on = None
+
+# table -> (partition column, indexes other than the primary key)
+TABLES = {
+    'metrics_daily': ('day', {
+        'ix_metrics_daily_day': ['day'],
+        'ix_metrics_daily_workspace_day': ['workspace_id', 'day'],
+        'ix_metrics_daily_workspace_updated_at': ['workspace_id', 'updated_at'],
+    }),
+    'risk_signals': ('created_at', {
+        'ix_risk_signals_workspace_created_at': ['workspace_id', 'created_at'],
+        'ix_risk_signals_created_at': ['created_at'],
+    }),
+    'alerts': ('created_at', {
+        'ix_alerts_fingerprint': ['fingerprint'],
+        'ix_alerts_workspace_last_seen_at': ['workspace_id', 'last_seen_at'],
+        'ix_alerts_workspace_status_last_seen_at': ['workspace_id', 'status', 'last_seen_at'],
+        'ix_alerts_resolved_at': ['resolved_at'],
+    }),
+}
+MONTHS_AHEAD = 3
+
+METRIC_VIEWS = (('metrics_weekly', 'week'), ('metrics_monthly', 'month'))
+
+METRIC_AVERAGES = """
+    avg(lead_time_p50) AS lead_time_p50,
+    avg(lead_time_p85) AS lead_time_p85,
+    avg(wip) AS wip,
+    avg(throughput) AS throughput,
+    avg(review_time_p50) AS review_time_p50,
+    avg(bug_ratio) AS bug_ratio,
+    avg(pr_size_p50) AS pr_size_p50
+"""
+
+
+def _drop_views() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS risk_counts_by_type")
+    for view, _ in METRIC_VIEWS:
+        op.execute(f"DROP MATERIALIZED VIEW IF EXISTS {view}")
+
+
+def _create_views() -> None:
+    # Same definitions as 006/007
+    for view, unit in METRIC_VIEWS:
+        op.execute(f"""
+            CREATE MATERIALIZED VIEW {view} AS
+            SELECT
+                workspace_id,
+                date_trunc('{unit}', day)::date AS period_start,
+                max(day) AS last_day,
+                count(*) AS days,
+                {METRIC_AVERAGES},
+                max(updated_at) AS updated_at
+            FROM metrics_daily
+            GROUP BY workspace_id, date_trunc('{unit}', day)
+        """)
+        op.execute(f"CREATE UNIQUE INDEX ux_{view}_workspace_period ON {view} (workspace_id, period_start)")
+    op.execute("""
+        CREATE MATERIALIZED VIEW risk_counts_by_type AS
+        SELECT
+            workspace_id,
+            type,
+            count(*) AS signals,
+            avg(score) AS avg_score,
+            max(score) AS max_score
+        FROM risk_signals
+        GROUP BY workspace_id, type
+    """)
+    op.execute("CREATE UNIQUE INDEX ux_risk_counts_by_type_workspace_type ON risk_counts_by_type (workspace_id, type)")
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _monthly_partitions(table: str, column: str) -> None:
+    """One partition per month, from the oldest row to MONTHS_AHEAD months from now."""
+    today = datetime.now(timezone.utc).date().replace(day=1)
+    oldest = op.get_bind().execute(sa.text(f"SELECT min({column}) FROM {table}")).scalar()
+    if isinstance(oldest, datetime):
+        oldest = oldest.astimezone(timezone.utc).date()
+    month = min(oldest or today, today).replace(day=1)
+    while month <= _add_months(today, MONTHS_AHEAD):
+        upper = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE {table}_p{month:%Y%m} PARTITION OF {table}_new "
+            f"FOR VALUES FROM ('{month} 00:00:00+00') TO ('{upper} 00:00:00+00')"
+        )
+        month = upper
+
+
+def _rebuild(table: str, partitioned: bool) -> None:
+    """Copy `table` into a (non-)partitioned twin, swap them and restore keys and indexes."""
+    column, indexes = TABLES[table]
+    if partitioned:
+        op.execute(f"CREATE TABLE {table}_new (LIKE {table} INCLUDING DEFAULTS) PARTITION BY RANGE ({column})")
+        _monthly_partitions(table, column)
+    else:
+        op.execute(f"CREATE TABLE {table}_new (LIKE {table} INCLUDING DEFAULTS)")
+    op.execute(f"INSERT INTO {table}_new SELECT * FROM {table}")
+    op.execute(f"DROP TABLE {table}")
+    op.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+
+    # The partition key has to be part of every unique constraint
+    key = ['id', column] if partitioned else ['id']
+    op.create_primary_key(f'pk_{table}', table, key)
+    op.create_foreign_key(f'fk_{table}_workspace_id_workspaces', table, 'workspaces', ['workspace_id'], ['id'])
+    for name, columns in indexes.items():
+        if partitioned or name != 'ix_metrics_daily_workspace_day':
+            op.create_index(name, table, columns)
+
+
+def upgrade() -> None:
+    _drop_views()
+    for table in TABLES:
+        _rebuild(table, partitioned=True)
+    _create_views()
+
+    # Expired partitions are detached into this schema (app/db/partitions.py);
+    # the row-level archives of 009 move there too.
+    op.execute("CREATE SCHEMA IF NOT EXISTS archive")
+    for table in ('risk_signals', 'alerts'):
+        op.execute(f"ALTER TABLE {table}_archive SET SCHEMA archive")
+
+
+def downgrade() -> None:
+    for table in ('risk_signals', 'alerts'):
+        op.execute(f"ALTER TABLE archive.{table}_archive SET SCHEMA public")
+
+    _drop_views()
+    for table in TABLES:
+        _rebuild(table, partitioned=False)
+    _create_views()
@@ -0,0 +1,37 @@
+"""Content-addressed provenance snapshots of reports
+
+Revision ID: 011_report_provenance
+Revises: 010_partitioned_history
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '011_report_provenance'
+down_revision = '010_partitioned_history'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'provenance_blobs',
+        sa.Column('hash', sa.String(64), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.Column('raw_size', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('hash', name=op.f('pk_provenance_blobs')),
+    )
+    op.add_column('reports', sa.Column('provenance_hash', sa.String(64), nullable=True))
+    op.create_foreign_key(
+        op.f('fk_reports_provenance_hash_provenance_blobs'),
+        'reports', 'provenance_blobs', ['provenance_hash'], ['hash'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint(op.f('fk_reports_provenance_hash_provenance_blobs'), 'reports', type_='foreignkey')
+    op.drop_column('reports', 'provenance_hash')
+    op.drop_table('provenance_blobs')
@@ -0,0 +1,51 @@
+"""Keyset pagination indexes for reports and alerts, timestamptz reports.created_at
+
+Revision ID: 012_keyset_pagination
+Revises: 011_report_provenance
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '012_keyset_pagination'
+down_revision = '011_report_provenance'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # ISO strings written by datetime.utcnow(): naive UTC
+    op.execute("""
+        ALTER TABLE reports ALTER COLUMN created_at TYPE timestamptz
+        USING (created_at::timestamp AT TIME ZONE 'UTC')
+    """)
+    op.alter_column('reports', 'created_at', server_default=sa.func.now(), nullable=False)
+    op.create_index('ix_reports_workspace_created_at_id', 'reports', ['workspace_id', 'created_at', 'id'])
+    op.create_index(
+        'ix_reports_workspace_status_created_at_id', 'reports', ['workspace_id', 'status', 'created_at', 'id']
+    )
+
+    # Alerts page by (last_seen_at, id): the id makes the keyset exact
+    op.drop_index('ix_alerts_workspace_last_seen_at', table_name='alerts')
+    op.drop_index('ix_alerts_workspace_status_last_seen_at', table_name='alerts')
+    op.create_index('ix_alerts_workspace_last_seen_at_id', 'alerts', ['workspace_id', 'last_seen_at', 'id'])
+    op.create_index(
+        'ix_alerts_workspace_status_last_seen_at_id', 'alerts', ['workspace_id', 'status', 'last_seen_at', 'id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_alerts_workspace_status_last_seen_at_id', table_name='alerts')
+    op.drop_index('ix_alerts_workspace_last_seen_at_id', table_name='alerts')
+    op.create_index('ix_alerts_workspace_status_last_seen_at', 'alerts', ['workspace_id', 'status', 'last_seen_at'])
+    op.create_index('ix_alerts_workspace_last_seen_at', 'alerts', ['workspace_id', 'last_seen_at'])
+
+    op.drop_index('ix_reports_workspace_status_created_at_id', table_name='reports')
+    op.drop_index('ix_reports_workspace_created_at_id', table_name='reports')
+    op.alter_column('reports', 'created_at', server_default=None, nullable=True)
+    op.execute("""
+        ALTER TABLE reports ALTER COLUMN created_at TYPE varchar
+        USING to_char(created_at AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS.US')
+    """)
@@ -0,0 +1,23 @@
+"""Report version for optimistic workflow transitions
+
+Revision ID: 013_report_workflow
+Revises: 012_keyset_pagination
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '013_report_workflow'
+down_revision = '012_keyset_pagination'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('reports', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade() -> None:
+    op.drop_column('reports', 'version')
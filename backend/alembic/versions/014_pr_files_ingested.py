@@ -0,0 +1,39 @@
+"""Track hotspot file ingestion in a pull_requests column, not in raw_data
+
+Revision ID: 014_pr_files_ingested
+Revises: 013_report_workflow
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '014_pr_files_ingested'
+down_revision = '013_report_workflow'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('pull_requests', sa.Column('files_ingested_at', sa.DateTime(timezone=True), nullable=True))
+    # Move the flag out of the upstream payload
+    op.execute("""
+        UPDATE pull_requests
+        SET files_ingested_at = synced_at,
+            raw_data = (raw_data::jsonb - 'files_ingested')::json
+        WHERE raw_data->>'files_ingested' = 'true'
+    """)
+    op.execute("""
+        UPDATE pull_requests
+        SET raw_data = (raw_data::jsonb - 'files_ingested')::json
+        WHERE raw_data->>'files_ingested' IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    op.execute("""
+        UPDATE pull_requests
+        SET raw_data = (raw_data::jsonb || jsonb_build_object('files_ingested', files_ingested_at IS NOT NULL))::json
+    """)
+    op.drop_column('pull_requests', 'files_ingested_at')
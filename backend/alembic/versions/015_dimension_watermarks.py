@@ -0,0 +1,30 @@
+"""Add updated_at watermark on metrics_dimension_daily
+
+Revision ID: 015_dimension_watermarks
+Revises: 014_pr_files_ingested
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '015_dimension_watermarks'
+down_revision = '014_pr_files_ingested'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'metrics_dimension_daily',
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index(
+        'ix_metrics_dimension_daily_workspace_updated_at', 'metrics_dimension_daily', ['workspace_id', 'updated_at']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_metrics_dimension_daily_workspace_updated_at', table_name='metrics_dimension_daily')
+    op.drop_column('metrics_dimension_daily', 'updated_at')
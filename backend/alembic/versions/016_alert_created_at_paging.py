@@ -0,0 +1,33 @@
+"""Page alerts by (created_at, id)
+
+Revision ID: 016_alert_created_at_paging
+Revises: 015_dimension_watermarks
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '016_alert_created_at_paging'
+down_revision = '015_dimension_watermarks'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # last_seen_at moves on every sync: a cursor on it skips or repeats rows
+    op.drop_index('ix_alerts_workspace_status_last_seen_at_id', table_name='alerts')
+    op.drop_index('ix_alerts_workspace_last_seen_at_id', table_name='alerts')
+    op.create_index('ix_alerts_workspace_created_at_id', 'alerts', ['workspace_id', 'created_at', 'id'])
+    op.create_index(
+        'ix_alerts_workspace_status_created_at_id', 'alerts', ['workspace_id', 'status', 'created_at', 'id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_alerts_workspace_status_created_at_id', table_name='alerts')
+    op.drop_index('ix_alerts_workspace_created_at_id', table_name='alerts')
+    op.create_index('ix_alerts_workspace_last_seen_at_id', 'alerts', ['workspace_id', 'last_seen_at', 'id'])
+    op.create_index(
+        'ix_alerts_workspace_status_last_seen_at_id', 'alerts', ['workspace_id', 'status', 'last_seen_at', 'id']
+    )
@@ -0,0 +1,26 @@
+"""Per-workspace Slack webhook, report delivery claim time
+
+Revision ID: 017_report_delivery_claims
+Revises: 016_alert_created_at_paging
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '017_report_delivery_claims'
+down_revision = '016_alert_created_at_paging'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('workspaces', sa.Column('slack_webhook_url', sa.String(), nullable=True))
+    # Reports left SENDING by a dead worker are reclaimed once the claim is old enough
+    op.add_column('reports', sa.Column('claimed_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('reports', 'claimed_at')
+    op.drop_column('workspaces', 'slack_webhook_url')
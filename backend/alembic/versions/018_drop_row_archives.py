@@ -0,0 +1,42 @@
+"""Drop the row-level archive tables of 009
+
+Revision ID: 018_drop_row_archives
+Revises: 017_report_delivery_claims
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '018_drop_row_archives'
+down_revision = '017_report_delivery_claims'
+branch_labels = None
+depends_on = None
+
+TABLES = ('risk_signals', 'alerts')
+
+
+def upgrade() -> None:
+    # Retention detaches whole partitions now (app/db/partitions.py): nothing
+    # writes these tables any more. Rows the old row-level job archived are
+    # kept, not dropped: such a table stays until it is emptied by hand.
+    for table in TABLES:
+        op.execute(f"""
+            DO $$
+            BEGIN
+                IF to_regclass('archive.{table}_archive') IS NULL THEN
+                    RETURN;
+                END IF;
+                IF EXISTS (SELECT 1 FROM archive.{table}_archive) THEN
+                    RAISE NOTICE 'archive.{table}_archive holds archived rows: kept';
+                ELSE
+                    DROP TABLE archive.{table}_archive;
+                END IF;
+            END $$
+        """)
+
+
+def downgrade() -> None:
+    op.execute("CREATE SCHEMA IF NOT EXISTS archive")
+    for table in TABLES:
+        op.execute(f"CREATE TABLE IF NOT EXISTS archive.{table}_archive (LIKE {table} INCLUDING DEFAULTS)")
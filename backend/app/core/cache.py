@@ -0,0 +1,168 @@
+"""
+Redis-backed cache of read-endpoint responses.
+
+Entries are keyed by workspace, endpoint and normalized query parameters,
+plus the workspace *generation*: a counter bumped when a sync commits (or a
+user action changes what the endpoints return). A bump makes every older
+key unreachable at once; stale entries simply age out with the TTL.
+
+Stampede protection works at two levels. Concurrent misses for one key
+inside a process share a single computation. Across processes a short
+SET NX lock lets one worker compute while the others poll for its result.
+If Redis is unavailable every request is computed, as without the cache.
+
+A shared computation outlives the request that started it, so it never
+uses that request's session: `compute` receives a session opened for it,
+closed when the computation ends.
+"""
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import redis.asyncio as aioredis
+from fastapi.encoders import jsonable_encoder
+from prometheus_client import Counter
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.logging import logging
+from app.db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+CACHE_REQUESTS = Counter(
+    "response_cache_requests_total", "Response cache lookups", ["endpoint", "result"]
+)
+
+KEY_PREFIX = "pulse:cache"
+LOCK_POLL_SECONDS = 0.05
+
+
+def normalize_params(params: Dict[str, Any]) -> str:
+    """Canonical JSON of the parameters (unset values dropped, keys sorted)."""
+    present = {name: value for name, value in params.items() if value is not None}
+    return json.dumps(jsonable_encoder(present), sort_keys=True, separators=(",", ":"))
+
+
+class ResponseCache:
+    """Generation-versioned response cache shared by the API processes."""
+
+    def __init__(
+        self,
+        url: str,
+        ttl_seconds: int,
+        lock_seconds: int,
+        enabled: bool = True,
+        session_factory: async_sessionmaker = AsyncSessionLocal,
+    ):
+        self.url = url
+        self.ttl_seconds = ttl_seconds
+        self.lock_seconds = lock_seconds
+        self.enabled = enabled
+        self.session_factory = session_factory
+        self._client: Optional[aioredis.Redis] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def _redis(self) -> aioredis.Redis:
+        # Connections belong to an event loop; worker jobs each run their own
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._client = aioredis.from_url(self.url, socket_timeout=0.5, socket_connect_timeout=0.5)
+            self._loop = loop
+        return self._client
+
+    @staticmethod
+    def _generation_key(workspace_id: str) -> str:
+        return f"{KEY_PREFIX}:gen:{workspace_id}"
+
+    async def bump(self, workspace_id: str) -> None:
+        """Invalidate every cached response of the workspace."""
+        if not self.enabled:
+            return
+        try:
+            await self._redis().incr(self._generation_key(str(workspace_id)))
+        except RedisError as e:
+            logger.warning(f"Could not bump cache generation for workspace={workspace_id}: {e}")
+
+    async def get_or_compute(
+        self,
+        workspace_id: str,
+        endpoint: str,
+        params: Dict[str, Any],
+        compute: Callable[[AsyncSession], Awaitable[Any]],
+    ) -> Any:
+        """
+        Cached JSON-compatible response for the request, computing it on a miss.
+
+        Args:
+            endpoint: stable name of the endpoint, part of the key and the metric labels
+            params: query parameters the response depends on
+            compute: produces the response from the session it is given (not
+                the request's); its result goes through jsonable_encoder
+        """
+        if not self.enabled:
+            return await self._compute(compute)
+        try:
+            generation = int(await self._redis().get(self._generation_key(str(workspace_id))) or 0)
+        except RedisError as e:
+            CACHE_REQUESTS.labels(endpoint=endpoint, result="error").inc()
+            logger.warning(f"Response cache unavailable: {e}")
+            return await self._compute(compute)
+
+        digest = hashlib.sha256(normalize_params(params).encode()).hexdigest()[:24]
+        key = f"{KEY_PREFIX}:{workspace_id}:{generation}:{endpoint}:{digest}"
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, endpoint, compute))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            CACHE_REQUESTS.labels(endpoint=endpoint, result="coalesced").inc()
+        # Shielded: a cancelled request must not cancel the load other requests wait on
+        return await asyncio.shield(task)
+
+    async def _compute(self, compute: Callable[[AsyncSession], Awaitable[Any]]) -> Any:
+        async with self.session_factory() as session:
+            return jsonable_encoder(await compute(session))
+
+    async def _load(self, key: str, endpoint: str, compute: Callable[[AsyncSession], Awaitable[Any]]) -> Any:
+        client = self._redis()
+        lock_key = f"{key}:lock"
+        try:
+            cached = await client.get(key)
+            if cached is None and not await client.set(lock_key, 1, nx=True, ex=self.lock_seconds):
+                # Another process is computing this entry: wait for it, up to the lock TTL
+                for _ in range(int(self.lock_seconds / LOCK_POLL_SECONDS)):
+                    await asyncio.sleep(LOCK_POLL_SECONDS)
+                    cached = await client.get(key)
+                    if cached is not None:
+                        break
+        except RedisError as e:
+            CACHE_REQUESTS.labels(endpoint=endpoint, result="error").inc()
+            logger.warning(f"Response cache unavailable: {e}")
+            return await self._compute(compute)
+
+        if cached is not None:
+            CACHE_REQUESTS.labels(endpoint=endpoint, result="hit").inc()
+            return json.loads(cached)
+
+        CACHE_REQUESTS.labels(endpoint=endpoint, result="miss").inc()
+        value = await self._compute(compute)
+        try:
+            await client.set(key, json.dumps(value), ex=self.ttl_seconds)
+            await client.delete(lock_key)
+        except RedisError as e:
+            logger.warning(f"Could not store cached response {key}: {e}")
+        return value
+
+
+response_cache = ResponseCache(
+    url=settings.REDIS_URL,
+    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+    lock_seconds=settings.RESPONSE_CACHE_LOCK_SECONDS,
+    enabled=settings.RESPONSE_CACHE_ENABLED,
+)
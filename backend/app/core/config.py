@@ -7,6 +7,24 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 480
+    # Authenticated users cached per process (app/modules/users/cache.py),
+    # optionally in Redis too; the TTL bounds how long another process may
+    # keep serving a deactivated user
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_ENTRIES: int = 10_000
+    USER_CACHE_REDIS: bool = False
+    # Build the user from the token's workspace / role claims without any
+    # lookup; revocation in other processes then waits for token expiry
+    AUTH_TRUST_TOKEN_CLAIMS: bool = False
+    # bcrypt cost factor: hashes stored with another cost are rehashed at
+    # the user's next login
+    BCRYPT_ROUNDS: int = 12
+    # Password hashing runs in its own thread pool (app/core/security.py):
+    # at most PASSWORD_HASH_WORKERS hashes at once, PASSWORD_HASH_MAX_PENDING
+    # running or queued, beyond which logins get 503
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    PASSWORD_HASH_TIMEOUT_SECONDS: float = 10.0
     
     DATABASE_URL: str
     REDIS_URL: str
@@ -15,6 +33,17 @@ class Settings(BaseSettings):
     MOCK_MODE: bool = True
     LLM_ENABLED: bool = False
     LLM_API_KEY: str = ""
+    # "openai" (any OpenAI-compatible chat completions API) or "stub" (local,
+    # offline), see app/modules/reports/llm.py
+    LLM_BACKEND: str = "openai"
+    LLM_API_URL: str = "https://api.openai.com/v1"
+    LLM_MODEL: str = "gpt-4o-mini"
+    LLM_TIMEOUT_SECONDS: float = 60.0
+    LLM_MAX_CONCURRENCY: int = 4
+    LLM_STUB_LATENCY_SECONDS: float = 0.5
+    # On-disk LLM response cache (empty directory disables it)
+    LLM_CACHE_DIR: str = "/tmp/project-pulse/llm-cache"
+    LLM_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
     
     # Trello integration
     TRELLO_KEY: str = ""
@@ -23,6 +52,68 @@ class Settings(BaseSettings):
     
     # GitHub integration
     GITHUB_TOKEN: str = ""
+
+    # Report notifications (app/modules/reports/notifications.py): "local"
+    # stand-ins writing to NOTIFY_OUTBOX_DIR, or "live" SMTP / Slack webhooks
+    # (each workspace's own, see Workspace.slack_webhook_url)
+    NOTIFY_TRANSPORT: str = "local"
+    NOTIFY_OUTBOX_DIR: str = "/tmp/project-pulse/outbox"
+    NOTIFY_EMAIL_FROM: str = "pulse@localhost"
+    NOTIFY_CONCURRENCY: int = 32
+    NOTIFY_MAX_ATTEMPTS: int = 3
+    NOTIFY_TIMEOUT_SECONDS: float = 10.0
+    # Approved reports claimed and marked per database round trip
+    NOTIFY_BATCH_SIZE: int = 200
+    # A SENDING claim older than this (its worker died) is taken over by the
+    # next delivery run; keep it well above the time a run takes
+    NOTIFY_CLAIM_TIMEOUT_SECONDS: int = 1800
+    SMTP_HOST: str = "localhost"
+    SMTP_PORT: int = 25
+    SMTP_USER: str = ""
+    SMTP_PASSWORD: str = ""
+
+    # Scheduled period reports (worker/scheduler.py): weekday (0 = Monday) and
+    # UTC hour of the run; drafts are approved and sent right away with
+    # REPORT_AUTO_APPROVE, else they wait for a reviewer
+    REPORT_SCHEDULE_WEEKDAY: int = 0
+    REPORT_SCHEDULE_HOUR: int = 7
+    REPORT_AUTO_APPROVE: bool = False
+
+    # Per-process columnar fact cache (analytics)
+    FACT_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    FACT_CACHE_REFRESH_SECONDS: int = 60
+
+    # Risk engine: "baseline" (EWMA z-scores over 60 days) or "legacy" (day-over-day thresholds)
+    RISK_ENGINE_MODE: str = "baseline"
+    # Risk alerts dedupe per (workspace, type, bucket)
+    ALERT_FINGERPRINT_BUCKET_DAYS: int = 7
+
+    # Monthly partitions of the history tables (app/db/partitions.py): months
+    # created ahead, and retention per table (expired partitions are detached
+    # into the "archive" schema, or dropped when PARTITION_ARCHIVE is off)
+    PARTITION_MONTHS_AHEAD: int = 3
+    PARTITION_ARCHIVE: bool = True
+    METRICS_DAILY_RETENTION_DAYS: int = 730
+    RISK_SIGNAL_RETENTION_DAYS: int = 90
+    ALERT_RETENTION_DAYS: int = 180
+
+    # CPU-bound work of the API (simulations, ...), see app/core/executor.py:
+    # "process" pool (falls back to threads) or "thread" pool
+    COMPUTE_EXECUTOR: str = "process"
+    COMPUTE_WORKERS: int = 2
+    COMPUTE_MAX_PENDING: int = 16
+    COMPUTE_TIMEOUT_SECONDS: float = 30.0
+
+    # Per-process memo of forecast results (see app/modules/forecast/memo.py)
+    FORECAST_MEMO_MAX_ENTRIES: int = 2048
+    FORECAST_MEMO_TTL_SECONDS: int = 3600
+    # Precompute the standard dashboard forecasts after each sync
+    FORECAST_PRECOMPUTE: bool = True
+
+    # Redis response cache for the dashboard read endpoints (invalidated by sync generation)
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL_SECONDS: int = 24 * 3600
+    RESPONSE_CACHE_LOCK_SECONDS: int = 10
     
     @property
     def CORS_ORIGINS(self) -> List[str]:
@@ -15,3 +15,15 @@ class AuthError(HTTPException):
             detail=detail,
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+class Conflict(HTTPException):
+    def __init__(self, detail: str = "Conflict with the current state"):
+        super().__init__(status_code=status.HTTP_409_CONFLICT, detail=detail)
+
+class ServiceUnavailable(HTTPException):
+    def __init__(self, detail: str = "Service temporarily unavailable", retry_after: int = 1):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)},
+        )
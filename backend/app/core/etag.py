@@ -0,0 +1,39 @@
+"""
+Strong ETags for read endpoints whose content is a function of a watermark.
+
+The tag is a hash of the watermark and the normalized request parameters,
+so a conditional request can be answered with 304 before running the
+query that would produce the body.
+"""
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+# Clients may store the response but must revalidate it on every use
+CACHE_CONTROL = "private, no-cache"
+
+
+def strong_etag(*parts: Any) -> str:
+    raw = "\x1f".join("" if part is None else str(part) for part in parts)
+    return '"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match evaluation (weak comparison, as RFC 9110 requires for GET)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag[2:] == etag if tag.startswith("W/") else tag == etag for tag in candidates)
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+def json_with_etag(content: Any, etag: str) -> JSONResponse:
+    return JSONResponse(jsonable_encoder(content), headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
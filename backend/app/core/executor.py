@@ -0,0 +1,171 @@
+"""
+Executor for CPU-bound work called from async routes.
+
+Simulations and other NumPy-heavy computations would block the event loop
+(and so every other request) if called directly from an `async def` route.
+`compute_executor.run(fn, *args)` runs them in a process pool instead, or in
+a thread pool when processes are unavailable (COMPUTE_EXECUTOR=thread, or a
+pool that cannot start) or when the arguments only make sense in this
+process (`processes=False`, e.g. objects from the in-process caches). Password
+hashing has its own thread-only instance (app/core/security.py), so that a
+burst of logins and the forecasts do not queue behind each other.
+
+The executor bounds its own load:
+- at most COMPUTE_MAX_PENDING calls may be running or queued; beyond that a
+  call fails immediately with 503 instead of queueing without limit;
+- a call that does not finish within its timeout fails with 503. A worker
+  cannot be interrupted, so the abandoned call still counts as pending
+  until it actually ends.
+"""
+import asyncio
+import functools
+import multiprocessing
+import os
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from prometheus_client import Counter, Gauge
+
+from app.core.config import settings
+from app.core.errors import ServiceUnavailable
+from app.core.logging import logging
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_TASKS = Counter(
+    "compute_executor_tasks_total", "CPU-bound calls by outcome", ["function", "result"]
+)
+EXECUTOR_PENDING = Gauge("compute_executor_pending", "CPU-bound calls running or queued", ["executor"])
+
+RETRY_AFTER_SECONDS = 1
+# Workers yield the CPU to the API process (request handling) when they compete
+WORKER_NICENESS = 10
+
+
+def _lower_priority() -> None:
+    try:
+        os.nice(WORKER_NICENESS)
+    except (AttributeError, OSError):  # not supported on this platform
+        pass
+
+
+class ComputeExecutor:
+    """Bounded process (or thread) pool for CPU-bound calls."""
+
+    def __init__(self, mode: str, max_workers: int, max_pending: int, timeout_seconds: float, name: str = "compute"):
+        if mode not in ("process", "thread"):
+            raise ValueError("mode must be 'process' or 'thread'")
+        self.mode = mode
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout_seconds = timeout_seconds
+        self.name = name
+        self._processes: Optional[Executor] = None
+        self._threads: Optional[Executor] = None
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _thread_pool(self) -> Executor:
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+        return self._threads
+
+    def _pool(self, processes: bool) -> Executor:
+        if not processes or self.mode == "thread":
+            return self._thread_pool()
+        if self._processes is None:
+            try:
+                # spawn: forking a process that runs an event loop and DB connections is unsafe
+                self._processes = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_lower_priority,
+                )
+            except (OSError, NotImplementedError) as e:
+                logger.warning(f"Process pool unavailable ({e}), running CPU-bound calls in threads")
+                self.mode = "thread"
+                return self._thread_pool()
+        return self._processes
+
+    def _submit(self, call: Callable[[], Any], processes: bool) -> Future:
+        try:
+            return self._pool(processes).submit(call)
+        except (BrokenProcessPool, OSError, RuntimeError) as e:
+            if not processes or self.mode == "thread":
+                raise
+            logger.warning(f"Process pool failed ({e}), running CPU-bound calls in threads")
+            self.mode = "thread"
+            self._processes = None
+            return self._thread_pool().submit(call)
+
+    def _release(self) -> None:
+        self._pending -= 1
+        EXECUTOR_PENDING.labels(executor=self.name).set(self._pending)
+
+    def _on_done(self, loop: asyncio.AbstractEventLoop, _: Future) -> None:
+        # Called from a pool thread: hand the bookkeeping back to the event loop
+        try:
+            loop.call_soon_threadsafe(self._release)
+        except RuntimeError:  # loop already closed
+            self._release()
+
+    async def run(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        timeout: Optional[float] = None,
+        processes: bool = True,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Run `fn(*args, **kwargs)` off the event loop and return its result.
+
+        With processes, `fn` must be a module-level function and its arguments
+        and result picklable.
+
+        Raises:
+            ServiceUnavailable: the executor is saturated, or the call timed out
+        """
+        name = getattr(fn, "__qualname__", repr(fn))
+        if self._pending >= self.max_pending:
+            EXECUTOR_TASKS.labels(function=name, result="rejected").inc()
+            raise ServiceUnavailable("Too many computations in progress, retry shortly", RETRY_AFTER_SECONDS)
+
+        call = functools.partial(fn, *args, **kwargs)
+        future = self._submit(call, processes)
+        self._pending += 1
+        EXECUTOR_PENDING.labels(executor=self.name).set(self._pending)
+        # Released when the work really ends, even if the caller stopped waiting
+        future.add_done_callback(functools.partial(self._on_done, asyncio.get_running_loop()))
+
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.timeout_seconds)
+        except asyncio.TimeoutError:
+            EXECUTOR_TASKS.labels(function=name, result="timeout").inc()
+            raise ServiceUnavailable("Computation timed out", RETRY_AFTER_SECONDS)
+        except BrokenProcessPool as e:
+            # A worker died (e.g. out of memory): not retried here, the next call gets a fresh pool
+            EXECUTOR_TASKS.labels(function=name, result="error").inc()
+            logger.error(f"Compute worker crashed running {name}: {e}")
+            self._processes = None
+            raise ServiceUnavailable("Computation failed, retry shortly", RETRY_AFTER_SECONDS)
+        EXECUTOR_TASKS.labels(function=name, result="ok").inc()
+        return result
+
+    def shutdown(self) -> None:
+        for pool in (self._processes, self._threads):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        self._processes = self._threads = None
+
+
+compute_executor = ComputeExecutor(
+    mode=settings.COMPUTE_EXECUTOR,
+    max_workers=settings.COMPUTE_WORKERS,
+    max_pending=settings.COMPUTE_MAX_PENDING,
+    timeout_seconds=settings.COMPUTE_TIMEOUT_SECONDS,
+)
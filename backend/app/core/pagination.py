@@ -0,0 +1,92 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+A page is read as `WHERE (sort_key, id) < (last sort_key, last id) ORDER BY
+sort_key DESC, id DESC LIMIT n + 1` over an index on (workspace_id,
+sort_key, id): every page is one index range scan, however deep, unlike
+OFFSET whose cost grows with the pages skipped. The extra row tells whether
+there is a next page.
+
+The sort key must never change once a row is written (a creation time):
+a row whose key moves between two pages would be skipped or repeated.
+
+A filter on several values of an indexed column (`status IN (...)`) loses
+the index order. `paginate_in` reads one range scan per value instead,
+each limited to a page, and merges them: the sort is over at most
+len(values) * (n + 1) rows.
+
+The cursor is opaque to clients (URL-safe base64 of the last row's
+key) and returned in the NEXT_CURSOR_HEADER response header.
+"""
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response
+from sqlalchemy import Select, select, tuple_, union_all
+from sqlalchemy.orm import aliased
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort_value: datetime, row_id: Any) -> str:
+    raw = json.dumps([sort_value.isoformat(), str(row_id)], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """(sort value, id) of the last row of the previous page; 400 if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_value, row_id = json.loads(raw)
+        return datetime.fromisoformat(sort_value), uuid.UUID(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate(query: Select, sort_column, id_column, limit: int, cursor: Optional[str] = None) -> Select:
+    """Newest first, after `cursor`; fetches one extra row (see `split_page`)."""
+    if cursor:
+        query = query.where(tuple_(sort_column, id_column) < tuple_(*decode_cursor(cursor)))
+    return query.order_by(sort_column.desc(), id_column.desc()).limit(limit + 1)
+
+
+def paginate_in(
+    query: Select,
+    column,
+    values: Sequence[Any],
+    sort_column,
+    id_column,
+    limit: int,
+    cursor: Optional[str] = None,
+    entity: Any = None,
+) -> Select:
+    """
+    `paginate` of `query` where `column` is one of `values`, one index range scan per value.
+
+    Args:
+        entity: the mapped class when `query` selects one (the page then yields instances)
+    """
+    if len(values) == 1:
+        return paginate(query.where(column == values[0]), sort_column, id_column, limit, cursor)
+    merged = union_all(
+        *(paginate(query.where(column == value), sort_column, id_column, limit, cursor) for value in values)
+    ).subquery()
+    page = select(aliased(entity, merged)) if entity is not None else select(merged)
+    return page.order_by(merged.c[sort_column.key].desc(), merged.c[id_column.key].desc()).limit(limit + 1)
+
+
+def split_page(rows: Sequence[Any], limit: int, sort_attr: str, id_attr: str = "id") -> Tuple[List[Any], Optional[str]]:
+    """(rows of the page, cursor of the next page or None)."""
+    page = list(rows[:limit])
+    if len(rows) <= limit:
+        return page, None
+    last = page[-1]
+    return page, encode_cursor(getattr(last, sort_attr), getattr(last, id_attr))
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -1,25 +1,65 @@
+"""
+Access tokens and password hashing.
+
+bcrypt is deliberately slow (about 0.2-0.5 s per hash at the default cost)
+and would stall the event loop, and every other request with it, if called
+from an async handler. Hashes and verifications run in `password_executor`,
+a thread pool of its own (bcrypt releases the GIL): at most
+PASSWORD_HASH_WORKERS at once, and beyond PASSWORD_HASH_MAX_PENDING running
+or queued, callers get 503 rather than waiting without limit.
+
+The cost factor is BCRYPT_ROUNDS. Hashes stored with another cost are
+reported by `verify_and_update_password` so they can be replaced at login,
+the only time the plain password is known.
+"""
 from datetime import datetime, timedelta, timezone
-from typing import Any, Union
+from typing import Any, Dict, Optional, Tuple, Union
 from jose import jwt
 from passlib.context import CryptContext
 from app.core.config import settings
+from app.core.executor import ComputeExecutor
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+password_executor = ComputeExecutor(
+    mode="thread",
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    timeout_seconds=settings.PASSWORD_HASH_TIMEOUT_SECONDS,
+    name="password-hash",
+)
 
 ALGORITHM = "HS256"
 
-def create_access_token(subject: Union[str, Any], expires_delta: timedelta = None) -> str:
+def create_access_token(
+    subject: Union[str, Any], expires_delta: timedelta = None, claims: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Args:
+        claims: extra claims, e.g. the user's id, workspace and role ("uid",
+            "ws", "role"), see AUTH_TRUST_TOKEN_CLAIMS
+    """
+    now = datetime.now(timezone.utc)
     if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = {**(claims or {}), "exp": expire, "iat": now, "sub": str(subject)}
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await password_executor.run(pwd_context.verify, plain_password, hashed_password, processes=False)
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    (valid, new hash): the new hash is set when the password is valid but the
+    stored hash uses an outdated cost factor, else None.
+    """
+    return await password_executor.run(
+        pwd_context.verify_and_update, plain_password, hashed_password, processes=False
+    )
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+async def get_password_hash(password: str) -> str:
+    return await password_executor.run(pwd_context.hash, password, processes=False)
@@ -0,0 +1,142 @@
+"""
+Monthly range partitions of the history tables.
+
+metrics_daily (by day), risk_signals and alerts (by created_at) are
+partitioned by calendar month (UTC), one `<table>_pYYYYMM` partition each.
+Queries that filter on the partition column only read the partitions of
+that window, and retention becomes a metadata operation:
+
+- `ensure_partitions` creates the partitions up to PARTITION_MONTHS_AHEAD
+  months ahead, so inserts never hit a missing range. It runs daily
+  (partition_maintenance_job, enqueued by worker/scheduler.py) and before
+  each full sync. There is no DEFAULT partition: rows landing there would
+  prevent creating the partition of their month later;
+- `detach_expired` detaches every partition that lies entirely before its
+  table's retention cutoff and moves it to the `archive` schema (or drops
+  it when PARTITION_ARCHIVE is off). A partition of alerts that still
+  holds open alerts is kept until they are resolved.
+"""
+import re
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import logging
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_SCHEMA = "archive"
+
+# table -> (partition column, retention setting, rows that pin a partition)
+PARTITIONED_TABLES = {
+    "metrics_daily": ("day", "METRICS_DAILY_RETENTION_DAYS", None),
+    "risk_signals": ("created_at", "RISK_SIGNAL_RETENTION_DAYS", None),
+    "alerts": ("created_at", "ALERT_RETENTION_DAYS", "status <> 'RESOLVED'"),
+}
+
+
+def month_start(d: date) -> date:
+    return date(d.year, d.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+async def list_partitions(session: AsyncSession, table: str) -> List[Tuple[str, date]]:
+    """(partition, first month day) of a table's monthly partitions, oldest first."""
+    result = await session.execute(
+        text("""
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            JOIN pg_namespace ns ON ns.oid = parent.relnamespace
+            WHERE parent.relname = :table AND ns.nspname = current_schema()
+        """),
+        {"table": table},
+    )
+    pattern = re.compile(rf"^{table}_p(\d{{4}})(\d{{2}})$")
+    partitions = []
+    for name in result.scalars().all():
+        match = pattern.match(name)
+        if match:
+            partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(partitions, key=lambda p: p[1])
+
+
+async def ensure_partitions(
+    session: AsyncSession,
+    now: Optional[datetime] = None,
+    months_ahead: Optional[int] = None,
+) -> List[str]:
+    """Create the missing partitions from the current month to `months_ahead` months ahead."""
+    now = now or datetime.now(timezone.utc)
+    months_ahead = settings.PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    current = month_start(now.date())
+    created = []
+    for table in PARTITIONED_TABLES:
+        existing = {month for _, month in await list_partitions(session, table)}
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            if month in existing:
+                continue
+            name = partition_name(table, month)
+            # UTC bounds; the literal also casts to a date for metrics_daily
+            await session.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month} 00:00:00+00') TO ('{add_months(month, 1)} 00:00:00+00')"
+            ))
+            created.append(name)
+    await session.commit()
+    if created:
+        logger.info(f"Created partitions: {', '.join(created)}")
+    return created
+
+
+async def detach_expired(session: AsyncSession, now: Optional[datetime] = None) -> Dict[str, List[str]]:
+    """
+    Detach the partitions older than each table's retention.
+
+    Returns:
+        Detached partitions per table
+    """
+    now = now or datetime.now(timezone.utc)
+    detached: Dict[str, List[str]] = {}
+    for table, (_, retention_setting, pinned) in PARTITIONED_TABLES.items():
+        cutoff = (now - timedelta(days=getattr(settings, retention_setting))).date()
+        detached[table] = []
+        for name, month in await list_partitions(session, table):
+            if add_months(month, 1) > cutoff:
+                break
+            if pinned:
+                result = await session.execute(text(f"SELECT EXISTS (SELECT 1 FROM {name} WHERE {pinned})"))
+                if result.scalar():
+                    logger.warning(f"Keeping expired partition {name}: it still has rows where {pinned}")
+                    continue
+            await session.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+            if settings.PARTITION_ARCHIVE:
+                await session.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}"))
+                await session.execute(text(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}"))
+            else:
+                await session.execute(text(f"DROP TABLE {name}"))
+            # One short transaction per partition: DETACH locks the parent table
+            await session.commit()
+            detached[table].append(name)
+            logger.info(f"Detached {name} (before {cutoff}, {'archived' if settings.PARTITION_ARCHIVE else 'dropped'})")
+    return detached
+
+
+async def maintain_partitions(session: AsyncSession, now: Optional[datetime] = None) -> Dict[str, object]:
+    """Pre-create the upcoming partitions, then retire the expired ones."""
+    created = await ensure_partitions(session, now)
+    detached = await detach_expired(session, now)
+    return {"created": created, "detached": detached}
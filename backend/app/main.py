@@ -1,6 +1,10 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import make_asgi_app
 from app.core.config import settings
+from app.core.executor import compute_executor
+from app.core.security import password_executor
+from app.core.pagination import NEXT_CURSOR_HEADER
 from app.core.logging import setup_logging
 from app.modules.users.routes import router as users_router
 from app.modules.integrations.routes import router as integrations_router
@@ -23,8 +27,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Keyset pagination cursor of the list endpoints (app/core/pagination.py)
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+# Prometheus scrape endpoint (cache sizes, hit/miss counters, ...)
+app.mount("/metrics", make_asgi_app())
+
+@app.on_event("shutdown")
+def shutdown_executor():
+    compute_executor.shutdown()
+    password_executor.shutdown()
+
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
@@ -1,16 +1,37 @@
-from sqlalchemy import String, ForeignKey
+from sqlalchemy import String, ForeignKey, Float, Integer, DateTime, Index, func
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.dialects.postgresql import UUID
+from typing import Optional
 import uuid
+import datetime
 from app.db.models import Base
 
 class Alert(Base):
     __tablename__ = "alerts"
+    __table_args__ = (
+        # Upsert lookup and the (constant-latency) alert list
+        Index("ix_alerts_fingerprint", "fingerprint"),
+        Index("ix_alerts_workspace_created_at_id", "workspace_id", "created_at", "id"),
+        Index("ix_alerts_workspace_status_created_at_id", "workspace_id", "status", "created_at", "id"),
+        Index("ix_alerts_resolved_at", "resolved_at"),
+        # Monthly partitions, see app/db/partitions.py
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
     
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     status: Mapped[str] = mapped_column(String, default="NEW") # NEW, ACK, RESOLVED
     severity: Mapped[str] = mapped_column(String)
     title: Mapped[str] = mapped_column(String)
     history: Mapped[str] = mapped_column(String, nullable=True)
+
+    # Risk alerts: one row per (workspace, risk type, time bucket), see alerts/service.py
+    fingerprint: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    risk_type: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    score: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    occurrences: Mapped[int] = mapped_column(Integer, default=1, server_default="1")
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), primary_key=True, server_default=func.now())
+    first_seen_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    last_seen_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    resolved_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     
     workspace_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("workspaces.id"))
@@ -1,20 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Any
+from typing import List, Any, Optional
+from datetime import date, datetime, timedelta, timezone
+from app.core.cache import response_cache
+from app.core.pagination import set_next_cursor
 from app.db.session import get_db
 from app.modules.users.routes import get_current_active_user
 from app.modules.users.schemas import User
-from app.modules.alerts.service import AlertService
+from app.modules.alerts.service import AlertService, ALERT_STATUSES, alert_to_dict
 
 router = APIRouter()
 service = AlertService()
 
 @router.get("/", response_model=List[Any])
 async def get_alerts(
-    current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    response: Response,
+    status: Optional[str] = Query(None, description="Comma-separated statuses (NEW, ACK, RESOLVED)"),
+    limit: int = Query(50, ge=1, le=200),
+    days: int = Query(30, ge=1, le=365, description="Alerts seen in the last N days"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    current_user: User = Depends(get_current_active_user)
 ):
-    return await service.get_alerts(db, str(current_user.workspace_id))
+    workspace_id = str(current_user.workspace_id)
+    statuses = sorted({s.strip().upper() for s in status.split(",") if s.strip()}) if status else None
+    if statuses and any(s not in ALERT_STATUSES for s in statuses):
+        raise HTTPException(status_code=400, detail=f"status must be among {list(ALERT_STATUSES)}")
+
+    async def load(session: AsyncSession):
+        since = datetime.now(timezone.utc) - timedelta(days=days)
+        alerts, next_cursor = await service.get_alerts(
+            session, workspace_id, statuses=statuses, limit=limit, since=since, cursor=cursor
+        )
+        return {"items": [alert_to_dict(alert) for alert in alerts], "next_cursor": next_cursor}
+
+    page = await response_cache.get_or_compute(
+        workspace_id, "alerts.page",
+        # The window slides with the day
+        {"status": statuses, "limit": limit, "days": days, "cursor": cursor, "today": date.today().isoformat()}, load,
+    )
+    set_next_cursor(response, page["next_cursor"])
+    return page["items"]
 
 @router.post("/{alert_id}/ack")
 async def acknowledge_alert(
@@ -22,7 +47,8 @@ async def acknowledge_alert(
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
-    alert = await service.acknowledge_alert(db, alert_id)
+    alert = await service.acknowledge_alert(db, alert_id, str(current_user.workspace_id))
     if not alert:
         raise HTTPException(status_code=404, detail="Alert not found")
+    await response_cache.bump(str(current_user.workspace_id))
     return {"status": "ok"}
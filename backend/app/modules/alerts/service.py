@@ -1,17 +1,230 @@
+"""
+Alerts, and their lifecycle for detected risks.
+
+A workspace has at most one open (NEW or ACK) alert per risk type. While
+the condition keeps firing, every evaluation updates that row (last_seen_at,
+occurrences, latest score) instead of adding one, for as long as it stays
+open: an acknowledged alert stays acknowledged across evaluations. When a
+workspace is evaluated and the condition no longer fires, its open alert is
+resolved.
+
+Each alert also carries a fingerprint of (workspace, risk type, time bucket
+of ALERT_FINGERPRINT_BUCKET_DAYS) taken when it was created. A resolved
+alert that fires again within its bucket is reopened; a later episode gets
+a new alert.
+
+Alerts are range-partitioned by created_at (app/db/partitions.py), and a
+unique index there must include created_at, so it cannot make the
+fingerprint unique. Instead, each evaluation takes a transaction-level
+advisory lock before reading the alerts it updates: concurrent runs (a
+manual sync during the scheduled one) take turns and never insert the same
+alert twice.
+"""
+import hashlib
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.pagination import paginate, paginate_in, split_page
 from app.modules.alerts.models import Alert
 
+OPEN_STATUSES = ("NEW", "ACK")
+ALERT_STATUSES = OPEN_STATUSES + ("RESOLVED",)
+
+# pg_advisory_xact_lock key serializing sync_risk_alerts across processes
+ALERT_SYNC_LOCK_KEY = 0x616C657274  # "alert"
+
+
+def _bucket_seconds() -> int:
+    return settings.ALERT_FINGERPRINT_BUCKET_DAYS * 86400
+
+
+def alert_fingerprint(workspace_id: str, risk_type: str, at: datetime) -> str:
+    bucket = int(at.timestamp() // _bucket_seconds())
+    return hashlib.sha1(f"{workspace_id}:{risk_type}:{bucket}".encode()).hexdigest()
+
+
+def bucket_bounds(at: datetime) -> Tuple[datetime, datetime]:
+    """[start, end) of the fingerprint bucket containing `at`: every alert of the bucket was created in it."""
+    start = at.timestamp() // _bucket_seconds() * _bucket_seconds()
+    return (
+        datetime.fromtimestamp(start, tz=timezone.utc),
+        datetime.fromtimestamp(start + _bucket_seconds(), tz=timezone.utc),
+    )
+
+
+def alert_to_dict(alert: Alert) -> Dict[str, Any]:
+    return {
+        "id": alert.id,
+        "status": alert.status,
+        "severity": alert.severity,
+        "title": alert.title,
+        "history": alert.history,
+        "risk_type": alert.risk_type,
+        "score": alert.score,
+        "occurrences": alert.occurrences,
+        "first_seen_at": alert.first_seen_at,
+        "last_seen_at": alert.last_seen_at,
+        "resolved_at": alert.resolved_at,
+    }
+
+
 class AlertService:
-    async def get_alerts(self, db: AsyncSession, workspace_id: str):
-        result = await db.execute(select(Alert).where(Alert.workspace_id == workspace_id))
-        return result.scalars().all()
+    async def get_alerts(
+        self,
+        db: AsyncSession,
+        workspace_id: str,
+        statuses: Optional[Sequence[str]] = None,
+        limit: int = 50,
+        since: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+    ):
+        """
+        Most recently created alerts first; bounded, index-backed.
+
+        Returns:
+            (alerts, cursor of the next page or None), see app/core/pagination.py
+        """
+        query = select(Alert).where(Alert.workspace_id == workspace_id)
+        if since is not None:
+            # Seen since `since` implies created at most one bucket earlier: prunes old partitions
+            query = query.where(
+                Alert.last_seen_at >= since,
+                Alert.created_at >= since - timedelta(days=settings.ALERT_FINGERPRINT_BUCKET_DAYS),
+                Alert.created_at <= datetime.now(timezone.utc),
+            )
+        if statuses:
+            page = paginate_in(query, Alert.status, statuses, Alert.created_at, Alert.id, limit, cursor, entity=Alert)
+        else:
+            page = paginate(query, Alert.created_at, Alert.id, limit, cursor)
+        result = await db.execute(page)
+        return split_page(result.scalars().all(), limit, "created_at")
 
-    async def acknowledge_alert(self, db: AsyncSession, alert_id: str):
-        result = await db.execute(select(Alert).where(Alert.id == alert_id))
+    async def acknowledge_alert(self, db: AsyncSession, alert_id: str, workspace_id: Optional[str] = None):
+        query = select(Alert).where(Alert.id == alert_id)
+        if workspace_id is not None:
+            query = query.where(Alert.workspace_id == workspace_id)
+        result = await db.execute(query)
         alert = result.scalars().first()
         if alert:
             alert.status = "ACK"
             await db.commit()
             await db.refresh(alert)
         return alert
+
+    async def sync_risk_alerts(
+        self,
+        db: AsyncSession,
+        risks_by_workspace: Dict[str, List[Dict[str, Any]]],
+        evaluated_workspace_ids: Sequence[str],
+        now: Optional[datetime] = None,
+    ) -> Dict[str, int]:
+        """
+        Upsert one alert per fired (workspace, risk type) and resolve the ones that cleared.
+
+        Args:
+            risks_by_workspace: output of the rule evaluation; several rules of
+                one type collapse into the highest-scoring one
+            evaluated_workspace_ids: workspaces that had data for the evaluation
+                day; only their open alerts can be resolved
+
+        Returns:
+            Counts of created, updated and resolved alerts (caller commits)
+        """
+        now = now or datetime.now(timezone.utc)
+        # Held until the caller commits: a concurrent run reads what this one wrote
+        await db.execute(select(func.pg_advisory_xact_lock(ALERT_SYNC_LOCK_KEY)))
+
+        fired: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for workspace_id, risks in risks_by_workspace.items():
+            for risk in risks:
+                key = (str(workspace_id), risk["type"])
+                # Several rules of one type collapse into the highest-scoring one
+                if key not in fired or risk["score"] > fired[key]["score"]:
+                    fired[key] = risk
+
+        # Open alerts of the fired types (whatever their bucket), or resolved in the current bucket
+        current: Dict[Tuple[str, str], Alert] = {}
+        if fired:
+            created_from, created_to = bucket_bounds(now)
+            fingerprints = [alert_fingerprint(ws, risk_type, now) for ws, risk_type in fired]
+            result = await db.execute(
+                select(Alert).where(
+                    Alert.workspace_id.in_(list({ws for ws, _ in fired})),
+                    Alert.risk_type.in_(list({risk_type for _, risk_type in fired})),
+                    or_(
+                        Alert.status.in_(OPEN_STATUSES),
+                        and_(
+                            Alert.fingerprint.in_(fingerprints),
+                            Alert.created_at >= created_from,
+                            Alert.created_at < created_to,
+                        ),
+                    ),
+                )
+            )
+            for alert in result.scalars().all():
+                key = (str(alert.workspace_id), alert.risk_type)
+                if key not in fired:
+                    continue
+                chosen = current.get(key)
+                # The open alert wins over a resolved one; then the most recently seen
+                rank = (alert.status in OPEN_STATUSES, alert.last_seen_at)
+                if chosen is None or rank > (chosen.status in OPEN_STATUSES, chosen.last_seen_at):
+                    current[key] = alert
+
+        counts = {"created": 0, "updated": 0, "resolved": 0}
+        kept = []
+        for (workspace_id, risk_type), risk in fired.items():
+            alert = current.get((workspace_id, risk_type))
+            if alert is None:
+                alert = Alert(
+                    id=uuid.uuid4(),
+                    workspace_id=workspace_id,
+                    fingerprint=alert_fingerprint(workspace_id, risk_type, now),
+                    risk_type=risk_type,
+                    severity=risk["severity"],
+                    score=risk["score"],
+                    title=f"Risk Detected: {risk_type}",
+                    history=risk["explanation"],
+                    status="NEW",
+                    occurrences=1,
+                    created_at=now,
+                    first_seen_at=now,
+                    last_seen_at=now,
+                )
+                db.add(alert)
+                kept.append(alert.id)
+                counts["created"] += 1
+                continue
+            alert.severity = risk["severity"]
+            alert.score = risk["score"]
+            alert.history = risk["explanation"]
+            alert.last_seen_at = now
+            alert.occurrences += 1
+            if alert.status == "RESOLVED":
+                # Fired again within the same bucket: reopen
+                alert.status = "NEW"
+                alert.resolved_at = None
+            kept.append(alert.id)
+            counts["updated"] += 1
+        await db.flush()
+
+        if evaluated_workspace_ids:
+            # Open risk alerts of evaluated workspaces that did not fire (or duplicates of one that did)
+            result = await db.execute(
+                update(Alert)
+                .where(
+                    Alert.workspace_id.in_(list(evaluated_workspace_ids)),
+                    Alert.status.in_(OPEN_STATUSES),
+                    Alert.risk_type.is_not(None),
+                    Alert.id.not_in(kept),
+                )
+                .values(status="RESOLVED", resolved_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            counts["resolved"] = result.rowcount
+        return counts
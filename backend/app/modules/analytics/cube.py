@@ -0,0 +1,242 @@
+"""
+Dimensional rollup cube: per (workspace, day, dimension, value) aggregates.
+
+Rows are rebuilt incrementally: each sync only recomputes the days inside
+the lookback window, so older rows are never rescanned. Drill-down queries
+then read a handful of pre-aggregated rows instead of raw PR/card JSON.
+"""
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select, delete, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.modules.analytics.models import MetricDimensionDaily
+from app.modules.analytics.sketch import QuantileSketch
+from app.modules.integrations.models import PullRequest, Repo, TrelloCard
+
+PR_DIMENSIONS = ("repo", "author", "base_branch")
+CARD_DIMENSIONS = ("trello_list", "card_type", "label")
+DIMENSIONS = PR_DIMENSIONS + CARD_DIMENSIONS
+
+# Days recomputed on each sync (late merges/moves land inside this window)
+ROLLUP_LOOKBACK_DAYS = 7
+
+CellKey = Tuple[date, str, str]
+
+
+def _parse_dt(value: Any) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except (ValueError, TypeError):
+        return None
+
+
+class _Cell:
+    __slots__ = ("prs_opened", "prs_merged", "lead_time_sum_h", "pr_size_sum",
+                 "cards_created", "cards_resolved", "bugs_resolved", "lead_times", "pr_sizes")
+
+    def __init__(self):
+        self.prs_opened = 0
+        self.prs_merged = 0
+        self.lead_time_sum_h = 0.0
+        self.pr_size_sum = 0.0
+        self.cards_created = 0
+        self.cards_resolved = 0
+        self.bugs_resolved = 0
+        self.lead_times: List[float] = []
+        self.pr_sizes: List[float] = []
+
+
+def _pr_dimension_values(raw: Dict[str, Any], repo_name: Optional[str]) -> Iterable[Tuple[str, str]]:
+    values = {"repo": repo_name, "author": raw.get("user"), "base_branch": raw.get("base_ref")}
+    return [(dim, str(v)) for dim, v in values.items() if v]
+
+
+def _card_dimension_values(raw: Dict[str, Any], list_name: Optional[str]) -> Iterable[Tuple[str, str]]:
+    pairs = []
+    status = list_name or raw.get("status")
+    if status:
+        pairs.append(("trello_list", str(status)))
+    if raw.get("cardtype"):
+        pairs.append(("card_type", str(raw["cardtype"])))
+    for label in set(raw.get("labels") or []):
+        if label:
+            pairs.append(("label", str(label)))
+    return pairs
+
+
+def build_dimension_cells(
+    prs: Iterable[Tuple[Dict[str, Any], Optional[str]]],
+    cards: Iterable[Tuple[Dict[str, Any], Optional[str]]],
+    window_start: date,
+) -> Dict[CellKey, _Cell]:
+    """
+    Aggregate PR and card facts into (day, dimension, value) cells.
+
+    Args:
+        prs: (raw_data, repo name) pairs
+        cards: (raw_data, list name) pairs
+        window_start: first day to aggregate; earlier events are ignored
+
+    Returns:
+        Mapping of cell key to aggregated counters
+    """
+    cells: Dict[CellKey, _Cell] = defaultdict(_Cell)
+
+    for raw, repo_name in prs:
+        dims = _pr_dimension_values(raw, repo_name)
+        created_at = _parse_dt(raw.get("created_at"))
+        merged_at = _parse_dt(raw.get("merged_at"))
+
+        if created_at and created_at.date() >= window_start:
+            for dim, value in dims:
+                cells[(created_at.date(), dim, value)].prs_opened += 1
+
+        if merged_at and merged_at.date() >= window_start:
+            lead_time = (merged_at - created_at).total_seconds() / 3600 if created_at else None
+            size = raw.get("additions", 0) + raw.get("deletions", 0)
+            for dim, value in dims:
+                cell = cells[(merged_at.date(), dim, value)]
+                cell.prs_merged += 1
+                cell.pr_size_sum += size
+                cell.pr_sizes.append(size)
+                if lead_time is not None:
+                    cell.lead_time_sum_h += lead_time
+                    cell.lead_times.append(lead_time)
+
+    for raw, list_name in cards:
+        dims = _card_dimension_values(raw, list_name)
+        created = _parse_dt(raw.get("created"))
+        resolved = _parse_dt(raw.get("resolutiondate"))
+        is_bug = (raw.get("cardtype") or "").lower() == "bug"
+
+        if created and created.date() >= window_start:
+            for dim, value in dims:
+                cells[(created.date(), dim, value)].cards_created += 1
+
+        if resolved and resolved.date() >= window_start:
+            for dim, value in dims:
+                cell = cells[(resolved.date(), dim, value)]
+                cell.cards_resolved += 1
+                if is_bug:
+                    cell.bugs_resolved += 1
+
+    return cells
+
+
+async def refresh_dimension_rollups(
+    session: AsyncSession,
+    workspace_id: str,
+    lookback_days: int = ROLLUP_LOOKBACK_DAYS,
+) -> int:
+    """
+    Recompute the rollup rows of the last `lookback_days` days for a workspace.
+
+    Only PRs/cards with an event inside the window are loaded (JSON filter in SQL).
+
+    Returns:
+        Number of rollup rows written
+    """
+    window_start = date.today() - timedelta(days=lookback_days)
+    since = window_start.isoformat()
+
+    pr_rows = await session.execute(
+        select(PullRequest.raw_data, Repo.name)
+        .join(Repo, Repo.id == PullRequest.repo_id)
+        .where(
+            PullRequest.workspace_id == workspace_id,
+            or_(
+                PullRequest.raw_data["created_at"].as_string() >= since,
+                PullRequest.raw_data["merged_at"].as_string() >= since,
+            ),
+        )
+    )
+    card_rows = await session.execute(
+        select(TrelloCard.raw_data, TrelloCard.list_name).where(
+            TrelloCard.workspace_id == workspace_id,
+            or_(
+                TrelloCard.raw_data["created"].as_string() >= since,
+                TrelloCard.raw_data["resolutiondate"].as_string() >= since,
+            ),
+        )
+    )
+
+    cells = build_dimension_cells(pr_rows.all(), card_rows.all(), window_start)
+
+    await session.execute(
+        delete(MetricDimensionDaily).where(
+            MetricDimensionDaily.workspace_id == workspace_id,
+            MetricDimensionDaily.day >= window_start,
+        )
+    )
+    session.add_all([
+        MetricDimensionDaily(
+            workspace_id=workspace_id,
+            day=day,
+            dimension=dim,
+            dimension_value=value,
+            prs_opened=cell.prs_opened,
+            prs_merged=cell.prs_merged,
+            lead_time_sum_h=cell.lead_time_sum_h,
+            pr_size_sum=cell.pr_size_sum,
+            cards_created=cell.cards_created,
+            cards_resolved=cell.cards_resolved,
+            bugs_resolved=cell.bugs_resolved,
+            lead_time_sketch=QuantileSketch().add(cell.lead_times).to_bytes() if cell.lead_times else None,
+            pr_size_sketch=QuantileSketch().add(cell.pr_sizes).to_bytes() if cell.pr_sizes else None,
+        )
+        for (day, dim, value), cell in cells.items()
+    ])
+    await session.commit()
+    return len(cells)
+
+
+def serialize_dimension_row(row: MetricDimensionDaily) -> Dict[str, Any]:
+    """API shape of a rollup row; sketches are reduced to percentiles."""
+    lead = QuantileSketch.from_bytes(row.lead_time_sketch)
+    size = QuantileSketch.from_bytes(row.pr_size_sketch)
+    return {
+        "day": row.day,
+        "dimension": row.dimension,
+        "dimension_value": row.dimension_value,
+        "prs_opened": row.prs_opened,
+        "prs_merged": row.prs_merged,
+        "cards_created": row.cards_created,
+        "cards_resolved": row.cards_resolved,
+        "bugs_resolved": row.bugs_resolved,
+        "bug_ratio": (row.bugs_resolved / row.cards_resolved) if row.cards_resolved else 0,
+        "lead_time_avg": (row.lead_time_sum_h / row.prs_merged) if row.prs_merged else None,
+        "lead_time_p50": lead.quantile(0.5),
+        "lead_time_p85": lead.quantile(0.85),
+        "pr_size_p50": size.quantile(0.5),
+    }
+
+
+async def query_dimension_rollups(
+    session: AsyncSession,
+    workspace_id: str,
+    dimension: str,
+    value: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    limit: int = 500,
+) -> List[Dict[str, Any]]:
+    """Filtered drill-down over the rollup table (served by its unique index)."""
+    query = select(MetricDimensionDaily).where(
+        MetricDimensionDaily.workspace_id == workspace_id,
+        MetricDimensionDaily.dimension == dimension,
+    )
+    if value is not None:
+        query = query.where(MetricDimensionDaily.dimension_value == value)
+    if start is not None:
+        query = query.where(MetricDimensionDaily.day >= start)
+    if end is not None:
+        query = query.where(MetricDimensionDaily.day <= end)
+    query = query.order_by(MetricDimensionDaily.day.desc(), MetricDimensionDaily.dimension_value).limit(limit)
+
+    result = await session.execute(query)
+    return [serialize_dimension_row(row) for row in result.scalars().all()]
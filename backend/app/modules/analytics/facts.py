@@ -0,0 +1,312 @@
+"""
+Per-process columnar cache of PR and card facts, one entry per workspace.
+
+Metrics, forecasts and hotspots all need the same few fields out of the
+`raw_data` JSON. Instead of each of them querying and decoding it, the
+fields are extracted once into NumPy arrays (timestamps as epoch seconds,
+NaN when missing; categorical values as integer codes into a vocabulary).
+
+Entries load lazily, refresh incrementally from the rows' `synced_at`
+watermark and are evicted LRU once the resident size exceeds
+FACT_CACHE_MAX_BYTES. The watermark only sees inserts and updates: each
+incremental refresh also compares the row counts with the database, and
+reloads the workspace from scratch when rows were deleted there (e.g. with
+a removed integration).
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from prometheus_client import Counter, Gauge
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import logging
+from app.modules.integrations.models import PullRequest, TrelloCard
+
+logger = logging.getLogger(__name__)
+
+FACT_CACHE_REQUESTS = Counter("fact_cache_requests_total", "Fact cache lookups", ["result"])
+FACT_CACHE_RESIDENT_BYTES = Gauge("fact_cache_resident_bytes", "Bytes held by the fact cache")
+
+# Re-read rows committed slightly after a refresh but stamped before it
+REFRESH_OVERLAP = timedelta(minutes=5)
+
+PR_STATE_OPEN, PR_STATE_CLOSED, PR_STATE_MERGED = 0, 1, 2
+DONE_STATUSES = ("done", "resolved", "closed", "complete")
+
+
+def parse_timestamp(value: Any) -> float:
+    """ISO-8601 string -> epoch seconds (naive values are taken as UTC), NaN if missing."""
+    if not value:
+        return np.nan
+    try:
+        dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except (ValueError, TypeError):
+        return np.nan
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+class _Vocabulary:
+    """String <-> int code mapping for categorical columns."""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def code(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, value: str) -> int:
+        return self._codes.get(value, -1)
+
+
+class _Table:
+    """Growable set of equally sized columns addressed by external id."""
+
+    def __init__(self, dtypes: Dict[str, Any]):
+        self.dtypes = dtypes
+        self.columns: Dict[str, np.ndarray] = {name: np.empty(0, dtype=dt) for name, dt in dtypes.items()}
+        self.index: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def upsert(self, rows: List[Dict[str, Any]]) -> None:
+        new_rows = []
+        for row in rows:
+            slot = self.index.get(row["external_id"])
+            if slot is None:
+                self.index[row["external_id"]] = len(self.index)
+                new_rows.append(row)
+            else:
+                for name in self.dtypes:
+                    self.columns[name][slot] = row[name]
+        if new_rows:
+            for name, dt in self.dtypes.items():
+                extra = np.fromiter((r[name] for r in new_rows), dtype=dt, count=len(new_rows))
+                self.columns[name] = np.concatenate([self.columns[name], extra])
+
+    @property
+    def nbytes(self) -> int:
+        # Arrays plus a rough per-key cost for the id index
+        return sum(col.nbytes for col in self.columns.values()) + 100 * len(self.index)
+
+
+class WorkspaceFacts:
+    """Columnar PR/card facts of a single workspace."""
+
+    def __init__(self, workspace_id: str):
+        self.workspace_id = workspace_id
+        self.refreshed_at = 0.0
+        self._reset()
+
+    def _reset(self) -> None:
+        self.authors = _Vocabulary()
+        self.statuses = _Vocabulary()
+        self.card_types = _Vocabulary()
+        self.prs = _Table({
+            "created": np.float64, "merged": np.float64, "closed": np.float64,
+            "size": np.int32, "state": np.int8, "author": np.int32,
+        })
+        self.cards = _Table({
+            "created": np.float64, "resolved": np.float64, "status": np.int32, "card_type": np.int32,
+        })
+        self.watermark: Optional[datetime] = None
+
+    # Column shortcuts used by the analytics code
+    @property
+    def pr_created(self) -> np.ndarray:
+        return self.prs.columns["created"]
+
+    @property
+    def pr_merged(self) -> np.ndarray:
+        return self.prs.columns["merged"]
+
+    @property
+    def pr_closed(self) -> np.ndarray:
+        return self.prs.columns["closed"]
+
+    @property
+    def pr_size(self) -> np.ndarray:
+        return self.prs.columns["size"]
+
+    @property
+    def card_created(self) -> np.ndarray:
+        return self.cards.columns["created"]
+
+    @property
+    def card_resolved(self) -> np.ndarray:
+        return self.cards.columns["resolved"]
+
+    def card_done_mask(self) -> np.ndarray:
+        done_codes = [i for i, s in enumerate(self.statuses.values) if s.lower() in DONE_STATUSES]
+        return np.isin(self.cards.columns["status"], done_codes)
+
+    def card_type_mask(self, card_type: str) -> np.ndarray:
+        codes = [i for i, t in enumerate(self.card_types.values) if t.lower() == card_type.lower()]
+        return np.isin(self.cards.columns["card_type"], codes)
+
+    @property
+    def nbytes(self) -> int:
+        return self.prs.nbytes + self.cards.nbytes
+
+    async def _row_counts(self, session: AsyncSession) -> Tuple[int, int]:
+        prs = select(func.count()).select_from(PullRequest).where(PullRequest.workspace_id == self.workspace_id)
+        cards = select(func.count()).select_from(TrelloCard).where(TrelloCard.workspace_id == self.workspace_id)
+        return (await session.execute(prs)).scalar_one(), (await session.execute(cards)).scalar_one()
+
+    async def refresh(self, session: AsyncSession) -> int:
+        """Pull rows synced since the watermark (all rows on first load)."""
+        since = self.watermark - REFRESH_OVERLAP if self.watermark else None
+
+        pr_query = select(
+            PullRequest.external_id,
+            PullRequest.synced_at,
+            PullRequest.raw_data["created_at"].as_string(),
+            PullRequest.raw_data["merged_at"].as_string(),
+            PullRequest.raw_data["closed_at"].as_string(),
+            PullRequest.raw_data["additions"].as_integer(),
+            PullRequest.raw_data["deletions"].as_integer(),
+            PullRequest.raw_data["user"].as_string(),
+        ).where(PullRequest.workspace_id == self.workspace_id)
+        card_query = select(
+            TrelloCard.external_id,
+            TrelloCard.synced_at,
+            TrelloCard.list_name,
+            TrelloCard.raw_data["created"].as_string(),
+            TrelloCard.raw_data["resolutiondate"].as_string(),
+            TrelloCard.raw_data["status"].as_string(),
+            TrelloCard.raw_data["cardtype"].as_string(),
+        ).where(TrelloCard.workspace_id == self.workspace_id)
+        if since is not None:
+            pr_query = pr_query.where(PullRequest.synced_at > since)
+            card_query = card_query.where(TrelloCard.synced_at > since)
+
+        pr_rows = (await session.execute(pr_query)).all()
+        card_rows = (await session.execute(card_query)).all()
+        self.load_rows(pr_rows, card_rows)
+
+        if since is not None and await self._row_counts(session) != (len(self.prs), len(self.cards)):
+            # Every row is resident after an incremental load unless some were deleted upstream
+            logger.info(f"Rows deleted for workspace={self.workspace_id}, reloading its facts")
+            self._reset()
+            return await self.refresh(session)
+        self.refreshed_at = time.monotonic()
+        return len(pr_rows) + len(card_rows)
+
+    def load_rows(self, pr_rows: Sequence[Sequence[Any]], card_rows: Sequence[Sequence[Any]]) -> None:
+        """
+        Upsert rows as selected by `refresh`:
+        (external_id, synced_at, created_at, merged_at, closed_at, additions, deletions, user) per PR,
+        (external_id, synced_at, list_name, created, resolutiondate, status, cardtype) per card.
+        """
+        self.prs.upsert([
+            {
+                "external_id": ext_id,
+                "created": parse_timestamp(created),
+                "merged": parse_timestamp(merged),
+                "closed": parse_timestamp(closed),
+                "size": (additions or 0) + (deletions or 0),
+                "state": PR_STATE_MERGED if merged else (PR_STATE_CLOSED if closed else PR_STATE_OPEN),
+                "author": self.authors.code(user),
+            }
+            for ext_id, _, created, merged, closed, additions, deletions, user in pr_rows
+        ])
+        self.cards.upsert([
+            {
+                "external_id": ext_id,
+                "created": parse_timestamp(created),
+                "resolved": parse_timestamp(resolved),
+                "status": self.statuses.code(status or list_name or ""),
+                "card_type": self.card_types.code(card_type or ""),
+            }
+            for ext_id, _, list_name, created, resolved, status, card_type in card_rows
+        ])
+
+        stamps = [row[1] for row in [*pr_rows, *card_rows] if row[1] is not None]
+        if stamps:
+            latest = max(stamps)
+            self.watermark = max(self.watermark, latest) if self.watermark else latest
+
+
+class FactCache:
+    """LRU cache of WorkspaceFacts bounded by resident bytes."""
+
+    def __init__(self, max_bytes: int, refresh_seconds: int):
+        self.max_bytes = max_bytes
+        self.refresh_seconds = refresh_seconds
+        self._entries: "OrderedDict[str, WorkspaceFacts]" = OrderedDict()
+        # Kept apart from the entries (and never dropped): a coroutine may be
+        # waiting on a workspace's lock while its entry is evicted
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    @property
+    def resident_bytes(self) -> int:
+        return sum(facts.nbytes for facts in self._entries.values())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, session: AsyncSession, workspace_id: str) -> WorkspaceFacts:
+        """Return the workspace facts, loading or topping them up as needed."""
+        workspace_id = str(workspace_id)
+        lock = self._locks.setdefault(workspace_id, asyncio.Lock())
+        async with lock:
+            facts = self._entries.get(workspace_id)
+            if facts is not None:
+                FACT_CACHE_REQUESTS.labels(result="hit").inc()
+                self._entries.move_to_end(workspace_id)
+                if time.monotonic() - facts.refreshed_at > self.refresh_seconds:
+                    await facts.refresh(session)
+                    self._evict()
+                return facts
+
+            FACT_CACHE_REQUESTS.labels(result="miss").inc()
+            facts = WorkspaceFacts(workspace_id)
+            await facts.refresh(session)
+            self._entries[workspace_id] = facts
+            self._evict()
+            return facts
+
+    async def refresh(self, session: AsyncSession, workspace_id: str) -> WorkspaceFacts:
+        """Incremental top-up after a sync; loads the workspace if it is not resident."""
+        workspace_id = str(workspace_id)
+        facts = self._entries.get(workspace_id)
+        if facts is None:
+            return await self.get(session, workspace_id)
+        async with self._locks.setdefault(workspace_id, asyncio.Lock()):
+            await facts.refresh(session)
+            self._evict()
+        return facts
+
+    def invalidate(self, workspace_id: str) -> None:
+        self._entries.pop(str(workspace_id), None)
+        FACT_CACHE_RESIDENT_BYTES.set(self.resident_bytes)
+
+    def _evict(self) -> None:
+        resident = self.resident_bytes
+        # Always keep the most recent entry, even if it alone exceeds the cap
+        while resident > self.max_bytes and len(self._entries) > 1:
+            workspace_id, facts = self._entries.popitem(last=False)
+            resident -= facts.nbytes
+            logger.info(f"Evicted facts for workspace={workspace_id} ({facts.nbytes} bytes)")
+        FACT_CACHE_RESIDENT_BYTES.set(resident)
+
+
+fact_cache = FactCache(
+    max_bytes=settings.FACT_CACHE_MAX_BYTES,
+    refresh_seconds=settings.FACT_CACHE_REFRESH_SECONDS,
+)
@@ -0,0 +1,127 @@
+"""
+Flow metrics from the card transition history.
+
+Transitions are turned into per-list intervals [entered, left) and kept as
+sorted start/end arrays (the interval index). For any set of query
+instants, the number of cards in a list is ``#starts <= t - #ends <= t``,
+which `np.searchsorted` answers for all instants in one merge-like sweep.
+Daily WIP, cumulative flow and per-stage cycle times for a date range
+therefore cost a single pass instead of one query per day.
+"""
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.modules.integrations.models import CardTransition
+
+CYCLE_TIME_PERCENTILES = (50, 85, 95)
+
+# (card id, from list, to list, epoch seconds)
+Transition = Tuple[str, Optional[str], str, float]
+
+
+class ListIntervalIndex:
+    """Sorted interval endpoints per list, built from a card transition log."""
+
+    def __init__(self, transitions: Iterable[Transition]):
+        by_card: Dict[str, List[Transition]] = defaultdict(list)
+        for t in transitions:
+            by_card[t[0]].append(t)
+
+        starts: Dict[str, List[float]] = defaultdict(list)
+        ends: Dict[str, List[float]] = defaultdict(list)
+        closed: Dict[str, List[Tuple[float, float]]] = defaultdict(list)
+
+        for moves in by_card.values():
+            moves.sort(key=lambda t: t[3])
+            current: Optional[Tuple[str, float]] = None
+            for _, _, to_list, ts in moves:
+                if current is not None:
+                    list_name, entered = current
+                    ends[list_name].append(ts)
+                    closed[list_name].append((ts, ts - entered))
+                starts[to_list].append(ts)
+                current = (to_list, ts)
+
+        self.lists = sorted(starts)
+        self._starts = {name: np.sort(np.asarray(starts[name], dtype=np.float64)) for name in self.lists}
+        self._ends = {name: np.sort(np.asarray(ends[name], dtype=np.float64)) for name in self.lists}
+        # Closed intervals ordered by exit time, for range-restricted cycle times
+        self._exit_times: Dict[str, np.ndarray] = {}
+        self._durations: Dict[str, np.ndarray] = {}
+        for name in self.lists:
+            pairs = np.asarray(sorted(closed[name]), dtype=np.float64).reshape(-1, 2)
+            self._exit_times[name] = pairs[:, 0]
+            self._durations[name] = pairs[:, 1]
+
+    def wip(self, instants: np.ndarray) -> Dict[str, np.ndarray]:
+        """Cards sitting in each list at each instant (epoch seconds)."""
+        return {
+            name: np.searchsorted(self._starts[name], instants, side="right")
+            - np.searchsorted(self._ends[name], instants, side="right")
+            for name in self.lists
+        }
+
+    def arrivals(self, instants: np.ndarray) -> Dict[str, np.ndarray]:
+        """Cumulative count of cards that ever entered each list up to each instant."""
+        return {name: np.searchsorted(self._starts[name], instants, side="right") for name in self.lists}
+
+    def cycle_times(
+        self,
+        start: float,
+        end: float,
+        percentiles: Iterable[int] = CYCLE_TIME_PERCENTILES,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Time spent per list (hours) for cards that left the list within [start, end]."""
+        stats = {}
+        for name in self.lists:
+            exits = self._exit_times[name]
+            lo = np.searchsorted(exits, start, side="left")
+            hi = np.searchsorted(exits, end, side="right")
+            durations = self._durations[name][lo:hi] / 3600
+            entry: Dict[str, Any] = {"count": int(durations.size)}
+            for p in percentiles:
+                entry[f"p{p}"] = float(np.percentile(durations, p)) if durations.size else None
+            stats[name] = entry
+        return stats
+
+
+def _end_of_day(day: date) -> float:
+    return datetime.combine(day, time.max, tzinfo=timezone.utc).timestamp()
+
+
+def compute_flow(index: ListIntervalIndex, start: date, end: date) -> Dict[str, Any]:
+    """Daily WIP per list, cumulative flow and per-stage cycle times for [start, end]."""
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    instants = np.array([_end_of_day(d) for d in days])
+    range_start = datetime.combine(start, time.min, tzinfo=timezone.utc).timestamp()
+
+    return {
+        "days": days,
+        "wip": {name: counts.tolist() for name, counts in index.wip(instants).items()},
+        "cumulative_flow": {name: counts.tolist() for name, counts in index.arrivals(instants).items()},
+        "cycle_time_hours": index.cycle_times(range_start, instants[-1]),
+    }
+
+
+async def load_interval_index(session: AsyncSession, workspace_id: str, until: date) -> ListIntervalIndex:
+    """Build the interval index from every transition up to the end of `until`."""
+    result = await session.execute(
+        select(
+            CardTransition.card_external_id,
+            CardTransition.from_list,
+            CardTransition.to_list,
+            CardTransition.occurred_at,
+        ).where(
+            CardTransition.workspace_id == workspace_id,
+            CardTransition.occurred_at <= datetime.combine(until, time.max, tzinfo=timezone.utc),
+        )
+    )
+    return ListIntervalIndex(
+        (card_id, from_list, to_list, occurred_at.timestamp())
+        for card_id, from_list, to_list, occurred_at in result.all()
+    )
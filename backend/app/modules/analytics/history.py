@@ -0,0 +1,121 @@
+"""
+Metric history as (workspace x day) matrices, and baseline statistics on them.
+
+One query loads the last BASELINE_DAYS of metrics_daily for many workspaces;
+each metric becomes a 2-D array whose last column is the evaluation day.
+Everything computed from it (z-scores, day-over-day changes) is vectorized
+across workspaces.
+"""
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.modules.analytics.models import MetricDaily
+from app.modules.analytics.rollups import METRIC_COLUMNS
+
+BASELINE_DAYS = 60
+EWMA_HALF_LIFE_DAYS = 14
+MIN_BASELINE_POINTS = 7
+# Flat histories (constant WIP, ...) would otherwise make any change infinitely anomalous
+STD_FLOOR_RATIO = 0.05
+STD_FLOOR = 1e-6
+
+
+@dataclass
+class MetricMatrix:
+    """Daily metrics of many workspaces, one (workspaces x days) array per metric."""
+    workspace_ids: List[str]
+    days: List[date]
+    values: Dict[str, np.ndarray]  # NaN where a workspace has no row (or a null) that day
+    present: np.ndarray  # True where a metrics_daily row exists
+
+
+def build_metric_matrix(rows: Iterable[Mapping[str, Any]], end: date, days: int = BASELINE_DAYS) -> MetricMatrix:
+    """
+    Args:
+        rows: mappings with workspace_id, day and any of the METRIC_COLUMNS
+        end: last day of the matrix (its last column)
+    """
+    rows = list(rows)
+    start = end - timedelta(days=days - 1)
+    workspace_ids = sorted({str(row["workspace_id"]) for row in rows})
+    ws_index = {ws: i for i, ws in enumerate(workspace_ids)}
+
+    values = {m: np.full((len(workspace_ids), days), np.nan) for m in METRIC_COLUMNS}
+    present = np.zeros((len(workspace_ids), days), dtype=bool)
+    for row in rows:
+        col = (row["day"] - start).days
+        if not 0 <= col < days:
+            continue
+        i = ws_index[str(row["workspace_id"])]
+        present[i, col] = True
+        for metric in METRIC_COLUMNS:
+            value = row.get(metric)
+            if value is not None:
+                values[metric][i, col] = value
+
+    return MetricMatrix(
+        workspace_ids=workspace_ids,
+        days=[start + timedelta(days=d) for d in range(days)],
+        values=values,
+        present=present,
+    )
+
+
+async def load_metric_matrix(
+    session: AsyncSession,
+    end: date,
+    workspace_ids: Optional[List[str]] = None,
+    days: int = BASELINE_DAYS,
+) -> MetricMatrix:
+    """One query for the metric history of all (or the given) workspaces."""
+    query = select(
+        MetricDaily.workspace_id,
+        MetricDaily.day,
+        *(getattr(MetricDaily, m) for m in METRIC_COLUMNS),
+    ).where(
+        MetricDaily.day > end - timedelta(days=days),
+        MetricDaily.day <= end,
+    )
+    if workspace_ids is not None:
+        query = query.where(MetricDaily.workspace_id.in_(workspace_ids))
+    result = await session.execute(query)
+    return build_metric_matrix(result.mappings().all(), end, days)
+
+
+def ewma_zscores(values: np.ndarray, half_life_days: float = EWMA_HALF_LIFE_DAYS) -> np.ndarray:
+    """
+    Per-row z-score of the last column against an EWMA mean/std of the earlier columns.
+
+    NaN cells are ignored; rows with fewer than MIN_BASELINE_POINTS baseline
+    values (or no current value) get NaN.
+    """
+    history, current = values[:, :-1], values[:, -1]
+    age = np.arange(history.shape[1])[::-1]
+    valid = ~np.isnan(history)
+    weights = np.where(valid, 0.5 ** (age / half_life_days), 0.0)
+    observed = np.where(valid, history, 0.0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        total = weights.sum(axis=1)
+        mean = (weights * observed).sum(axis=1) / total
+        var = (weights * (observed - mean[:, None]) ** 2).sum(axis=1) / total
+        std = np.maximum(np.maximum(np.sqrt(var), STD_FLOOR_RATIO * np.abs(mean)), STD_FLOOR)
+        z = (current - mean) / std
+    z[valid.sum(axis=1) < MIN_BASELINE_POINTS] = np.nan
+    return z
+
+
+def day_over_day_change(values: np.ndarray, present: np.ndarray) -> np.ndarray:
+    """Relative change of the last column vs. the latest earlier day with a row (NaN if none)."""
+    earlier = present[:, :-1]
+    n = earlier.shape[1]
+    last = n - 1 - np.argmax(earlier[:, ::-1], axis=1)
+    previous = values[np.arange(values.shape[0]), last]
+    previous[~earlier.any(axis=1)] = np.nan
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return values[:, -1] / previous - 1
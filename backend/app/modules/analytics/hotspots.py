@@ -0,0 +1,233 @@
+"""
+File-level change hotspots.
+
+Merged PR file lists are folded into a path trie (`hotspot_nodes`): every
+changed file bumps its own node and each ancestor directory. Co-changed
+file pairs go to `hotspot_cochanges`.
+
+Churn is tracked with *forward decay*: a change of weight w at time t is
+stored as ``w * 2 ** ((t - EPOCH) / half_life)``. Stored scores only grow,
+so updates are plain additive upserts, and sorting by the stored value is
+the same as sorting by churn decayed to "now". Top-N queries are an index
+scan on (workspace, repo, is_dir, score) instead of a scan over PRs.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from itertools import combinations
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, desc, func, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.modules.analytics.models import HotspotNode, HotspotCoChange
+
+EPOCH = datetime(2020, 1, 1, tzinfo=timezone.utc)
+HALF_LIVES_DAYS = {30: 30.0, 90: 90.0}
+
+# Large PRs (renames, vendoring) would add O(n^2) pairs for little signal
+COCHANGE_MAX_FILES = 30
+
+
+def forward_decay(weight: float, at: datetime, half_life_days: float) -> float:
+    """Weight scaled up by its age relative to EPOCH (see module docstring)."""
+    age_days = (at - EPOCH).total_seconds() / 86400
+    return weight * 2 ** (age_days / half_life_days)
+
+
+def decay_to_now(score: float, half_life_days: float, now: Optional[datetime] = None) -> float:
+    """Convert a stored forward-decayed score back to churn as seen at `now`."""
+    return score / forward_decay(1.0, now or datetime.now(timezone.utc), half_life_days)
+
+
+def path_prefixes(path: str) -> List[str]:
+    """'a/b/c.py' -> ['a', 'a/b', 'a/b/c.py']"""
+    parts = [p for p in path.strip("/").split("/") if p]
+    return ["/".join(parts[: i + 1]) for i in range(len(parts))]
+
+
+def _parent(path: str) -> Optional[str]:
+    return path.rsplit("/", 1)[0] if "/" in path else None
+
+
+def aggregate_pr_files(files: List[Dict[str, Any]]) -> Dict[str, Tuple[int, bool]]:
+    """
+    Fold a PR's file list into per-node (churn, is_dir), files and directories alike.
+
+    Args:
+        files: entries from the GitHub pull files endpoint
+            (`filename`, `additions`, `deletions`, `changes`)
+    """
+    nodes: Dict[str, List] = {}
+    for f in files:
+        filename = f.get("filename")
+        if not filename:
+            continue
+        churn = f.get("changes") or (f.get("additions", 0) + f.get("deletions", 0))
+        prefixes = path_prefixes(filename)
+        for i, prefix in enumerate(prefixes):
+            is_dir = i < len(prefixes) - 1
+            node = nodes.setdefault(prefix, [0, is_dir])
+            node[0] += churn
+    return {path: (churn, is_dir) for path, (churn, is_dir) in nodes.items()}
+
+
+async def ingest_pr_files(
+    session: AsyncSession,
+    workspace_id: str,
+    repo_id: str,
+    merged_at: datetime,
+    files: List[Dict[str, Any]],
+) -> int:
+    """
+    Add one merged PR's files to the hotspot trie and co-change table.
+
+    Nodes are upserted one depth level at a time so every row gets its parent id.
+
+    Returns:
+        Number of nodes touched
+    """
+    nodes = aggregate_pr_files(files)
+    if not nodes:
+        return 0
+    if merged_at.tzinfo is None:
+        merged_at = merged_at.replace(tzinfo=timezone.utc)
+
+    by_depth: Dict[int, List[str]] = defaultdict(list)
+    for path in nodes:
+        by_depth[path.count("/") + 1].append(path)
+
+    ids: Dict[str, int] = {}
+    for depth in sorted(by_depth):
+        values = []
+        for path in by_depth[depth]:
+            churn, is_dir = nodes[path]
+            values.append({
+                "workspace_id": workspace_id,
+                "repo_id": repo_id,
+                "path": path,
+                "parent_id": ids.get(_parent(path)),
+                "depth": depth,
+                "is_dir": is_dir,
+                "changes": 1,
+                "churn": churn,
+                "score_30": forward_decay(churn, merged_at, HALF_LIVES_DAYS[30]),
+                "score_90": forward_decay(churn, merged_at, HALF_LIVES_DAYS[90]),
+                "last_changed_at": merged_at,
+            })
+        stmt = pg_insert(HotspotNode).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[HotspotNode.repo_id, HotspotNode.path],
+            set_={
+                "changes": HotspotNode.changes + stmt.excluded.changes,
+                "churn": HotspotNode.churn + stmt.excluded.churn,
+                "score_30": HotspotNode.score_30 + stmt.excluded.score_30,
+                "score_90": HotspotNode.score_90 + stmt.excluded.score_90,
+                "last_changed_at": func.greatest(HotspotNode.last_changed_at, stmt.excluded.last_changed_at),
+            },
+        ).returning(HotspotNode.id, HotspotNode.path)
+        result = await session.execute(stmt)
+        ids.update({path: node_id for node_id, path in result.all()})
+
+    file_ids = sorted(ids[p] for p, (_, is_dir) in nodes.items() if not is_dir)
+    if 1 < len(file_ids) <= COCHANGE_MAX_FILES:
+        weight = forward_decay(1.0, merged_at, HALF_LIVES_DAYS[90])
+        pairs = [
+            {"node_a_id": a, "node_b_id": b, "repo_id": repo_id, "count": 1,
+             "score_90": weight, "last_changed_at": merged_at}
+            for a, b in combinations(file_ids, 2)
+        ]
+        stmt = pg_insert(HotspotCoChange).values(pairs)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[HotspotCoChange.node_a_id, HotspotCoChange.node_b_id],
+            set_={
+                "count": HotspotCoChange.count + 1,
+                "score_90": HotspotCoChange.score_90 + stmt.excluded.score_90,
+                "last_changed_at": func.greatest(HotspotCoChange.last_changed_at, stmt.excluded.last_changed_at),
+            },
+        )
+        await session.execute(stmt)
+
+    return len(ids)
+
+
+async def top_hotspots(
+    session: AsyncSession,
+    workspace_id: str,
+    repo_id: Optional[str] = None,
+    window_days: int = 30,
+    directories: bool = False,
+    limit: int = 20,
+) -> List[Dict[str, Any]]:
+    """
+    Top N files (or directories) by decayed churn, changed within the window.
+
+    Args:
+        window_days: 30 or 90; selects the half-life and the recency cut-off
+    """
+    if window_days not in HALF_LIVES_DAYS:
+        raise ValueError(f"window_days must be one of {sorted(HALF_LIVES_DAYS)}")
+    score_col = HotspotNode.score_30 if window_days == 30 else HotspotNode.score_90
+    now = datetime.now(timezone.utc)
+
+    query = select(HotspotNode).where(
+        HotspotNode.workspace_id == workspace_id,
+        HotspotNode.is_dir == directories,
+        HotspotNode.last_changed_at >= now - timedelta(days=window_days),
+    )
+    if repo_id is not None:
+        query = query.where(HotspotNode.repo_id == repo_id)
+    result = await session.execute(query.order_by(desc(score_col)).limit(limit))
+
+    return [
+        {
+            "path": node.path,
+            "repo_id": node.repo_id,
+            "is_dir": node.is_dir,
+            "changes": node.changes,
+            "churn": node.churn,
+            "score": decay_to_now(getattr(node, score_col.key), HALF_LIVES_DAYS[window_days], now),
+            "last_changed_at": node.last_changed_at,
+        }
+        for node in result.scalars().all()
+    ]
+
+
+async def co_changed_files(
+    session: AsyncSession,
+    workspace_id: str,
+    repo_id: str,
+    path: str,
+    limit: int = 10,
+) -> List[Dict[str, Any]]:
+    """Files most often changed together with `path` (decayed, 90-day half-life)."""
+    node_id = (await session.execute(
+        select(HotspotNode.id).where(
+            HotspotNode.workspace_id == workspace_id,
+            HotspotNode.repo_id == repo_id,
+            HotspotNode.path == path,
+        )
+    )).scalar()
+    if node_id is None:
+        return []
+
+    result = await session.execute(
+        select(HotspotCoChange)
+        .where(or_(HotspotCoChange.node_a_id == node_id, HotspotCoChange.node_b_id == node_id))
+        .order_by(desc(HotspotCoChange.score_90))
+        .limit(limit)
+    )
+    pairs = result.scalars().all()
+    other_ids = [p.node_b_id if p.node_a_id == node_id else p.node_a_id for p in pairs]
+    paths = dict((await session.execute(
+        select(HotspotNode.id, HotspotNode.path).where(HotspotNode.id.in_(other_ids))
+    )).all()) if other_ids else {}
+
+    return [
+        {
+            "path": paths.get(other_id),
+            "count": pair.count,
+            "score": decay_to_now(pair.score_90, HALF_LIVES_DAYS[90]),
+        }
+        for pair, other_id in zip(pairs, other_ids)
+    ]
@@ -1,4 +1,4 @@
-from sqlalchemy import String, ForeignKey, Float, Date, JSON
+from sqlalchemy import String, ForeignKey, Float, Date, DateTime, JSON, Integer, BigInteger, SmallInteger, Boolean, LargeBinary, UniqueConstraint, Index, func
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
@@ -7,9 +7,16 @@ from app.db.models import Base
 
 class MetricDaily(Base):
     __tablename__ = "metrics_daily"
+    __table_args__ = (
+        # Metric watermark lookup (ETags of /analytics/metrics)
+        Index("ix_metrics_daily_workspace_updated_at", "workspace_id", "updated_at"),
+        Index("ix_metrics_daily_workspace_day", "workspace_id", "day"),
+        # Monthly partitions, see app/db/partitions.py
+        {"postgresql_partition_by": "RANGE (day)"},
+    )
     
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    day: Mapped[datetime.date] = mapped_column(Date, index=True)
+    day: Mapped[datetime.date] = mapped_column(Date, primary_key=True, index=True)
     
     lead_time_p50: Mapped[float] = mapped_column(Float, nullable=True)
     lead_time_p85: Mapped[float] = mapped_column(Float, nullable=True)
@@ -18,15 +25,114 @@ class MetricDaily(Base):
     review_time_p50: Mapped[float] = mapped_column(Float, nullable=True)
     bug_ratio: Mapped[float] = mapped_column(Float, nullable=True)
     pr_size_p50: Mapped[float] = mapped_column(Float, nullable=True)
+    updated_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     workspace_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("workspaces.id"))
 
 class RiskSignal(Base):
     __tablename__ = "risk_signals"
+    __table_args__ = (
+        # Latest signals per workspace, and the retention sweep
+        Index("ix_risk_signals_workspace_created_at", "workspace_id", "created_at"),
+        Index("ix_risk_signals_created_at", "created_at"),
+        # Monthly partitions, see app/db/partitions.py
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
     
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     type: Mapped[str] = mapped_column(String) # DELAY, OVERLOAD, INSTABILITY
     score: Mapped[float] = mapped_column(Float)
     explanation: Mapped[str] = mapped_column(String)
+    fingerprint: Mapped[str] = mapped_column(String, nullable=True)  # of the alert it feeds
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), primary_key=True, server_default=func.now())
     
     workspace_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("workspaces.id"))
+
+class MetricDimensionDaily(Base):
+    """Per-day rollup of PR/card facts sliced by one dimension (repo, author, ...)."""
+    __tablename__ = "metrics_dimension_daily"
+    __table_args__ = (
+        # Also serves the drill-down lookup: workspace + dimension + value + day range
+        UniqueConstraint("workspace_id", "dimension", "dimension_value", "day"),
+        Index("ix_metrics_dimension_daily_workspace_updated_at", "workspace_id", "updated_at"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    day: Mapped[datetime.date] = mapped_column(Date)
+    dimension: Mapped[str] = mapped_column(String) # repo, author, base_branch, trello_list, card_type, label
+    dimension_value: Mapped[str] = mapped_column(String)
+
+    prs_opened: Mapped[int] = mapped_column(Integer, default=0)
+    prs_merged: Mapped[int] = mapped_column(Integer, default=0)
+    lead_time_sum_h: Mapped[float] = mapped_column(Float, default=0.0)
+    pr_size_sum: Mapped[float] = mapped_column(Float, default=0.0)
+    cards_created: Mapped[int] = mapped_column(Integer, default=0)
+    cards_resolved: Mapped[int] = mapped_column(Integer, default=0)
+    bugs_resolved: Mapped[int] = mapped_column(Integer, default=0)
+    lead_time_sketch: Mapped[bytes] = mapped_column(LargeBinary, nullable=True)
+    pr_size_sketch: Mapped[bytes] = mapped_column(LargeBinary, nullable=True)
+    # Rows are rewritten on every rollup: the drill-down ETag watermark
+    updated_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    workspace_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("workspaces.id"))
+
+class HotspotNode(Base):
+    """
+    One file or directory of a repo in the change-hotspot trie.
+
+    Scores are forward-decayed churn (see analytics/hotspots.py): they only ever
+    grow on write, yet ordering by them equals ordering by decayed churn "now".
+    Integer ids keep the node and co-change tables compact on large monorepos.
+    """
+    __tablename__ = "hotspot_nodes"
+    __table_args__ = (
+        UniqueConstraint("repo_id", "path"),
+        Index("ix_hotspot_nodes_top_30", "workspace_id", "repo_id", "is_dir", "score_30"),
+        Index("ix_hotspot_nodes_top_90", "workspace_id", "repo_id", "is_dir", "score_90"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    path: Mapped[str] = mapped_column(String)
+    parent_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("hotspot_nodes.id"), nullable=True)
+    depth: Mapped[int] = mapped_column(SmallInteger)
+    is_dir: Mapped[bool] = mapped_column(Boolean, default=False)
+
+    changes: Mapped[int] = mapped_column(Integer, default=0)
+    churn: Mapped[int] = mapped_column(BigInteger, default=0)
+    score_30: Mapped[float] = mapped_column(Float, default=0.0)
+    score_90: Mapped[float] = mapped_column(Float, default=0.0)
+    last_changed_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    repo_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("repos.id"))
+    workspace_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("workspaces.id"))
+
+class HotspotCoChange(Base):
+    """Files changed together in the same PR (node_a_id < node_b_id)."""
+    __tablename__ = "hotspot_cochanges"
+    __table_args__ = (
+        Index("ix_hotspot_cochanges_node_b", "node_b_id"),
+    )
+
+    node_a_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("hotspot_nodes.id"), primary_key=True)
+    node_b_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("hotspot_nodes.id"), primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, default=0)
+    score_90: Mapped[float] = mapped_column(Float, default=0.0)
+    last_changed_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    repo_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("repos.id"))
+
+class RiskRule(Base):
+    """Workspace risk rule; `spec` is the rule language of analytics/rules.py."""
+    __tablename__ = "risk_rules"
+    __table_args__ = (
+        # Same name as a built-in rule (delay, overload, instability) overrides it
+        UniqueConstraint("workspace_id", "name"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    name: Mapped[str] = mapped_column(String)
+    spec: Mapped[dict] = mapped_column(JSON)
+    enabled: Mapped[bool] = mapped_column(Boolean, default=True)
+    updated_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    workspace_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("workspaces.id"))
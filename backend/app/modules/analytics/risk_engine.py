@@ -1,76 +1,117 @@
+"""
+Risk detection over the daily metric history.
+
+Every workspace is evaluated in one pass: a single query loads the last
+BASELINE_DAYS of metrics_daily into (workspace x day) matrices (see
+analytics/history.py), and the risk rules (analytics/rules.py) run over
+them as array operations.
+
+The built-in rules compare today's value with an exponentially weighted
+baseline of the days before it; a metric is anomalous when its z-score
+passes 2. They pair anomalies the way the original rules did:
+
+- DELAY: throughput down and lead time p85 up
+- OVERLOAD: WIP up and lead time p50 up
+- INSTABILITY: bug ratio up, and above 20%
+
+Workspaces can override them through `risk_rules`. RISK_ENGINE_MODE=legacy
+swaps the built-in set for the original day-over-day rules (10% thresholds
+between the last two rows).
+"""
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
-from app.modules.analytics.models import MetricDaily, RiskSignal
-from app.modules.alerts.models import Alert
-from datetime import date
 
-async def compute_risks(session: AsyncSession, workspace_id: str):
-    # Fetch recent metrics
-    result = await session.execute(
-        select(MetricDaily)
-        .where(MetricDaily.workspace_id == workspace_id)
-        .order_by(desc(MetricDaily.day))
-        .limit(2) 
-    )
-    metrics = result.scalars().all()
-    
-    if not metrics:
-        return
-
-    today_metric = metrics[0]
-    prev_metric = metrics[1] if len(metrics) > 1 else None
-    
-    risks = []
-    
-    # DELAY: Throughput down AND Lead Time P85 up
-    if prev_metric:
-        if today_metric.throughput < prev_metric.throughput * 0.9 and today_metric.lead_time_p85 > prev_metric.lead_time_p85 * 1.1:
-            risks.append({
-                "type": "DELAY",
-                "score": 0.8,
-                "explanation": "Delivery slowing down: Throughput dropped while Lead Time increased."
-            })
-
-    # OVERLOAD: WIP high AND Lead Time up
-    if prev_metric:
-        if today_metric.wip > prev_metric.wip * 1.1 and today_metric.lead_time_p50 > prev_metric.lead_time_p50 * 1.1:
-             risks.append({
-                "type": "OVERLOAD",
-                "score": 0.9,
-                "explanation": "Team potentially overloaded: WIP and Lead Time both increasing."
-            })
-            
-    # INSTABILITY: Bug Ratio high
-    if today_metric.bug_ratio > 0.2: # > 20% bugs
-        risks.append({
-            "type": "INSTABILITY",
-            "score": 0.7 + (today_metric.bug_ratio - 0.2),
-            "explanation": f"High bug ratio detected: {today_metric.bug_ratio:.1%} of resolved issues are bugs."
-        })
-
-    # Clear old risks/alerts for today? Or just append?
-    # For MVP, appending simple risks
-    existing_risks = await session.execute(select(RiskSignal).where(RiskSignal.workspace_id == workspace_id)) # Should filter by date or active
-    # Let's just create new ones
-    
-    for r in risks:
-        # Save Risk
-        signal = RiskSignal(
-            workspace_id=workspace_id,
-            type=r["type"],
-            score=r["score"],
-            explanation=r["explanation"]
-        )
-        session.add(signal)
-        
-        # Create Alert
-        alert = Alert(
-            workspace_id=workspace_id,
-            severity="HIGH" if r["score"] > 0.8 else "MEDIUM",
-            title=f"Risk Detected: {r['type']}",
-            history=r["explanation"],
-            status="NEW"
-        )
-        session.add(alert)
-        
+from app.core.config import settings
+from app.core.logging import logging
+from app.modules.analytics.history import MetricMatrix, load_metric_matrix
+from app.modules.analytics.models import RiskRule, RiskSignal
+from app.modules.analytics.rules import CompiledRule, RiskList, RuleError, compile_rule, default_rules, evaluate_rules
+from app.modules.alerts.service import AlertService, alert_fingerprint
+
+logger = logging.getLogger(__name__)
+alert_service = AlertService()
+
+
+def detect_risks(matrix: MetricMatrix) -> Dict[str, RiskList]:
+    """Built-in baseline (EWMA z-score) rules for every workspace of the matrix."""
+    rules = list(default_rules("baseline").values())
+    return evaluate_rules(matrix, {ws: rules for ws in matrix.workspace_ids})
+
+
+def legacy_risks(matrix: MetricMatrix) -> Dict[str, RiskList]:
+    """The original rules: latest row vs. the row before it, fixed thresholds."""
+    rules = list(default_rules("legacy").values())
+    return evaluate_rules(matrix, {ws: rules for ws in matrix.workspace_ids})
+
+
+async def load_workspace_rules(
+    session: AsyncSession,
+    workspace_ids: List[str],
+    mode: str = "baseline",
+) -> Dict[str, List[CompiledRule]]:
+    """
+    Effective rule set per workspace: built-in rules, replaced or disabled by
+    the workspace's own rules of the same name, plus its additional rules.
+    """
+    defaults = default_rules(mode)
+    result = await session.execute(select(RiskRule).where(RiskRule.workspace_id.in_(workspace_ids)))
+    overrides: Dict[str, Dict[str, Optional[CompiledRule]]] = {}
+    for rule in result.scalars().all():
+        compiled = None
+        if rule.enabled:
+            try:
+                compiled = compile_rule(rule.name, rule.spec)
+            except RuleError as e:
+                logger.warning(f"Skipping invalid risk rule {rule.id} ({rule.name}): {e}")
+                continue
+        overrides.setdefault(str(rule.workspace_id), {})[rule.name] = compiled
+
+    effective = {}
+    for workspace_id in workspace_ids:
+        rules = {**defaults, **overrides.get(workspace_id, {})}
+        effective[workspace_id] = [rule for rule in rules.values() if rule is not None]
+    return effective
+
+
+async def compute_risks_batch(session: AsyncSession, workspace_ids: Optional[List[str]] = None) -> int:
+    """
+    Evaluate risks for all (or the given) workspaces, store signals and upsert alerts.
+
+    Returns:
+        Number of signals created
+    """
+    matrix = await load_metric_matrix(session, date.today(), workspace_ids)
+    rules = await load_workspace_rules(session, matrix.workspace_ids, settings.RISK_ENGINE_MODE)
+    risks_by_workspace = evaluate_rules(matrix, rules)
+
+    now = datetime.now(timezone.utc)
+    evaluated = [ws for i, ws in enumerate(matrix.workspace_ids) if matrix.present[i, -1]]
+    counts = await alert_service.sync_risk_alerts(session, risks_by_workspace, evaluated, now)
+
+    created = 0
+    for workspace_id, risks in risks_by_workspace.items():
+        for r in risks:
+            session.add(RiskSignal(
+                workspace_id=workspace_id,
+                type=r["type"],
+                score=r["score"],
+                explanation=r["explanation"],
+                fingerprint=alert_fingerprint(workspace_id, r["type"], now),
+                created_at=now,
+            ))
+            created += 1
+
     await session.commit()
+    logger.info(
+        f"Risk evaluation ({settings.RISK_ENGINE_MODE}): {created} signals over {len(matrix.workspace_ids)} workspaces, "
+        f"alerts created={counts['created']} updated={counts['updated']} resolved={counts['resolved']}"
+    )
+    return created
+
+
+async def compute_risks(session: AsyncSession, workspace_id: str):
+    """Single-workspace evaluation (manual syncs)."""
+    return await compute_risks_batch(session, [workspace_id])
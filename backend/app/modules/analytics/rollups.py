@@ -0,0 +1,132 @@
+"""
+Materialized dashboard rollups (Postgres materialized views).
+
+The views are created by migration 006_dashboard_rollups and refreshed
+CONCURRENTLY at the end of each sync, so readers keep seeing the previous
+snapshot while a refresh runs. They are mapped on their own MetaData so
+Alembic autogenerate never mistakes them for tables.
+"""
+import json
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+from sqlalchemy import Column, Date, DateTime, Float, Integer, MetaData, String, Table, desc, select, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.core.logging import logging
+
+logger = logging.getLogger(__name__)
+
+views_metadata = MetaData()
+
+METRIC_COLUMNS = (
+    "lead_time_p50", "lead_time_p85", "wip", "throughput",
+    "review_time_p50", "bug_ratio", "pr_size_p50",
+)
+
+
+def _metrics_view(name: str) -> Table:
+    return Table(
+        name,
+        views_metadata,
+        Column("workspace_id", UUID(as_uuid=True), primary_key=True),
+        Column("period_start", Date, primary_key=True),
+        Column("last_day", Date),
+        Column("days", Integer),
+        *[Column(col, Float) for col in METRIC_COLUMNS],
+        # Latest metrics_daily.updated_at folded into the period (series watermark)
+        Column("updated_at", DateTime(timezone=True)),
+    )
+
+
+metrics_weekly = _metrics_view("metrics_weekly")
+metrics_monthly = _metrics_view("metrics_monthly")
+
+risk_counts = Table(
+    "risk_counts_by_type",
+    views_metadata,
+    Column("workspace_id", UUID(as_uuid=True), primary_key=True),
+    Column("type", String, primary_key=True),
+    Column("signals", Integer),
+    Column("avg_score", Float),
+    Column("max_score", Float),
+)
+
+METRIC_VIEWS = {"week": metrics_weekly, "month": metrics_monthly}
+DASHBOARD_VIEWS = (metrics_weekly, metrics_monthly, risk_counts)
+
+
+async def refresh_dashboard_rollups(session: AsyncSession) -> None:
+    """Refresh every dashboard view without blocking concurrent readers."""
+    for view in DASHBOARD_VIEWS:
+        await session.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view.name}"))
+        await session.commit()
+    logger.info("Dashboard rollups refreshed")
+
+
+def metric_rollup_query(
+    workspace_id: str,
+    resolution: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    limit: Optional[int] = None,
+    columns: Optional[Sequence[str]] = None,
+) -> Select:
+    """
+    Rows of the weekly/monthly view for a workspace, newest period first.
+
+    Args:
+        columns: metric columns to return alongside the period bounds (all by default)
+    """
+    view = METRIC_VIEWS[resolution]
+    if columns is None:
+        query = select(view)
+    else:
+        query = select(view.c.period_start, view.c.last_day, view.c.days, *(view.c[col] for col in columns))
+    query = query.where(view.c.workspace_id == workspace_id)
+    if start is not None:
+        query = query.where(view.c.last_day >= start)
+    if end is not None:
+        query = query.where(view.c.period_start <= end)
+    query = query.order_by(desc(view.c.period_start))
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+def risk_counts_query(workspace_id: str) -> Select:
+    return select(risk_counts).where(risk_counts.c.workspace_id == workspace_id).order_by(risk_counts.c.type)
+
+
+async def get_metric_rollups(session: AsyncSession, workspace_id: str, resolution: str, **filters) -> List[Dict[str, Any]]:
+    result = await session.execute(metric_rollup_query(workspace_id, resolution, **filters))
+    return [dict(row) for row in result.mappings().all()]
+
+
+async def get_risk_counts(session: AsyncSession, workspace_id: str) -> List[Dict[str, Any]]:
+    result = await session.execute(risk_counts_query(workspace_id))
+    return [dict(row) for row in result.mappings().all()]
+
+
+def _plan_relations(node: Dict[str, Any], found: Set[str]) -> Set[str]:
+    if "Relation Name" in node:
+        found.add(node["Relation Name"])
+    for child in node.get("Plans", []):
+        _plan_relations(child, found)
+    return found
+
+
+async def explain_relations(session: AsyncSession, query: Select) -> Set[str]:
+    """
+    Names of the relations a query's plan reads, via EXPLAIN (FORMAT JSON).
+
+    Used to check that dashboard queries hit the rollups, not the base tables.
+    """
+    compiled = query.compile(dialect=session.bind.dialect, compile_kwargs={"literal_binds": True})
+    result = await session.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}"))
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return _plan_relations(plan[0]["Plan"], set())
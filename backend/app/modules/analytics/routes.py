@@ -1,36 +1,226 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc
-from typing import List, Any
+from typing import List, Any, Optional
+from uuid import UUID
+from datetime import date, timedelta
+from app.core.cache import response_cache
+from app.core.executor import compute_executor
+from app.core.config import settings
+from app.core.errors import EntityNotFound
+from app.core.etag import strong_etag, etag_matches, not_modified, json_with_etag
 from app.db.session import get_db
-from app.modules.users.routes import get_current_active_user
+from app.modules.users.routes import get_current_active_user, get_current_admin_user
 from app.modules.users.schemas import User
-from app.modules.analytics.models import MetricDaily, RiskSignal
+from app.modules.analytics.models import RiskSignal, RiskRule
+from app.modules.analytics.schemas import RiskRule as RiskRuleSchema, RiskRuleCreate, RiskRuleUpdate
+from app.modules.analytics.rules import RuleError, compile_rule, default_rule_specs
+from app.modules.analytics.cube import DIMENSIONS, query_dimension_rollups
+from app.modules.analytics.rollups import get_risk_counts
+from app.modules.analytics.timeseries import RESOLUTIONS, DEFAULT_POINTS, MAX_POINTS, parse_fields, get_metric_series, metric_watermark, dimension_watermark
+from app.modules.analytics.flow import load_interval_index, compute_flow
+from app.modules.analytics.hotspots import HALF_LIVES_DAYS, top_hotspots, co_changed_files
 
 router = APIRouter()
 
 @router.get("/metrics", response_model=List[Any]) # Pydantic schema simplified
 async def get_metrics(
+    resolution: str = "day",
+    from_: Optional[date] = Query(None, alias="from"),
+    to: Optional[date] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated metric columns (all by default)"),
+    dimension: Optional[str] = None,
+    value: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
-    result = await db.execute(
-        select(MetricDaily)
-        .where(MetricDaily.workspace_id == current_user.workspace_id)
-        .order_by(desc(MetricDaily.day))
-        .limit(30)
+    workspace_id = str(current_user.workspace_id)
+    if from_ is not None and to is not None and from_ > to:
+        raise HTTPException(status_code=400, detail="from must be <= to")
+    if dimension is not None and dimension not in DIMENSIONS:
+        raise HTTPException(status_code=400, detail=f"Unknown dimension, expected one of {list(DIMENSIONS)}")
+    if dimension is None and resolution not in RESOLUTIONS:
+        raise HTTPException(status_code=400, detail=f"resolution must be one of {list(RESOLUTIONS)}")
+    try:
+        selected = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    limit = DEFAULT_POINTS if from_ is None and to is None else MAX_POINTS
+
+    if dimension is not None:
+        watermark = await dimension_watermark(db, workspace_id)
+    else:
+        watermark = await metric_watermark(db, workspace_id, resolution)
+    etag = strong_etag(
+        workspace_id, watermark.isoformat() if watermark else None,
+        resolution, ",".join(selected), from_, to, limit, dimension, value,
     )
-    return result.scalars().all()
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    async def load(session: AsyncSession):
+        if dimension is not None:
+            # Drill-down: served from the pre-aggregated dimensional rollups
+            return await query_dimension_rollups(session, workspace_id, dimension, value, from_, to)
+        # Week/month points come from the materialized rollups refreshed after each sync
+        return await get_metric_series(session, workspace_id, resolution, fields=selected, start=from_, end=to, limit=limit)
+
+    # The ETag already covers the watermark and every normalized parameter
+    rows = await response_cache.get_or_compute(workspace_id, "analytics.metrics", {"etag": etag}, load)
+    return json_with_etag(rows, etag)
 
 @router.get("/risks", response_model=List[Any])
 async def get_risks(
+    current_user: User = Depends(get_current_active_user)
+):
+    async def load(session: AsyncSession):
+        result = await session.execute(
+            select(RiskSignal)
+            .where(RiskSignal.workspace_id == current_user.workspace_id)
+            .order_by(desc(RiskSignal.created_at))
+            .limit(10)
+        )
+        return [
+            {"id": r.id, "type": r.type, "score": r.score, "explanation": r.explanation, "created_at": r.created_at}
+            for r in result.scalars().all()
+        ]
+
+    return await response_cache.get_or_compute(str(current_user.workspace_id), "analytics.risks", {}, load)
+
+@router.get("/risks/summary", response_model=List[Any])
+async def get_risk_summary(
+    current_user: User = Depends(get_current_active_user)
+):
+    workspace_id = str(current_user.workspace_id)
+    return await response_cache.get_or_compute(
+        workspace_id, "analytics.risks.summary", {}, lambda session: get_risk_counts(session, workspace_id)
+    )
+
+@router.get("/hotspots", response_model=List[Any])
+async def get_hotspots(
+    repo_id: Optional[UUID] = None,
+    window_days: int = 30,
+    directories: bool = False,
+    limit: int = Query(20, ge=1, le=200),
+    current_user: User = Depends(get_current_active_user)
+):
+    if window_days not in HALF_LIVES_DAYS:
+        raise HTTPException(status_code=400, detail=f"window_days must be one of {sorted(HALF_LIVES_DAYS)}")
+    workspace_id = str(current_user.workspace_id)
+    repo = str(repo_id) if repo_id else None
+    return await response_cache.get_or_compute(
+        workspace_id, "analytics.hotspots",
+        {"repo_id": repo, "window_days": window_days, "directories": directories, "limit": limit},
+        lambda session: top_hotspots(session, workspace_id, repo, window_days, directories, limit),
+    )
+
+@router.get("/hotspots/cochanges", response_model=List[Any])
+async def get_hotspot_cochanges(
+    repo_id: UUID,
+    path: str,
+    limit: int = Query(10, ge=1, le=100),
+    current_user: User = Depends(get_current_active_user)
+):
+    workspace_id = str(current_user.workspace_id)
+    return await response_cache.get_or_compute(
+        workspace_id, "analytics.hotspots.cochanges",
+        {"repo_id": str(repo_id), "path": path, "limit": limit},
+        lambda session: co_changed_files(session, workspace_id, str(repo_id), path, limit),
+    )
+
+@router.get("/flow")
+async def get_flow(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    current_user: User = Depends(get_current_active_user)
+):
+    end = end or date.today()
+    start = start or end - timedelta(days=29)
+    if start > end or (end - start).days > 730:
+        raise HTTPException(status_code=400, detail="Invalid range (start <= end, at most 2 years)")
+    workspace_id = str(current_user.workspace_id)
+
+    async def load(session: AsyncSession):
+        index = await load_interval_index(session, workspace_id, end)
+        # The index stays in this process: threads rather than processes
+        return await compute_executor.run(compute_flow, index, start, end, processes=False)
+
+    return await response_cache.get_or_compute(workspace_id, "analytics.flow", {"start": start, "end": end}, load)
+
+def _check_rule(name: str, spec: dict):
+    try:
+        compile_rule(name, spec)
+    except RuleError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid rule: {e}")
+
+async def _get_rule(db: AsyncSession, rule_id: UUID, workspace_id) -> RiskRule:
+    result = await db.execute(select(RiskRule).where(RiskRule.id == rule_id, RiskRule.workspace_id == workspace_id))
+    rule = result.scalars().first()
+    if not rule:
+        raise EntityNotFound("Risk rule")
+    return rule
+
+@router.get("/rules", response_model=List[RiskRuleSchema])
+async def list_risk_rules(
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
+    """Effective rules: the workspace's own, plus the built-in ones they do not override."""
     result = await db.execute(
-        select(RiskSignal)
-        .where(RiskSignal.workspace_id == current_user.workspace_id)
-        .order_by(desc(RiskSignal.id)) # Should probably have created_at
-        .limit(10)
+        select(RiskRule).where(RiskRule.workspace_id == current_user.workspace_id).order_by(RiskRule.name)
+    )
+    custom = result.scalars().all()
+    overridden = {rule.name for rule in custom}
+    defaults = [
+        RiskRuleSchema(name=name, spec=spec, source="default")
+        for name, spec in default_rule_specs(settings.RISK_ENGINE_MODE).items()
+        if name not in overridden
+    ]
+    return defaults + [RiskRuleSchema.model_validate(rule) for rule in custom]
+
+@router.post("/rules", response_model=RiskRuleSchema, status_code=201)
+async def create_risk_rule(
+    rule_in: RiskRuleCreate,
+    current_user: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    _check_rule(rule_in.name, rule_in.spec)
+    existing = await db.execute(
+        select(RiskRule.id).where(RiskRule.workspace_id == current_user.workspace_id, RiskRule.name == rule_in.name)
     )
-    return result.scalars().all()
+    if existing.first():
+        raise HTTPException(status_code=400, detail="A rule with this name already exists")
+    rule = RiskRule(workspace_id=current_user.workspace_id, **rule_in.model_dump())
+    db.add(rule)
+    await db.commit()
+    await db.refresh(rule)
+    return rule
+
+@router.put("/rules/{rule_id}", response_model=RiskRuleSchema)
+async def update_risk_rule(
+    rule_id: UUID,
+    rule_in: RiskRuleUpdate,
+    current_user: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    rule = await _get_rule(db, rule_id, current_user.workspace_id)
+    if rule_in.spec is not None:
+        _check_rule(rule.name, rule_in.spec)
+        rule.spec = rule_in.spec
+    if rule_in.enabled is not None:
+        rule.enabled = rule_in.enabled
+    await db.commit()
+    await db.refresh(rule)
+    return rule
+
+@router.delete("/rules/{rule_id}")
+async def delete_risk_rule(
+    rule_id: UUID,
+    current_user: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    rule = await _get_rule(db, rule_id, current_user.workspace_id)
+    await db.delete(rule)
+    await db.commit()
+    return {"status": "ok"}
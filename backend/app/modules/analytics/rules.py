@@ -0,0 +1,384 @@
+"""
+Declarative risk rules, compiled to vectorized predicates.
+
+A rule is a JSON spec (stored per workspace in `risk_rules`, see
+docs/product/risk_rules.md):
+
+    {
+      "type": "DELAY",
+      "when": [
+        {"metric": "throughput", "measure": "zscore", "op": "<=", "threshold": -2},
+        {"metric": "lead_time_p85", "measure": "zscore", "op": ">=", "threshold": 2, "window": 60}
+      ],
+      "score": "1 - 0.5 ** (min(-z_throughput, z_lead_time_p85) / 2)",
+      "severity": "HIGH",
+      "explanation": "Throughput at {z_throughput:.1f} sd from its baseline."
+    }
+
+Measures, computed for the evaluation day over the metric history matrix:
+
+- ``value``: the metric itself (variable ``value_<metric>``)
+- ``change``: relative change vs. the previous day with data (``change_<metric>``)
+- ``zscore``: z-score against an EWMA baseline over ``window`` days,
+  ``half_life`` days half-life (``z_<metric>``)
+
+All conditions must hold. `score` is an arithmetic formula over those
+variables (numbers, + - * / **, min, max, abs, clip), checked against an
+AST whitelist. When `severity` is omitted it is HIGH above 0.8, else MEDIUM.
+
+Specs compile once (cached on their canonical JSON). Evaluation computes
+each (measure, metric, window) feature once for all workspaces, then runs
+every distinct rule over the workspaces that use it as array operations.
+"""
+import ast
+import json
+import operator
+import string
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.logging import logging
+from app.modules.analytics.history import (
+    BASELINE_DAYS, EWMA_HALF_LIFE_DAYS, MIN_BASELINE_POINTS, MetricMatrix, day_over_day_change, ewma_zscores,
+)
+from app.modules.analytics.rollups import METRIC_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+RiskList = List[Dict[str, Any]]
+
+MEASURE_PREFIXES = {"value": "value", "change": "change", "zscore": "z"}
+OPERATORS: Dict[str, Callable[[Any, Any], Any]] = {
+    "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+    "==": operator.eq, "!=": operator.ne,
+}
+SEVERITIES = ("LOW", "MEDIUM", "HIGH")
+FORMULA_FUNCTIONS = {"min": np.minimum, "max": np.maximum, "abs": np.abs, "clip": np.clip}
+_FORMULA_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant, ast.Name, ast.Load, ast.Call,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.USub, ast.UAdd,
+)
+
+# (measure, metric, window, half_life)
+FeatureKey = Tuple[str, str, int, float]
+
+
+class RuleError(ValueError):
+    """Invalid rule spec."""
+
+
+@dataclass(frozen=True)
+class Condition:
+    feature: FeatureKey
+    op: Callable[[Any, Any], Any]
+    threshold: float
+
+
+@dataclass(frozen=True, eq=False)
+class CompiledRule:
+    name: str
+    type: str
+    severity: Optional[str]
+    conditions: Tuple[Condition, ...]
+    variables: Tuple[Tuple[str, FeatureKey], ...]
+    score: Any  # code object of the score formula
+    explanation: str
+
+    def evaluate(self, features: "FeatureStore", rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+        """Fired mask and scores for the given matrix rows."""
+        env = {name: features.get(key)[rows] for name, key in self.variables}
+        with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+            fired = np.ones(rows.size, dtype=bool)
+            for cond in self.conditions:
+                # NaN (no history) compares False, so the rule stays silent
+                fired &= cond.op(features.get(cond.feature)[rows], cond.threshold)
+            try:
+                scores = np.broadcast_to(_eval_formula(self.score, env), rows.shape)
+            except ArithmeticError:
+                scores = np.full(rows.shape, np.nan)
+        return fired & np.isfinite(scores), scores, env
+
+
+def _eval_formula(code: Any, env: Dict[str, np.ndarray]) -> np.ndarray:
+    # Only whitelisted AST nodes reach this point (see _compile_formula)
+    return np.asarray(eval(code, {"__builtins__": {}, **FORMULA_FUNCTIONS}, env), dtype=np.float64)
+
+
+class FeatureStore:
+    """Lazily computed per-workspace features of a metric matrix, shared by all rules."""
+
+    def __init__(self, matrix: MetricMatrix):
+        self.matrix = matrix
+        self._cache: Dict[FeatureKey, np.ndarray] = {}
+
+    def get(self, key: FeatureKey) -> np.ndarray:
+        feature = self._cache.get(key)
+        if feature is None:
+            measure, metric, window, half_life = key
+            values = self.matrix.values[metric]
+            if measure == "value":
+                feature = values[:, -1]
+            elif measure == "change":
+                feature = day_over_day_change(values, self.matrix.present)
+            else:
+                feature = ewma_zscores(values[:, -window:], half_life)
+            self._cache[key] = feature
+        return feature
+
+
+def _number(value: Any, what: str) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise RuleError(f"{what} must be a number")
+    return float(value)
+
+
+def _feature_key(measure: str, metric: str, window: Any = None, half_life: Any = None) -> FeatureKey:
+    if metric not in METRIC_COLUMNS:
+        raise RuleError(f"Unknown metric '{metric}', expected one of {list(METRIC_COLUMNS)}")
+    if measure not in MEASURE_PREFIXES:
+        raise RuleError(f"Unknown measure '{measure}', expected one of {list(MEASURE_PREFIXES)}")
+    if measure != "zscore":
+        return (measure, metric, 0, 0.0)
+    window = int(_number(window if window is not None else BASELINE_DAYS, "window"))
+    if not MIN_BASELINE_POINTS < window <= BASELINE_DAYS:
+        raise RuleError(f"window must be between {MIN_BASELINE_POINTS + 1} and {BASELINE_DAYS} days")
+    half_life = _number(half_life if half_life is not None else EWMA_HALF_LIFE_DAYS, "half_life")
+    if half_life <= 0:
+        raise RuleError("half_life must be positive")
+    return (measure, metric, window, half_life)
+
+
+def _variable_key(name: str, declared: Dict[str, FeatureKey]) -> FeatureKey:
+    """Feature behind a formula/template variable such as `z_wip` or `change_throughput`."""
+    if name in declared:
+        return declared[name]
+    for measure, prefix in MEASURE_PREFIXES.items():
+        if name.startswith(prefix + "_") and name[len(prefix) + 1:] in METRIC_COLUMNS:
+            return _feature_key(measure, name[len(prefix) + 1:])
+    raise RuleError(f"Unknown variable '{name}'")
+
+
+def _compile_formula(formula: Any, declared: Dict[str, FeatureKey]) -> Tuple[Any, Dict[str, FeatureKey]]:
+    if isinstance(formula, (int, float)) and not isinstance(formula, bool):
+        formula = repr(float(formula))
+    if not isinstance(formula, str):
+        raise RuleError("score must be a formula string or a number")
+    try:
+        tree = ast.parse(formula, mode="eval")
+    except SyntaxError as e:
+        raise RuleError(f"Invalid score formula: {e.msg}")
+
+    variables: Dict[str, FeatureKey] = {}
+    for node in ast.walk(tree):
+        if not isinstance(node, _FORMULA_NODES):
+            raise RuleError(f"Unsupported syntax in score formula: {type(node).__name__}")
+        if isinstance(node, ast.Constant) and (isinstance(node.value, bool) or not isinstance(node.value, (int, float))):
+            raise RuleError("Only numeric constants are allowed in score formulas")
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in FORMULA_FUNCTIONS or node.keywords:
+                raise RuleError(f"Allowed functions: {sorted(FORMULA_FUNCTIONS)}")
+        elif isinstance(node, ast.Name) and node.id not in FORMULA_FUNCTIONS:
+            variables[node.id] = _variable_key(node.id, declared)
+        elif isinstance(node, ast.Constant):
+            # Float constants: `9 ** 9 ** 9` must overflow, not grind through big-int math
+            node.value = float(node.value)
+
+    code = compile(tree, "<risk-rule>", "eval")
+    try:
+        _eval_formula(code, {name: np.ones(1) for name in variables})
+    except (ArithmeticError, TypeError, ValueError) as e:
+        raise RuleError(f"Invalid score formula: {e}")
+    return code, variables
+
+
+def _template_variables(template: str, declared: Dict[str, FeatureKey]) -> Dict[str, FeatureKey]:
+    variables = {}
+    try:
+        fields = [field for _, field, _, _ in string.Formatter().parse(template) if field]
+    except ValueError as e:
+        raise RuleError(f"Invalid explanation template: {e}")
+    for field in fields:
+        if not field.isidentifier():
+            raise RuleError(f"Invalid explanation placeholder '{field}'")
+        variables[field] = _variable_key(field, declared)
+    return variables
+
+
+@lru_cache(maxsize=4096)
+def _compile(name: str, canonical_spec: str) -> CompiledRule:
+    spec = json.loads(canonical_spec)
+    if not isinstance(spec, dict):
+        raise RuleError("Rule spec must be an object")
+    risk_type = spec.get("type")
+    if not isinstance(risk_type, str) or not risk_type:
+        raise RuleError("type is required")
+    when = spec.get("when")
+    if not isinstance(when, list) or not when:
+        raise RuleError("when must be a non-empty list of conditions")
+
+    declared: Dict[str, FeatureKey] = {}
+    conditions = []
+    for cond in when:
+        if not isinstance(cond, dict):
+            raise RuleError("Each condition must be an object")
+        key = _feature_key(cond.get("measure", "value"), cond.get("metric"), cond.get("window"), cond.get("half_life"))
+        if cond.get("op") not in OPERATORS:
+            raise RuleError(f"op must be one of {list(OPERATORS)}")
+        conditions.append(Condition(key, OPERATORS[cond["op"]], _number(cond.get("threshold"), "threshold")))
+        # Formula variables refer to the condition's window/half-life for the same measure
+        declared.setdefault(f"{MEASURE_PREFIXES[key[0]]}_{key[1]}", key)
+
+    severity = spec.get("severity")
+    if severity is not None and severity not in SEVERITIES:
+        raise RuleError(f"severity must be one of {list(SEVERITIES)}")
+    explanation = spec.get("explanation", f"{risk_type} rule '{name}' triggered.")
+    if not isinstance(explanation, str):
+        raise RuleError("explanation must be a string")
+
+    score, variables = _compile_formula(spec.get("score", 1.0), declared)
+    variables.update(_template_variables(explanation, declared))
+    # Placeholders are floats at evaluation: a spec like {value_wip:d} must fail here
+    try:
+        explanation.format(**{name: 1.0 for name in variables}, score=1.0)
+    except (ValueError, KeyError, IndexError) as e:
+        raise RuleError(f"Invalid explanation template: {e}")
+    return CompiledRule(
+        name=name,
+        type=risk_type,
+        severity=severity,
+        conditions=tuple(conditions),
+        variables=tuple(sorted(variables.items())),
+        score=score,
+        explanation=explanation,
+    )
+
+
+def compile_rule(name: str, spec: Dict[str, Any]) -> CompiledRule:
+    """Validate and compile a rule spec (cached). Raises RuleError."""
+    return _compile(name, json.dumps(spec, sort_keys=True))
+
+
+def evaluate_rules(matrix: MetricMatrix, rules_by_workspace: Dict[str, Sequence[CompiledRule]]) -> Dict[str, RiskList]:
+    """
+    Evaluate each workspace's rules on the last day of the matrix.
+
+    Workspaces sharing a rule (the defaults, typically) are evaluated together.
+    """
+    ws_index = {ws: i for i, ws in enumerate(matrix.workspace_ids)}
+    groups: Dict[int, Tuple[CompiledRule, List[int]]] = {}
+    for workspace_id, rules in rules_by_workspace.items():
+        row = ws_index.get(workspace_id)
+        if row is None:
+            continue
+        for rule in rules:
+            groups.setdefault(id(rule), (rule, []))[1].append(row)
+
+    features = FeatureStore(matrix)
+    fired_by_row: Dict[int, List[Tuple[CompiledRule, Dict[str, Any]]]] = {}
+    for rule, rows in groups.values():
+        rows_arr = np.asarray(sorted(rows), dtype=np.intp)
+        fired, scores, env = rule.evaluate(features, rows_arr)
+        for j in np.flatnonzero(fired):
+            values = {name: float(arr[j]) for name, arr in env.items()}
+            fired_by_row.setdefault(int(rows_arr[j]), []).append((rule, {"score": float(scores[j]), **values}))
+
+    risks: Dict[str, RiskList] = {}
+    for row in sorted(fired_by_row):
+        found = []
+        for rule, values in fired_by_row[row]:
+            score = values["score"]
+            try:
+                explanation = rule.explanation.format(**values)
+            except (ValueError, KeyError, IndexError) as e:
+                # One broken rule must not stop detection for every workspace
+                logger.error(f"Skipping rule '{rule.name}' for workspace={matrix.workspace_ids[row]}: {e}")
+                continue
+            found.append({
+                "rule": rule.name,
+                "type": rule.type,
+                "score": score,
+                "severity": rule.severity or ("HIGH" if score > 0.8 else "MEDIUM"),
+                "explanation": explanation,
+            })
+        risks[matrix.workspace_ids[row]] = found
+    return risks
+
+
+# Built-in rules. Workspace rules with the same name replace (or, disabled, switch off) them.
+DEFAULT_RULE_SPECS: Dict[str, Dict[str, Any]] = {
+    "delay": {
+        "type": "DELAY",
+        "when": [
+            {"metric": "throughput", "measure": "zscore", "op": "<=", "threshold": -2},
+            {"metric": "lead_time_p85", "measure": "zscore", "op": ">=", "threshold": 2},
+        ],
+        "score": "1 - 0.5 ** (min(-z_throughput, z_lead_time_p85) / 2)",
+        "explanation": (
+            "Delivery slowing down: throughput is {z_throughput:.1f} and lead time P85 "
+            "{z_lead_time_p85:+.1f} standard deviations from their 60-day baseline."
+        ),
+    },
+    "overload": {
+        "type": "OVERLOAD",
+        "when": [
+            {"metric": "wip", "measure": "zscore", "op": ">=", "threshold": 2},
+            {"metric": "lead_time_p50", "measure": "zscore", "op": ">=", "threshold": 2},
+        ],
+        "score": "1 - 0.5 ** (min(z_wip, z_lead_time_p50) / 2)",
+        "explanation": (
+            "Team potentially overloaded: WIP ({z_wip:+.1f} sd) and lead time "
+            "({z_lead_time_p50:+.1f} sd) are both above their 60-day baseline."
+        ),
+    },
+    "instability": {
+        "type": "INSTABILITY",
+        "when": [
+            {"metric": "bug_ratio", "measure": "value", "op": ">", "threshold": 0.2},
+            {"metric": "bug_ratio", "measure": "zscore", "op": ">=", "threshold": 2},
+        ],
+        "score": "1 - 0.5 ** (z_bug_ratio / 2)",
+        "explanation": (
+            "High bug ratio detected: {value_bug_ratio:.1%} of resolved issues are bugs, "
+            "{z_bug_ratio:.1f} standard deviations above the baseline."
+        ),
+    },
+}
+
+# The original day-over-day rules (RISK_ENGINE_MODE=legacy)
+LEGACY_RULE_SPECS: Dict[str, Dict[str, Any]] = {
+    "delay": {
+        "type": "DELAY",
+        "when": [
+            {"metric": "throughput", "measure": "change", "op": "<", "threshold": -0.1},
+            {"metric": "lead_time_p85", "measure": "change", "op": ">", "threshold": 0.1},
+        ],
+        "score": 0.8,
+        "explanation": "Delivery slowing down: Throughput dropped while Lead Time increased.",
+    },
+    "overload": {
+        "type": "OVERLOAD",
+        "when": [
+            {"metric": "wip", "measure": "change", "op": ">", "threshold": 0.1},
+            {"metric": "lead_time_p50", "measure": "change", "op": ">", "threshold": 0.1},
+        ],
+        "score": 0.9,
+        "explanation": "Team potentially overloaded: WIP and Lead Time both increasing.",
+    },
+    "instability": {
+        "type": "INSTABILITY",
+        "when": [{"metric": "bug_ratio", "measure": "value", "op": ">", "threshold": 0.2}],
+        "score": "0.7 + (value_bug_ratio - 0.2)",
+        "explanation": "High bug ratio detected: {value_bug_ratio:.1%} of resolved issues are bugs.",
+    },
+}
+
+
+def default_rule_specs(mode: str = "baseline") -> Dict[str, Dict[str, Any]]:
+    return LEGACY_RULE_SPECS if mode == "legacy" else DEFAULT_RULE_SPECS
+
+
+def default_rules(mode: str = "baseline") -> Dict[str, CompiledRule]:
+    return {name: compile_rule(name, spec) for name, spec in default_rule_specs(mode).items()}
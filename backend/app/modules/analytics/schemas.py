@@ -0,0 +1,22 @@
+from pydantic import BaseModel, ConfigDict, Field
+from uuid import UUID
+from typing import Any, Dict, Optional
+import datetime
+
+class RiskRuleBase(BaseModel):
+    name: str = Field(min_length=1, max_length=64)
+    spec: Dict[str, Any]
+    enabled: bool = True
+
+class RiskRuleCreate(RiskRuleBase):
+    pass
+
+class RiskRuleUpdate(BaseModel):
+    spec: Optional[Dict[str, Any]] = None
+    enabled: Optional[bool] = None
+
+class RiskRule(RiskRuleBase):
+    id: Optional[UUID] = None  # None for built-in rules
+    source: str = "workspace"  # workspace | default
+    updated_at: Optional[datetime.datetime] = None
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,90 @@
+"""
+Mergeable quantile sketch used by the dimensional rollups.
+
+Log-bucketed histogram with a fixed relative accuracy (DDSketch style):
+values are mapped to bucket ``ceil(log(x) / log(gamma))`` so that any
+quantile is returned within ``relative_accuracy`` of the true value.
+Sketches of different days/dimensions merge by adding bucket counts,
+which lets the API roll daily rows up to any range without raw data.
+"""
+import math
+import struct
+from typing import Iterable, Optional
+
+import numpy as np
+
+_HEADER = struct.Struct("<BfII")  # version, relative accuracy, zero count, bucket count
+_VERSION = 1
+
+
+class QuantileSketch:
+    """Sparse log-bucket sketch for non-negative values (hours, line counts)."""
+
+    def __init__(self, relative_accuracy: float = 0.02):
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.zero_count = 0
+        self.buckets: dict[int, int] = {}
+
+    @property
+    def count(self) -> int:
+        return self.zero_count + sum(self.buckets.values())
+
+    def add(self, values: Iterable[float]) -> "QuantileSketch":
+        arr = np.asarray(list(values) if not isinstance(values, np.ndarray) else values, dtype=np.float64)
+        arr = arr[np.isfinite(arr)]
+        if arr.size == 0:
+            return self
+        positive = arr[arr > 0]
+        self.zero_count += int(arr.size - positive.size)
+        if positive.size:
+            idx = np.ceil(np.log(positive) / self._log_gamma).astype(np.int32)
+            keys, counts = np.unique(idx, return_counts=True)
+            for k, c in zip(keys.tolist(), counts.tolist()):
+                self.buckets[k] = self.buckets.get(k, 0) + c
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        if not math.isclose(other.relative_accuracy, self.relative_accuracy, rel_tol=1e-6):
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        self.zero_count += other.zero_count
+        for k, c in other.buckets.items():
+            self.buckets[k] = self.buckets.get(k, 0) + c
+        return self
+
+    def quantile(self, q: float) -> Optional[float]:
+        total = self.count
+        if total == 0:
+            return None
+        rank = q * (total - 1)
+        if rank < self.zero_count:
+            return 0.0
+        seen = self.zero_count
+        for k in sorted(self.buckets):
+            seen += self.buckets[k]
+            if seen > rank:
+                # Midpoint of the bucket (gamma^(k-1), gamma^k] in relative terms
+                return 2 * self._gamma ** k / (self._gamma + 1)
+        return 2 * self._gamma ** max(self.buckets) / (self._gamma + 1)
+
+    def to_bytes(self) -> bytes:
+        keys = np.fromiter(sorted(self.buckets), dtype=np.int32, count=len(self.buckets))
+        counts = np.array([self.buckets[k] for k in keys.tolist()], dtype=np.uint32)
+        header = _HEADER.pack(_VERSION, self.relative_accuracy, self.zero_count, keys.size)
+        return header + keys.tobytes() + counts.tobytes()
+
+    @classmethod
+    def from_bytes(cls, blob: Optional[bytes]) -> "QuantileSketch":
+        if not blob:
+            return cls()
+        version, accuracy, zero_count, n = _HEADER.unpack_from(blob)
+        if version != _VERSION:
+            raise ValueError(f"Unsupported sketch version {version}")
+        sketch = cls(relative_accuracy=round(accuracy, 6))
+        sketch.zero_count = zero_count
+        offset = _HEADER.size
+        keys = np.frombuffer(blob, dtype=np.int32, count=n, offset=offset)
+        counts = np.frombuffer(blob, dtype=np.uint32, count=n, offset=offset + 4 * n)
+        sketch.buckets = dict(zip(keys.tolist(), counts.tolist()))
+        return sketch
@@ -0,0 +1,87 @@
+"""
+Time-range metric series served by /analytics/metrics.
+
+Daily points are read from metrics_daily; weekly and monthly points from
+the materialized rollups, so a one-year chart at week resolution is 52
+rows rather than 365. Only the requested metric columns are selected.
+
+Every series has a watermark: the latest `updated_at` of the rows it is
+built from. A sync that rewrites a metric (or a rollup refresh that picks
+it up) moves the watermark, which makes it the basis of the endpoint's
+strong ETag. Reading it is one index lookup, so conditional requests are
+answered without running the range query. Dimension drill-downs have their
+own watermark, the rollup rows of metrics_dimension_daily being written
+apart from metrics_daily.
+"""
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import desc, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.modules.analytics.models import MetricDaily, MetricDimensionDaily
+from app.modules.analytics.rollups import METRIC_COLUMNS, METRIC_VIEWS, metric_rollup_query
+
+RESOLUTIONS = ("day",) + tuple(METRIC_VIEWS)
+
+# Points returned when no range is given (the dashboard's default window)
+DEFAULT_POINTS = 30
+# Upper bound for explicit ranges; a 2-year daily range still fits
+MAX_POINTS = 800
+
+
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """'throughput, wip' -> ('throughput', 'wip'); every metric column when empty."""
+    if not fields:
+        return METRIC_COLUMNS
+    selected = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in selected if f not in METRIC_COLUMNS]
+    if unknown or not selected:
+        raise ValueError(f"Unknown fields {unknown}, expected a subset of {list(METRIC_COLUMNS)}")
+    return selected
+
+
+def metric_series_query(
+    workspace_id: str,
+    resolution: str,
+    fields: Sequence[str] = METRIC_COLUMNS,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    limit: int = DEFAULT_POINTS,
+) -> Select:
+    """Newest-first points of the series; week/month periods overlapping [start, end]."""
+    if resolution in METRIC_VIEWS:
+        return metric_rollup_query(workspace_id, resolution, start=start, end=end, limit=limit, columns=fields)
+    if resolution != "day":
+        raise ValueError(f"resolution must be one of {list(RESOLUTIONS)}")
+
+    table = MetricDaily.__table__
+    query = select(table.c.day, *(table.c[f] for f in fields)).where(table.c.workspace_id == workspace_id)
+    if start is not None:
+        query = query.where(table.c.day >= start)
+    if end is not None:
+        query = query.where(table.c.day <= end)
+    return query.order_by(desc(table.c.day)).limit(limit)
+
+
+async def get_metric_series(session: AsyncSession, workspace_id: str, resolution: str, **params) -> List[Dict[str, Any]]:
+    result = await session.execute(metric_series_query(workspace_id, resolution, **params))
+    return [dict(row) for row in result.mappings().all()]
+
+
+async def metric_watermark(session: AsyncSession, workspace_id: str, resolution: str) -> Optional[datetime]:
+    """Latest update folded into the series of this resolution (None when empty)."""
+    source = METRIC_VIEWS.get(resolution, MetricDaily.__table__)
+    result = await session.execute(
+        select(func.max(source.c.updated_at)).where(source.c.workspace_id == workspace_id)
+    )
+    return result.scalar()
+
+
+async def dimension_watermark(session: AsyncSession, workspace_id: str) -> Optional[datetime]:
+    """Latest rewrite of the workspace's dimensional rollups (None when empty)."""
+    result = await session.execute(
+        select(func.max(MetricDimensionDaily.updated_at)).where(MetricDimensionDaily.workspace_id == workspace_id)
+    )
+    return result.scalar()
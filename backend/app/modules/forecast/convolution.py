@@ -0,0 +1,133 @@
+"""
+Exact delivery probabilities, without sampling.
+
+The Monte Carlo forecast bootstraps each day's throughput i.i.d. from the
+history, so the total over n days has the n-fold convolution of the
+empirical throughput distribution. It is computed exactly:
+
+- throughputs are mapped to a lattice (multiples of one step: daily
+  throughputs are weekly counts / 7, so usually 1/7) and the history becomes
+  a probability mass function over it;
+- the n-fold convolution is obtained by exponentiation by squaring, with
+  FFT convolutions: O(log n) products instead of n;
+- only P(total >= backlog) is needed, so every mass at or beyond the
+  backlog is folded into one last bin. Totals never decrease, so folding
+  after each product is exact, and keeps every array at backlog / step
+  bins whatever the horizon.
+"""
+from math import ceil
+from typing import Sequence
+
+import numpy as np
+
+# Largest lattice denominator tried (step = 1 / d); beyond it, values are rounded
+MAX_DENOMINATOR = 60
+LATTICE_TOLERANCE = 1e-6
+# Bins over the largest value when falling back to rounding
+FALLBACK_BINS = 1000
+
+
+def lattice_step(values: np.ndarray) -> float:
+    """Largest step 1/d (d <= MAX_DENOMINATOR) of which every value is a multiple, else a rounding step."""
+    for denominator in range(1, MAX_DENOMINATOR + 1):
+        scaled = values * denominator
+        if np.all(np.abs(scaled - np.round(scaled)) < LATTICE_TOLERANCE):
+            return 1.0 / denominator
+    return float(values.max()) / FALLBACK_BINS
+
+
+def throughput_pmf(throughput_history: Sequence[float], step: float) -> np.ndarray:
+    """Empirical distribution of the daily throughput over lattice indices 0, 1, 2... (x step)."""
+    indices = np.round(np.asarray(throughput_history, dtype=np.float64) / step).astype(np.int64)
+    return np.bincount(indices) / len(indices)
+
+
+def _convolve_capped(a: np.ndarray, b: np.ndarray, cap: int) -> np.ndarray:
+    """PMF of min(X + Y, cap) for X ~ a and Y ~ b, both already capped at `cap`."""
+    size = len(a) + len(b) - 1
+    n = 1 << (size - 1).bit_length()
+    product = np.fft.irfft(np.fft.rfft(a, n) * np.fft.rfft(b, n), n)[:size]
+    # FFT round-off leaves tiny negative masses
+    np.clip(product, 0.0, None, out=product)
+    if size > cap + 1:
+        product[cap] = product[cap:].sum()
+        product = product[:cap + 1]
+    return product
+
+
+def _prepare(values: np.ndarray, max_backlog: float):
+    """Lattice step, cap (backlog bin) and capped daily PMF."""
+    step = lattice_step(values)
+    cap = max(1, ceil(max_backlog / step - LATTICE_TOLERANCE))
+    base = throughput_pmf(values, step)
+    if len(base) > cap + 1:
+        base = np.concatenate([base[:cap], [base[cap:].sum()]])
+    return step, cap, base
+
+
+def pmf_power(base: np.ndarray, days: int, cap: int) -> np.ndarray:
+    """PMF of the (capped) total over `days` days, by exponentiation by squaring."""
+    result = np.array([1.0])  # zero items after zero days
+    while days:
+        if days & 1:
+            result = _convolve_capped(result, base, cap)
+        days >>= 1
+        if days:
+            base = _convolve_capped(base, base, cap)
+    return result
+
+
+def _done_probabilities(pmf: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    """P(total index >= k) for each k of `indices`."""
+    tail = np.cumsum(pmf[::-1])[::-1] / pmf.sum()
+    padded = np.concatenate([tail, [0.0]])
+    return np.clip(padded[np.minimum(indices, len(tail))], 0.0, 1.0)
+
+
+def delivery_probability(throughput_history: Sequence[float], backlog_size: float, days: int) -> float:
+    """Exact P(sum of `days` bootstrapped daily throughputs >= backlog_size)."""
+    if days <= 0 or not len(throughput_history):
+        return 0.0
+    if backlog_size <= 0:
+        return 1.0
+    values = np.asarray(throughput_history, dtype=np.float64)
+    if values.max() <= 0:
+        return 0.0
+    _, cap, base = _prepare(values, backlog_size)
+    return float(_done_probabilities(pmf_power(base, days, cap), np.array([cap]))[0])
+
+
+def delivery_probability_grid(
+    throughput_history: Sequence[float],
+    backlog_sizes: Sequence[float],
+    days: Sequence[int],
+) -> np.ndarray:
+    """
+    Exact probabilities for every (backlog size, horizon) pair, as a
+    (len(backlog_sizes) x len(days)) array.
+
+    The horizons are walked in increasing order, each PMF being the previous
+    one convolved with the power for the gap; all backlogs are read from the
+    tail sums of the same PMF.
+    """
+    grid = np.zeros((len(backlog_sizes), len(days)))
+    values = np.asarray(throughput_history, dtype=np.float64)
+    backlogs = np.asarray(backlog_sizes, dtype=np.float64)
+    if not len(values) or not len(backlogs):
+        return grid
+    grid[backlogs <= 0, :] = 1.0
+    if values.max() <= 0 or backlogs.max() <= 0:
+        grid[:, np.asarray(days) <= 0] = 0.0
+        return grid
+
+    step, cap, base = _prepare(values, backlogs.max())
+    indices = np.maximum(np.ceil(backlogs / step - LATTICE_TOLERANCE).astype(np.int64), 0)
+    pmf, current = np.array([1.0]), 0
+    for j in np.argsort(days, kind="stable"):
+        if days[j] <= 0:
+            grid[:, j] = 0.0
+            continue
+        pmf = _convolve_capped(pmf, pmf_power(base, days[j] - current, cap), cap)
+        current = days[j]
+        grid[:, j] = _done_probabilities(pmf, indices)
+    return grid
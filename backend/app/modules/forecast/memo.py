@@ -0,0 +1,79 @@
+"""
+Per-process memo of forecast results.
+
+A forecast only depends on its inputs: the throughput history and the
+request parameters. Results are kept under a hash of exactly those, so a
+sync that leaves the history unchanged (or another user asking the same
+question) reuses them, while any new metric value yields a new key.
+Entries are evicted least-recently-used beyond FORECAST_MEMO_MAX_ENTRIES,
+and expire after FORECAST_MEMO_TTL_SECONDS (unseeded simulations are then
+drawn again).
+"""
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Sequence, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from prometheus_client import Counter
+
+from app.core.config import settings
+
+FORECAST_MEMO_REQUESTS = Counter("forecast_memo_requests_total", "Forecast memo lookups", ["kind", "result"])
+
+
+def memo_key(workspace_id: str, kind: str, inputs: Sequence[Any], params: Dict[str, Any]) -> str:
+    """Hash of the forecast inputs (history arrays...) and parameters (backlog, date, engine, seed...)."""
+    payload = json.dumps(
+        [str(workspace_id), kind, [[float(v) for v in values] for values in inputs], jsonable_encoder(params)],
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ForecastMemo:
+    """LRU + TTL map of forecast results."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Any:
+        """Cached result, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.monotonic() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_or_compute(self, key: str, kind: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        value = self.get(key)
+        if value is not None:
+            FORECAST_MEMO_REQUESTS.labels(kind=kind, result="hit").inc()
+            return value
+        FORECAST_MEMO_REQUESTS.labels(kind=kind, result="miss").inc()
+        value = await compute()
+        self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+forecast_memo = ForecastMemo(settings.FORECAST_MEMO_MAX_ENTRIES, settings.FORECAST_MEMO_TTL_SECONDS)
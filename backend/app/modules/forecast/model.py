@@ -1,31 +1,160 @@
-import numpy as np
+"""
+Monte Carlo delivery forecast.
+
+Each simulation replays the future by bootstrapping daily throughput from the
+recent history. All simulations are drawn at once from a
+`numpy.random.Generator` as a (simulations x days) array, in chunks of about
+CHUNK_DRAWS values so that a million simulations over a long horizon stay
+within a few tens of MB. With a seed, the same inputs always give the same
+result.
+
+The "exact" engine (forecast/convolution.py) computes the same probability
+from the distribution of the total instead of sampling it: deterministic,
+and cheaper for long horizons and large backlogs.
+"""
 import datetime
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.modules.forecast.convolution import delivery_probability, delivery_probability_grid
+
+ENGINES = ("monte_carlo", "exact")
+DEFAULT_SIMULATIONS = 10_000
+MAX_SIMULATIONS = 1_000_000
+# Furthest target date (days from today): the cost grows with the horizon
+MAX_HORIZON_DAYS = 3 * 365
+CHUNK_DRAWS = 4_000_000
+CONFIDENCE = 0.95
+
 
-def simulate_delivery(throughput_history, backlog_size, target_date):
+@dataclass
+class DeliveryForecast:
+    probability: float
+    ci_low: float
+    ci_high: float
+    simulations: int
+    days: int
+
+
+def wilson_interval(successes: int, trials: int, confidence: float = CONFIDENCE) -> Tuple[float, float]:
+    """Wilson score interval of a binomial proportion (well-behaved near 0 and 1)."""
+    if trials <= 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    center = (p + z * z / (2 * trials)) / denominator
+    margin = z * np.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+def sample_throughput(
+    rng: np.random.Generator,
+    throughput_history: Sequence[float],
+    simulations: int,
+    days: int,
+) -> Iterator[np.ndarray]:
+    """Bootstrapped daily throughput, yielded as (chunk x days) arrays covering `simulations` rows."""
+    history = np.asarray(throughput_history, dtype=np.float64)
+    chunk = max(1, CHUNK_DRAWS // max(days, 1))
+    for start in range(0, simulations, chunk):
+        yield rng.choice(history, size=(min(chunk, simulations - start), days))
+
+
+def simulate_delivery(
+    throughput_history: Sequence[float],
+    backlog_size: int,
+    target_date: datetime.date,
+    simulations: int = DEFAULT_SIMULATIONS,
+    seed: Optional[int] = None,
+    today: Optional[datetime.date] = None,
+    engine: str = "monte_carlo",
+) -> DeliveryForecast:
     """
-    Monte Carlo simulation to estimate probability of completing backlog by target_date.
-    throughput_history: list of items completed per day (last 30 days)
-    backlog_size: number of items remaining
-    target_date: date
+    Probability of completing `backlog_size` items by `target_date`.
+
+    Args:
+        throughput_history: items completed per day (recent days)
+        simulations: number of simulated futures, up to MAX_SIMULATIONS
+        seed: makes the result reproducible
+        engine: "monte_carlo", or "exact" (no sampling: the interval is the
+            probability itself, simulations and seed are ignored)
+
+    Raises:
+        ValueError: target_date more than MAX_HORIZON_DAYS ahead
     """
-    if not throughput_history:
-        return 0.0
-    
-    today = datetime.date.today()
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {ENGINES}")
+    if not 1 <= simulations <= MAX_SIMULATIONS:
+        raise ValueError(f"simulations must be between 1 and {MAX_SIMULATIONS}")
+    today = today or datetime.date.today()
     days_remaining = (target_date - today).days
-    
-    if days_remaining <= 0:
-        return 0.0
-        
-    simulations = 1000
-    success_count = 0
-    
-    # Simple bootstrap
-    for _ in range(simulations):
-        # Sample throughput for each remaining day
-        daily_throughput = np.random.choice(throughput_history, size=days_remaining)
-        total_completed = np.sum(daily_throughput)
-        if total_completed >= backlog_size:
-            success_count += 1
-            
-    return success_count / simulations
+    if days_remaining > MAX_HORIZON_DAYS:
+        raise ValueError(f"target_date must be at most {MAX_HORIZON_DAYS} days ahead")
+
+    if not len(throughput_history) or days_remaining <= 0:
+        return DeliveryForecast(0.0, 0.0, 0.0, simulations, max(days_remaining, 0))
+
+    if engine == "exact":
+        probability = delivery_probability(throughput_history, backlog_size, days_remaining)
+        return DeliveryForecast(probability, probability, probability, 0, days_remaining)
+
+    rng = np.random.default_rng(seed)
+    successes = 0
+    for draws in sample_throughput(rng, throughput_history, simulations, days_remaining):
+        successes += int(np.count_nonzero(draws.sum(axis=1) >= backlog_size))
+
+    ci_low, ci_high = wilson_interval(successes, simulations)
+    return DeliveryForecast(successes / simulations, ci_low, ci_high, simulations, days_remaining)
+
+
+def simulate_delivery_grid(
+    throughput_history: Sequence[float],
+    backlog_sizes: Sequence[int],
+    target_dates: Sequence[datetime.date],
+    simulations: int = DEFAULT_SIMULATIONS,
+    seed: Optional[int] = None,
+    today: Optional[datetime.date] = None,
+    engine: str = "monte_carlo",
+) -> List[List[float]]:
+    """
+    Delivery probability for every (backlog size, target date) pair.
+
+    One simulation serves the whole grid: the runs are drawn once up to the
+    furthest date, and each date's column of cumulative throughput is sorted
+    so that every backlog size is a binary search. Cells share the same runs,
+    so the grid is monotone in both directions.
+
+    Returns:
+        Probabilities, one row per backlog size, one column per target date
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {ENGINES}")
+    if not 1 <= simulations <= MAX_SIMULATIONS:
+        raise ValueError(f"simulations must be between 1 and {MAX_SIMULATIONS}")
+    today = today or datetime.date.today()
+    days = np.array([(d - today).days for d in target_dates], dtype=np.int64)
+    if len(days) and days.max() > MAX_HORIZON_DAYS:
+        raise ValueError(f"target_date must be at most {MAX_HORIZON_DAYS} days ahead")
+    backlogs = np.asarray(backlog_sizes, dtype=np.float64)
+
+    if engine == "exact":
+        return delivery_probability_grid(throughput_history, backlogs, days).tolist()
+
+    grid = np.zeros((len(backlogs), len(days)))
+    future = days > 0
+    if not len(throughput_history) or not future.any():
+        return grid.tolist()
+
+    columns = days[future] - 1
+    done = np.zeros((len(backlogs), len(columns)), dtype=np.int64)
+    rng = np.random.default_rng(seed)
+    for draws in sample_throughput(rng, throughput_history, simulations, int(days.max())):
+        totals = np.sort(np.cumsum(draws, axis=1)[:, columns], axis=0)
+        for j in range(len(columns)):
+            done[:, j] += len(totals) - np.searchsorted(totals[:, j], backlogs, side="left")
+    grid[:, future] = done / simulations
+    return grid.tolist()
@@ -1,13 +1,15 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
-from typing import Any
+from typing import Optional
 from datetime import date
-from app.db.session import get_db
+from app.core.cache import response_cache
 from app.modules.users.routes import get_current_active_user
 from app.modules.users.schemas import User
-from app.modules.analytics.models import MetricDaily
-from app.modules.forecast.model import simulate_delivery
+from app.modules.forecast.model import DEFAULT_SIMULATIONS, ENGINES, MAX_HORIZON_DAYS, MAX_SIMULATIONS, simulate_delivery, simulate_delivery_grid
+from app.modules.forecast.schemas import ForecastGrid, ForecastGridRequest
+from app.modules.forecast.scope import load_flow_history, simulate_scope_growth
+from app.modules.forecast.service import get_standard_forecasts, load_throughput_history, run_forecast
+from app.modules.forecast.simulator import DEFAULT_HORIZON_DAYS, simulate_completion
 
 router = APIRouter()
 
@@ -15,26 +17,135 @@ router = APIRouter()
 async def get_forecast(
     target_date: date,
     backlog_size: int,
-    current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    simulations: int = Query(DEFAULT_SIMULATIONS, ge=100, le=MAX_SIMULATIONS),
+    seed: Optional[int] = Query(None, ge=0, description="Fixes the random draws (reproducible result)"),
+    engine: str = Query("monte_carlo", description="monte_carlo, or exact (deterministic, by convolution)"),
+    scope_growth: bool = Query(False, description="Account for items arriving until the target date"),
+    current_user: User = Depends(get_current_active_user)
 ):
-    # Fetch historical throughput
-    result = await db.execute(
-        select(MetricDaily.throughput)
-        .where(MetricDaily.workspace_id == current_user.workspace_id)
-        .order_by(desc(MetricDaily.day))
-        .limit(30)
-    )
-    throughput_history = result.scalars().all()
-    # Filter None
-    throughput_history = [t for t in throughput_history if t is not None]
-    if not throughput_history:
-        throughput_history = [1] # Fallback
-        
-    probability = simulate_delivery(throughput_history, backlog_size, target_date)
+    if engine not in ENGINES:
+        raise HTTPException(status_code=400, detail=f"engine must be one of {list(ENGINES)}")
+    if scope_growth and engine != "monte_carlo":
+        raise HTTPException(status_code=400, detail="scope_growth requires the monte_carlo engine")
+    # Probabilities count the days from today: part of the cache key
+    today = date.today()
+    if (target_date - today).days > MAX_HORIZON_DAYS:
+        raise HTTPException(status_code=400, detail=f"target_date must be at most {MAX_HORIZON_DAYS} days ahead")
+
+    async def load_scope_growth(session: AsyncSession):
+        completions, arrivals = await load_flow_history(session, str(current_user.workspace_id))
+        forecast = await run_forecast(
+            str(current_user.workspace_id), "scope_growth", simulate_scope_growth, [completions, arrivals],
+            backlog_size=backlog_size, target_date=target_date, simulations=simulations, seed=seed, today=today,
+        )
+        return {
+            "target_date": target_date,
+            "backlog_size": backlog_size,
+            "probability": forecast.probability,
+            "confidence_interval": [forecast.ci_low, forecast.ci_high],
+            "simulations": forecast.simulations,
+            "seed": seed,
+            "engine": engine,
+            "scope_growth": True,
+            "expected_scope": forecast.expected_scope,
+            "scope_p85": forecast.scope_p85,
+        }
+
+    async def load(session: AsyncSession):
+        throughput_history = await load_throughput_history(session, current_user.workspace_id)
+        forecast = await run_forecast(
+            str(current_user.workspace_id), "delivery", simulate_delivery, [throughput_history],
+            backlog_size=backlog_size, target_date=target_date, simulations=simulations, seed=seed,
+            today=today, engine=engine,
+        )
     
-    return {
-        "target_date": target_date,
-        "backlog_size": backlog_size,
-        "probability": probability
-    }
+        return {
+            "target_date": target_date,
+            "backlog_size": backlog_size,
+            "probability": forecast.probability,
+            "confidence_interval": [forecast.ci_low, forecast.ci_high],
+            "simulations": forecast.simulations,
+            "seed": seed,
+            "engine": engine,
+        }
+
+    params = {"target_date": target_date, "backlog_size": backlog_size, "engine": engine, "today": today.isoformat()}
+    if engine == "monte_carlo":
+        params.update(simulations=simulations, seed=seed)
+    if scope_growth:
+        params["scope_growth"] = True
+    return await response_cache.get_or_compute(
+        str(current_user.workspace_id), "forecast", params, load_scope_growth if scope_growth else load,
+    )
+
+@router.get("/completion")
+async def get_completion_forecast(
+    backlog_size: int = Query(..., ge=0),
+    horizon_days: int = Query(DEFAULT_HORIZON_DAYS, ge=1, le=MAX_HORIZON_DAYS),
+    simulations: int = Query(DEFAULT_SIMULATIONS, ge=100, le=MAX_SIMULATIONS),
+    seed: Optional[int] = Query(None, ge=0, description="Fixes the random draws (reproducible result)"),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Completion-date distribution of the backlog ("when will it be done")."""
+    today = date.today()
+
+    async def load(session: AsyncSession):
+        throughput_history = await load_throughput_history(session, current_user.workspace_id)
+        forecast = await run_forecast(
+            str(current_user.workspace_id), "completion", simulate_completion, [throughput_history],
+            backlog_size=backlog_size, horizon_days=horizon_days, simulations=simulations, seed=seed,
+            today=today,
+        )
+        return {
+            "backlog_size": backlog_size,
+            "horizon_days": forecast.horizon_days,
+            "simulations": forecast.simulations,
+            "seed": seed,
+            "percentiles": {f"p{p}": d for p, d in forecast.percentiles.items()},
+            "probability_within_horizon": forecast.probability_within_horizon,
+            "histogram": forecast.histogram,
+        }
+
+    return await response_cache.get_or_compute(
+        str(current_user.workspace_id), "forecast.completion",
+        {"backlog_size": backlog_size, "horizon_days": horizon_days, "simulations": simulations, "seed": seed,
+         "today": today.isoformat()},
+        load,
+    )
+
+@router.get("/standard")
+async def get_standard_forecast(
+    current_user: User = Depends(get_current_active_user)
+):
+    """Current backlog at +2/+4/+8 weeks and its completion dates (precomputed after each sync)."""
+    return await get_standard_forecasts(current_user.workspace_id)
+
+@router.post("/grid", response_model=ForecastGrid)
+async def get_forecast_grid(
+    grid: ForecastGridRequest,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Delivery probability heatmap over backlog sizes x target dates, from one shared simulation."""
+    if grid.engine not in ENGINES:
+        raise HTTPException(status_code=400, detail=f"engine must be one of {list(ENGINES)}")
+    today = date.today()
+
+    async def load(session: AsyncSession):
+        throughput_history = await load_throughput_history(session, current_user.workspace_id)
+        probabilities = await run_forecast(
+            str(current_user.workspace_id), "grid", simulate_delivery_grid, [throughput_history],
+            backlog_sizes=grid.backlog_sizes, target_dates=grid.target_dates, simulations=grid.simulations,
+            seed=grid.seed, today=today, engine=grid.engine,
+        )
+        return {
+            "backlog_sizes": grid.backlog_sizes,
+            "target_dates": grid.target_dates,
+            "probabilities": probabilities,
+            "simulations": grid.simulations if grid.engine == "monte_carlo" else 0,
+            "seed": grid.seed,
+            "engine": grid.engine,
+        }
+
+    return await response_cache.get_or_compute(
+        str(current_user.workspace_id), "forecast.grid", {**grid.model_dump(), "today": today.isoformat()}, load,
+    )
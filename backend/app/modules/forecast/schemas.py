@@ -0,0 +1,31 @@
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Optional
+import datetime
+from app.modules.forecast.model import MAX_HORIZON_DAYS, MAX_SIMULATIONS
+
+MAX_GRID_AXIS = 50
+
+class ForecastGridRequest(BaseModel):
+    backlog_sizes: List[int] = Field(min_length=1, max_length=MAX_GRID_AXIS)
+    target_dates: List[datetime.date] = Field(min_length=1, max_length=MAX_GRID_AXIS)
+    simulations: int = Field(10_000, ge=100, le=MAX_SIMULATIONS)
+    seed: Optional[int] = Field(None, ge=0)
+    engine: str = "monte_carlo"
+
+    @field_validator("target_dates")
+    @classmethod
+    def within_horizon(cls, target_dates: List[datetime.date]) -> List[datetime.date]:
+        last = datetime.date.today() + datetime.timedelta(days=MAX_HORIZON_DAYS)
+        for target_date in target_dates:
+            if target_date > last:
+                raise ValueError(f"target dates must be at most {MAX_HORIZON_DAYS} days ahead, got {target_date}")
+        return target_dates
+
+class ForecastGrid(BaseModel):
+    backlog_sizes: List[int]
+    target_dates: List[datetime.date]
+    # One row per backlog size, one column per target date
+    probabilities: List[List[float]]
+    simulations: int
+    seed: Optional[int] = None
+    engine: str
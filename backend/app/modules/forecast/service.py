@@ -0,0 +1,123 @@
+"""
+Forecast inputs, memoized forecast runs and the standard dashboard forecasts.
+
+Every forecast goes through `run_forecast`: its result is memoized on the
+inputs (see forecast/memo.py) and the computation runs off the event loop.
+The standard forecasts (the current backlog at +2, +4 and +8 weeks, and its
+completion dates) are precomputed after each sync into the response cache,
+so the dashboard reads them without simulating.
+"""
+import datetime
+from typing import Any, Callable, Dict, List, Sequence
+
+import numpy as np
+from sqlalchemy import desc, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import response_cache
+from app.core.executor import compute_executor
+from app.core.logging import logging
+from app.modules.analytics.facts import fact_cache
+from app.modules.analytics.models import MetricDaily
+from app.modules.forecast.memo import forecast_memo, memo_key
+from app.modules.forecast.model import simulate_delivery
+from app.modules.forecast.simulator import simulate_completion
+
+logger = logging.getLogger(__name__)
+
+HISTORY_DAYS = 30
+STANDARD_HORIZON_WEEKS = (2, 4, 8)
+# Standard forecasts are exact (delivery) or seeded (completion dates): stable between syncs
+STANDARD_SEED = 0
+
+
+async def load_throughput_history(db: AsyncSession, workspace_id) -> List[float]:
+    """Daily throughput of the last 30 days with metrics (at least one value)."""
+    result = await db.execute(
+        select(MetricDaily.throughput)
+        .where(MetricDaily.workspace_id == workspace_id)
+        .order_by(desc(MetricDaily.day))
+        .limit(HISTORY_DAYS)
+    )
+    # Filter None
+    throughput_history = [t for t in result.scalars().all() if t is not None]
+    return throughput_history or [1] # Fallback
+
+
+async def run_forecast(
+    workspace_id: str,
+    kind: str,
+    fn: Callable[..., Any],
+    inputs: Sequence[Sequence[float]],
+    offload: bool = True,
+    **params: Any,
+) -> Any:
+    """
+    `fn(*inputs, **params)`, memoized on (workspace, kind, inputs, params).
+
+    Args:
+        offload: run in the compute executor (API); False runs inline (jobs)
+    """
+    async def compute():
+        if offload:
+            return await compute_executor.run(fn, *inputs, **params)
+        return fn(*inputs, **params)
+
+    return await forecast_memo.get_or_compute(memo_key(workspace_id, kind, inputs, params), kind, compute)
+
+
+async def current_backlog(db: AsyncSession, workspace_id: str) -> int:
+    """Open cards (or open pull requests for workspaces without cards)."""
+    facts = await fact_cache.get(db, workspace_id)
+    if len(facts.card_created):
+        return int(np.count_nonzero(~facts.card_done_mask()))
+    return int(np.count_nonzero(np.isnan(facts.pr_closed)))
+
+
+async def standard_forecasts(
+    db: AsyncSession, workspace_id: str, today: datetime.date, offload: bool = True
+) -> Dict[str, Any]:
+    """Delivery probabilities of the current backlog at the standard horizons, and its completion dates."""
+    workspace_id = str(workspace_id)
+    history = await load_throughput_history(db, workspace_id)
+    backlog = await current_backlog(db, workspace_id)
+
+    horizons = []
+    for weeks in STANDARD_HORIZON_WEEKS:
+        target = today + datetime.timedelta(weeks=weeks)
+        forecast = await run_forecast(
+            workspace_id, "delivery", simulate_delivery, [history], offload,
+            backlog_size=backlog, target_date=target, today=today, engine="exact",
+        )
+        horizons.append({"weeks": weeks, "target_date": target, "probability": forecast.probability})
+
+    completion = await run_forecast(
+        workspace_id, "completion", simulate_completion, [history], offload,
+        backlog_size=backlog, seed=STANDARD_SEED, today=today,
+    )
+    return {
+        "backlog_size": backlog,
+        "computed_on": today,
+        "horizons": horizons,
+        "percentiles": {f"p{p}": d for p, d in completion.percentiles.items()},
+        "probability_within_horizon": completion.probability_within_horizon,
+    }
+
+
+async def get_standard_forecasts(workspace_id: str, offload: bool = True) -> Dict[str, Any]:
+    """Today's standard forecasts from the response cache (filled after each sync), computed on a miss."""
+    today = datetime.date.today()
+    return await response_cache.get_or_compute(
+        str(workspace_id), "forecast.standard", {"today": today},
+        lambda session: standard_forecasts(session, workspace_id, today, offload),
+    )
+
+
+async def precompute_standard_forecasts(workspace_ids: Sequence[str]) -> None:
+    """Post-sync step: fill the (freshly bumped) response cache with every workspace's standard forecasts."""
+    for workspace_id in workspace_ids:
+        try:
+            # The job has no event loop to protect: compute inline rather than start a pool
+            await get_standard_forecasts(workspace_id, offload=False)
+        except Exception as e:
+            logger.warning(f"Could not precompute forecasts for workspace={workspace_id}: {e}")
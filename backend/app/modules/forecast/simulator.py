@@ -0,0 +1,108 @@
+"""
+"When will it be done": completion-date distribution of a backlog.
+
+One vectorized simulation (see forecast/model.py) bootstraps the daily
+throughput of every run over the horizon; the completion day of a run is
+the first day its cumulative throughput reaches the backlog. Since the
+cumulative sums never decrease, that is the number of days still below the
+backlog, counted for all runs at once. Runs are only aggregated as a
+per-day count, from which the percentile dates and the histogram are read.
+"""
+import datetime
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.modules.forecast.model import DEFAULT_SIMULATIONS, MAX_HORIZON_DAYS, MAX_SIMULATIONS, sample_throughput
+
+DEFAULT_HORIZON_DAYS = 365
+PERCENTILES = (50, 70, 85, 95)
+HISTOGRAM_BIN_DAYS = 7
+
+
+@dataclass
+class CompletionForecast:
+    simulations: int
+    horizon_days: int
+    # Completion date reached by that share of the runs; None when beyond the horizon
+    percentiles: Dict[int, Optional[datetime.date]]
+    # Share of the runs done within the horizon
+    probability_within_horizon: float
+    histogram: List[Dict]
+
+
+def completion_day_counts(
+    throughput_history: Sequence[float],
+    backlog_size: int,
+    horizon_days: int,
+    simulations: int,
+    seed: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Number of runs completing on each day.
+
+    Returns:
+        Array of horizon_days + 2 counts: index d (1..horizon_days) is
+        "done at the end of day d", index horizon_days + 1 is "not done
+        within the horizon" (index 0 only for an empty backlog)
+    """
+    counts = np.zeros(horizon_days + 2, dtype=np.int64)
+    if backlog_size <= 0:
+        counts[0] = simulations
+        return counts
+    rng = np.random.default_rng(seed)
+    for draws in sample_throughput(rng, throughput_history, simulations, horizon_days):
+        cumulative = np.cumsum(draws, axis=1)
+        # Days below the backlog = index of the first day at or above it (horizon_days if never)
+        completion_day = np.count_nonzero(cumulative < backlog_size, axis=1) + 1
+        counts += np.bincount(completion_day, minlength=horizon_days + 2)
+    return counts
+
+
+def simulate_completion(
+    throughput_history: Sequence[float],
+    backlog_size: int,
+    horizon_days: int = DEFAULT_HORIZON_DAYS,
+    simulations: int = DEFAULT_SIMULATIONS,
+    seed: Optional[int] = None,
+    today: Optional[datetime.date] = None,
+    bin_days: int = HISTOGRAM_BIN_DAYS,
+) -> CompletionForecast:
+    """Distribution of the date `backlog_size` items are done, from bootstrapped daily throughput."""
+    if not 1 <= simulations <= MAX_SIMULATIONS:
+        raise ValueError(f"simulations must be between 1 and {MAX_SIMULATIONS}")
+    if not 1 <= horizon_days <= MAX_HORIZON_DAYS:
+        raise ValueError(f"horizon_days must be between 1 and {MAX_HORIZON_DAYS}")
+    today = today or datetime.date.today()
+    if not len(throughput_history):
+        throughput_history = [0.0]
+
+    counts = completion_day_counts(throughput_history, backlog_size, horizon_days, simulations, seed)
+    cumulative = np.cumsum(counts)
+
+    percentiles = {}
+    for p in PERCENTILES:
+        # Smallest day reached by at least p% of the runs
+        day = int(np.searchsorted(cumulative, p / 100 * simulations))
+        percentiles[p] = today + datetime.timedelta(days=day) if day <= horizon_days else None
+
+    histogram = []
+    for start in range(0, horizon_days + 1, bin_days):
+        end = min(start + bin_days, horizon_days + 1)
+        count = int(counts[start:end].sum())
+        if count:
+            histogram.append({
+                "start": today + datetime.timedelta(days=start),
+                "end": today + datetime.timedelta(days=end - 1),
+                "probability": count / simulations,
+                "cumulative": int(cumulative[end - 1]) / simulations,
+            })
+
+    return CompletionForecast(
+        simulations=simulations,
+        horizon_days=horizon_days,
+        percentiles=percentiles,
+        probability_within_horizon=1 - int(counts[-1]) / simulations,
+        histogram=histogram,
+    )
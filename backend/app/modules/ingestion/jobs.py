@@ -6,21 +6,28 @@ from typing import Callable, Awaitable, Any
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+from app.core.cache import response_cache
 from app.core.config import settings
 from app.core.logging import logging
+from app.db.partitions import maintain_partitions
 from app.db.session import AsyncSessionLocal
 from app.modules.integrations.models import (
     Integration,
     Repo,
     PullRequest,
     TrelloCard,
+    CardTransition,
     IntegrationType,
     IntegrationStatus,
 )
 from app.modules.integrations.github.service import sync_github_for_integration
 from app.modules.integrations.trello.service import sync_trello_for_integration
 from app.modules.analytics.metrics import compute_daily_metrics
-from app.modules.analytics.risk_engine import compute_risks
+from app.modules.analytics.risk_engine import compute_risks, compute_risks_batch
+from app.modules.analytics.cube import refresh_dimension_rollups
+from app.modules.analytics.facts import fact_cache
+from app.modules.analytics.rollups import refresh_dashboard_rollups
+from app.modules.forecast.service import precompute_standard_forecasts
 
 
 logger = logging.getLogger(__name__)
@@ -66,6 +73,7 @@ async def generate_mock_data(session: AsyncSession, integration: Integration):
         session.add(repo)
         await session.flush()
 
+    authors = ["alice", "bob", "carol", "dave"]
     today = date.today()
     for i in range(30):
         day = today - timedelta(days=i)
@@ -91,6 +99,8 @@ async def generate_mock_data(session: AsyncSession, integration: Integration):
                     "additions": random.randint(10, 500),
                     "deletions": random.randint(5, 200),
                     "comments": random.randint(0, 10),
+                    "user": random.choice(authors),
+                    "base_ref": "main" if random.random() < 0.8 else "release",
                 },
             )
             session.add(pr)
@@ -136,6 +146,23 @@ async def generate_mock_data(session: AsyncSession, integration: Integration):
             )
             session.add(card)
 
+            # Walk the card through the board up to its current list
+            moved_at = created_at
+            previous = None
+            for step in list_names[: list_names.index(list_name) + 1]:
+                if step == "Done" and resolved_at:
+                    moved_at = max(moved_at, resolved_at)
+                session.add(CardTransition(
+                    workspace_id=workspace_id,
+                    action_id=f"mock-{integration.id}-{card_id}-{step}",
+                    card_external_id=card_id,
+                    from_list=previous,
+                    to_list=step,
+                    occurred_at=moved_at.replace(tzinfo=timezone.utc),
+                ))
+                previous = step
+                moved_at = moved_at + timedelta(hours=random.randint(4, 48))
+
     await session.commit()
 
 
@@ -148,7 +175,14 @@ def _as_integration_type(value: Any) -> str:
         return str(value).upper()
 
 
-async def sync_workspace(workspace_id: str):
+async def sync_workspace(workspace_id: str, standalone: bool = True):
+    """
+    Sync a workspace's integrations and recompute its metrics.
+
+    Args:
+        standalone: also run the cross-workspace steps (risk evaluation, view
+            refresh, cache invalidation); sync_data_job runs those once for all
+    """
     async with AsyncSessionLocal() as session:
         result = await session.execute(
             select(Integration).where(
@@ -183,20 +217,51 @@ async def sync_workspace(workspace_id: str):
             integration.config = cfg
             await session.commit()
 
+        await fact_cache.refresh(session, workspace_id)
+        # Each rewrite moves its own ETag watermark (drill-downs / metric series)
+        await refresh_dimension_rollups(session, workspace_id)
         await compute_daily_metrics(session, workspace_id)
-        await compute_risks(session, workspace_id)
+
+        if standalone:
+            await compute_risks(session, workspace_id)
+            await refresh_dashboard_rollups(session)
+            # Everything the dashboard reads is committed: drop the workspace's cached responses
+            await response_cache.bump(workspace_id)
+            if settings.FORECAST_PRECOMPUTE:
+                await precompute_standard_forecasts([workspace_id])
 
 
 def sync_data_job():
     """RQ Job entrypoint."""
     async def run_all():
         async with AsyncSessionLocal() as session:
+            # Partitions for this month (and the next ones) before anything is written
+            await maintain_partitions(session)
+
             from app.modules.users.models import Workspace
             result = await session.execute(select(Workspace))
-            for w in result.scalars().all():
+            workspace_ids = [str(w.id) for w in result.scalars().all()]
+            for workspace_id in workspace_ids:
                 try:
-                    await sync_workspace(str(w.id))
+                    await sync_workspace(workspace_id, standalone=False)
                 except Exception as e:
-                    logger.error(f"Sync failed for workspace={w.id}: {e}")
+                    logger.error(f"Sync failed for workspace={workspace_id}: {e}")
+
+            # Risks for every tenant in one pass, then the (global) views once
+            await compute_risks_batch(session)
+            await refresh_dashboard_rollups(session)
+            for workspace_id in workspace_ids:
+                await response_cache.bump(workspace_id)
+            if settings.FORECAST_PRECOMPUTE:
+                await precompute_standard_forecasts(workspace_ids)
 
     asyncio.run(run_all())
+
+
+def partition_maintenance_job():
+    """RQ Job entrypoint: create upcoming partitions and retire expired ones."""
+    async def run():
+        async with AsyncSessionLocal() as session:
+            return await maintain_partitions(session)
+
+    return asyncio.run(run())
@@ -92,6 +92,30 @@ class GitHubClient:
             )
             response.raise_for_status()
             return response.json()
+    
+    async def get_pull_files(
+        self, 
+        owner: str, 
+        repo: str, 
+        pull_number: int,
+        per_page: int = 100,
+        max_pages: int = 30
+    ) -> List[Dict[str, Any]]:
+        """Fetch the changed files of a pull request (GitHub caps the list at 3000 files)."""
+        files: List[Dict[str, Any]] = []
+        async with httpx.AsyncClient() as client:
+            for page in range(1, max_pages + 1):
+                response = await client.get(
+                    f"{self.BASE_URL}/repos/{owner}/{repo}/pulls/{pull_number}/files",
+                    headers=self._headers(),
+                    params={"per_page": per_page, "page": page}
+                )
+                response.raise_for_status()
+                batch = response.json()
+                files.extend(batch)
+                if len(batch) < per_page:
+                    break
+        return files
 
 
 async def test_connection() -> bool:
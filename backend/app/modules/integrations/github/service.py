@@ -1,6 +1,7 @@
 """
 GitHub integration service for syncing data from GitHub repositories.
 """
+from datetime import datetime, timezone
 from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
@@ -9,6 +10,7 @@ from app.core.config import settings
 from app.modules.integrations.github.client import GitHubClient
 from app.modules.integrations.github.mapper import map_pr_to_pull_request, map_repo_to_repository
 from app.modules.integrations.models import PullRequest, Repo, Integration
+from app.modules.analytics.hotspots import ingest_pr_files
 from app.core.logging import logging
 
 logger = logging.getLogger(__name__)
@@ -116,14 +118,34 @@ class GitHubService:
             )
             existing = result.scalars().first()
             
+            # File lists only feed hotspots once, when the PR is merged (they no longer change)
+            files_ingested_at = existing.files_ingested_at if existing else None
+            merged_at = mapped["raw_data"].get("merged_at")
+            if merged_at and files_ingested_at is None:
+                try:
+                    files = await self.client.get_pull_files(owner, repo, pr_data["number"])
+                    async with session.begin_nested():
+                        await ingest_pr_files(
+                            session,
+                            workspace_id,
+                            repo_record.id,
+                            datetime.fromisoformat(merged_at.replace("Z", "+00:00")),
+                            files,
+                        )
+                    files_ingested_at = datetime.now(timezone.utc)
+                except Exception as e:
+                    logger.warning(f"Failed to ingest files for PR {repo_name}#{pr_data['number']}: {e}")
+            
             if existing:
                 existing.raw_data = mapped["raw_data"]
+                existing.files_ingested_at = files_ingested_at
             else:
                 new_pr = PullRequest(
                     workspace_id=workspace_id,
                     repo_id=repo_record.id,
                     external_id=mapped["external_id"],
-                    raw_data=mapped["raw_data"]
+                    raw_data=mapped["raw_data"],
+                    files_ingested_at=files_ingested_at
                 )
                 session.add(new_pr)
             
@@ -1,8 +1,10 @@
-from sqlalchemy import String, ForeignKey, JSON, Enum
+from sqlalchemy import String, ForeignKey, JSON, Enum, DateTime, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 import enum
+import datetime
+from typing import Optional
 from app.db.models import Base
 
 class IntegrationType(str, enum.Enum):
@@ -45,10 +47,17 @@ class Repo(Base):
 
 class PullRequest(Base):
     __tablename__ = "pull_requests"
+    __table_args__ = (Index("ix_pull_requests_workspace_synced_at", "workspace_id", "synced_at"),)
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     external_id: Mapped[str] = mapped_column(String, index=True)
     raw_data: Mapped[dict] = mapped_column(JSON)
+    # Bumped on every insert/update; the fact cache refreshes from this watermark
+    synced_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+    # When the merged PR's file list went into the hotspot tables (analytics/hotspots.py)
+    files_ingested_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
 
     repo_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("repos.id"))
     workspace_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("workspaces.id"))
@@ -56,11 +65,30 @@ class PullRequest(Base):
 class TrelloCard(Base):
     """Work item from Trello - replaces JiraIssue."""
     __tablename__ = "trello_cards"
+    __table_args__ = (Index("ix_trello_cards_workspace_synced_at", "workspace_id", "synced_at"),)
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     external_id: Mapped[str] = mapped_column(String, index=True)
     name: Mapped[str] = mapped_column(String, index=True)
     list_name: Mapped[str] = mapped_column(String, nullable=True)
     raw_data: Mapped[dict] = mapped_column(JSON)
+    synced_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    workspace_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("workspaces.id"))
+
+class CardTransition(Base):
+    """Append-only history of Trello list moves (one row per Trello action)."""
+    __tablename__ = "card_transitions"
+    __table_args__ = (Index("ix_card_transitions_workspace_occurred_at", "workspace_id", "occurred_at"),)
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    action_id: Mapped[str] = mapped_column(String, unique=True)
+    board_id: Mapped[str] = mapped_column(String, nullable=True)
+    card_external_id: Mapped[str] = mapped_column(String, index=True)
+    from_list: Mapped[str] = mapped_column(String, nullable=True) # None for card creation
+    to_list: Mapped[str] = mapped_column(String)
+    occurred_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True))
 
     workspace_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("workspaces.id"))
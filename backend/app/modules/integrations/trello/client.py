@@ -83,6 +83,36 @@ class TrelloClient:
             response.raise_for_status()
             return response.json()
     
+    async def get_board_actions(
+        self,
+        board_id: str,
+        filter: str = "createCard,updateCard:idList",
+        since: Optional[str] = None,
+        limit: int = 1000,
+        max_pages: int = 50
+    ) -> List[Dict[str, Any]]:
+        """Fetch board actions (newest first), paging backwards until `since`."""
+        actions: List[Dict[str, Any]] = []
+        before = None
+        async with httpx.AsyncClient() as client:
+            for _ in range(max_pages):
+                params = {**self._auth_params(), "filter": filter, "limit": limit}
+                if since:
+                    params["since"] = since
+                if before:
+                    params["before"] = before
+                response = await client.get(
+                    f"{self.BASE_URL}/boards/{board_id}/actions",
+                    params=params
+                )
+                response.raise_for_status()
+                batch = response.json()
+                actions.extend(batch)
+                if len(batch) < limit:
+                    break
+                before = batch[-1]["id"]
+        return actions
+    
     async def get_board_members(self, board_id: str) -> List[Dict[str, Any]]:
         """Fetch members of a board."""
         async with httpx.AsyncClient() as client:
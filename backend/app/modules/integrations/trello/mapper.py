@@ -68,6 +68,39 @@ def map_card_to_work_item(card: Dict[str, Any], list_name: str = None) -> Dict[s
     }
 
 
+def map_action_to_transition(action: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Map a Trello board action to a list transition.
+    
+    Args:
+        action: Raw Trello action (`createCard` or `updateCard` with a list change)
+    
+    Returns:
+        Mapped transition data for CardTransition, or None if not a list move
+    """
+    data = action.get("data", {})
+    card = data.get("card", {})
+    if action.get("type") == "createCard":
+        from_list, to_list = None, data.get("list", {}).get("name")
+    elif data.get("listAfter"):
+        from_list = data.get("listBefore", {}).get("name")
+        to_list = data["listAfter"].get("name")
+    else:
+        return None
+    
+    if not card.get("id") or not to_list or not action.get("date"):
+        return None
+    
+    return {
+        "action_id": action.get("id"),
+        "board_id": data.get("board", {}).get("id"),
+        "card_external_id": card["id"],
+        "from_list": from_list,
+        "to_list": to_list,
+        "occurred_at": datetime.fromisoformat(action["date"].replace("Z", "+00:00"))
+    }
+
+
 def derive_metrics_from_cards(cards: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
     Derive basic metrics from a list of work items.
@@ -3,12 +3,13 @@ Trello integration service for syncing data from Trello boards.
 """
 from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from app.core.config import settings
 from app.modules.integrations.trello.client import TrelloClient
-from app.modules.integrations.trello.mapper import map_card_to_work_item
-from app.modules.integrations.models import TrelloCard, Integration
+from app.modules.integrations.trello.mapper import map_card_to_work_item, map_action_to_transition
+from app.modules.integrations.models import TrelloCard, CardTransition, Integration
 from app.core.logging import logging
 
 logger = logging.getLogger(__name__)
@@ -104,8 +105,41 @@ class TrelloService:
             
             synced += 1
         
+        await self._sync_transitions(session, workspace_id, board_id)
         await session.commit()
         return synced
+    
+    async def _sync_transitions(
+        self, 
+        session: AsyncSession, 
+        workspace_id: str, 
+        board_id: str
+    ) -> int:
+        """Append list-move actions newer than the last one stored for this board."""
+        result = await session.execute(
+            select(func.max(CardTransition.occurred_at)).where(
+                CardTransition.workspace_id == workspace_id,
+                CardTransition.board_id == board_id
+            )
+        )
+        last_seen = result.scalar()
+        
+        actions = await self.client.get_board_actions(
+            board_id, since=last_seen.isoformat() if last_seen else None
+        )
+        rows = []
+        for action in actions:
+            transition = map_action_to_transition(action)
+            if transition:
+                transition["board_id"] = transition["board_id"] or board_id
+                rows.append({**transition, "workspace_id": workspace_id})
+        
+        if rows:
+            # Append-only: replayed actions (same Trello action id) are ignored
+            await session.execute(
+                pg_insert(CardTransition).values(rows).on_conflict_do_nothing(index_elements=["action_id"])
+            )
+        return len(rows)
 
 
 async def sync_trello_for_integration(
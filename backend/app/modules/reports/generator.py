@@ -1,46 +1,38 @@
 from app.modules.reports.models import Report
+from app.modules.reports.llm import LLMClient
+from app.modules.reports.provenance import save_snapshot
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc
+from app.db.session import AsyncSessionLocal
 from app.modules.analytics.models import MetricDaily, RiskSignal
 from app.modules.alerts.models import Alert
-from datetime import datetime
-import json
+from datetime import datetime, timezone
+from typing import Optional
+import asyncio
 
-async def generate_draft_report(session: AsyncSession, workspace_id: str, period: str):
-    # 1. Gather Context
-    # Metrics
-    metrics_res = await session.execute(
-        select(MetricDaily)
-        .where(MetricDaily.workspace_id == workspace_id)
-        .order_by(desc(MetricDaily.day))
-        .limit(7)
-    )
-    metrics = metrics_res.scalars().all()
-    
-    # Risks
-    risks_res = await session.execute(
-        select(RiskSignal).where(RiskSignal.workspace_id == workspace_id).limit(5)
-    )
-    risks = risks_res.scalars().all()
-    
-    # Alerts
-    alerts_res = await session.execute(
-        select(Alert).where(Alert.workspace_id == workspace_id, Alert.status == 'NEW')
+PROMPT_TEMPLATE = "Summarize engineering health based on input metrics."
+
+async def _fetch_all(query):
+    # One session per query: a session runs one statement at a time
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(query)
+        return result.scalars().all()
+
+async def gather_context(workspace_id: str):
+    """Metrics, risks and new alerts of the workspace, queried concurrently."""
+    return await asyncio.gather(
+        _fetch_all(
+            select(MetricDaily)
+            .where(MetricDaily.workspace_id == workspace_id)
+            .order_by(desc(MetricDaily.day))
+            .limit(7)
+        ),
+        _fetch_all(select(RiskSignal).where(RiskSignal.workspace_id == workspace_id).limit(5)),
+        _fetch_all(select(Alert).where(Alert.workspace_id == workspace_id, Alert.status == 'NEW')),
     )
-    alerts = alerts_res.scalars().all()
-    
-    # 2. Construct Prompt inputs (Provenance)
-    sources = {
-        "metrics_count": len(metrics),
-        "risks_count": len(risks),
-        "alerts_count": len(alerts),
-        "metrics_sample": [m.lead_time_p85 for m in metrics] if metrics else []
-    }
-    
-    prompt_template = "Summarize engineering health based on input metrics."
-    
-    # 3. Generate Content (Mock LLM)
-    # In real app, call OpenAI here if env enabled
+
+def build_content(period: str, metrics, risks) -> str:
+    """Template report (used as is when the LLM is disabled)."""
     content = f"# Engineering Report ({period})\n\n"
     content += "## Executive Summary\n"
     content += "Team velocity is stable with slight risks in lead time.\n\n"
@@ -48,31 +40,57 @@ async def generate_draft_report(session: AsyncSession, workspace_id: str, period
     if metrics:
         content += f"- Lead Time P85: {metrics[0].lead_time_p85:.1f}h\n"
         content += f"- Throughput: {metrics[0].throughput:.1f} prs/day\n"
-    
+
     content += "\n## Risks\n"
     for r in risks:
         content += f"- **{r.type}**: {r.explanation}\n"
-        
-    # 4. Save DRAFT
+    return content
+
+async def generate_draft_report(
+    session: AsyncSession, workspace_id: str, period: str, llm: Optional[LLMClient] = None
+):
+    """
+    Build and save a DRAFT report.
+
+    Args:
+        llm: shared client (batch runs); a short-lived one is opened otherwise
+    """
+    if llm is None:
+        async with LLMClient() as llm:
+            return await generate_draft_report(session, workspace_id, period, llm)
+
+    # 1. Gather Context
+    metrics, risks, alerts = await gather_context(workspace_id)
+
+    # 2. Construct Prompt inputs (Provenance)
+    sources = {
+        "metrics_count": len(metrics),
+        "risks_count": len(risks),
+        "alerts_count": len(alerts),
+        "metrics_sample": [m.lead_time_p85 for m in metrics] if metrics else []
+    }
+
+    # 3. Generate Content (template, rewritten by the LLM when enabled)
+    content = build_content(period, metrics, risks)
+    completion = await llm.complete(PROMPT_TEMPLATE, content, inputs=sources)
+    if completion.text is not None:
+        content = completion.text
+        sources["llm_cache"] = {"key": completion.cache_key, "hit": completion.cache_hit}
+
+    # 4. Save DRAFT, with the exact rows it was built from
+    provenance_hash = await save_snapshot(session, {"metrics": metrics, "risks": risks, "alerts": alerts})
     report = Report(
         workspace_id=workspace_id,
         status="DRAFT",
         content=content,
         sources_json=sources,
-        prompt_template=prompt_template,
-        model_info="mock-gpt-4", # or real model name
-        created_at=datetime.utcnow().isoformat(),
-        period=period
+        prompt_template=PROMPT_TEMPLATE,
+        model_info=llm.model,
+        created_at=datetime.now(timezone.utc),
+        period=period,
+        provenance_hash=provenance_hash
     )
     session.add(report)
     await session.commit()
     await session.refresh(report)
     return report
-
-async def send_report(session: AsyncSession, report_id: str):
-    report = await session.get(Report, report_id)
-    if report:
-        report.status = "SENT"
-        # Stub notification logic here (Email/Slack)
-        await session.commit()
-    return report
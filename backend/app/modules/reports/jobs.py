@@ -0,0 +1,155 @@
+"""
+Queued report generation.
+
+`POST /reports/generate` only enqueues `generate_report_job` and returns the
+job id; the worker gathers the context, calls the LLM and saves the DRAFT.
+`GET /reports/jobs/{job_id}` reports the job status and, once finished, the
+report id.
+
+`scheduled_reports_job` is the batch mode, enqueued by worker/scheduler.py
+only: one worker run generates the period report of every workspace,
+sharing one pooled LLM client and at most BATCH_CONCURRENCY reports in
+flight, then delivers the approved reports (see reports/workflow.py).
+
+The enqueue and status helpers use the synchronous RQ client; the routes
+call them through a thread pool.
+"""
+import asyncio
+from datetime import date
+from typing import Any, Dict, Optional
+
+from redis import Redis
+from redis.exceptions import RedisError
+from rq import Queue
+from rq.exceptions import NoSuchJobError
+from rq.job import Job
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.errors import EntityNotFound, ServiceUnavailable
+from app.core.logging import logging
+from app.db.session import AsyncSessionLocal, engine
+from app.modules.reports.generator import generate_draft_report
+from app.modules.reports.llm import LLMClient
+from app.modules.reports.notifications import NotificationDispatcher
+from app.modules.reports.workflow import approve_drafts, deliver_approved_reports, period_start
+
+logger = logging.getLogger(__name__)
+
+BATCH_CONCURRENCY = 4
+JOB_TIMEOUT_SECONDS = 600
+# Finished jobs (and their report id) stay readable for an hour
+RESULT_TTL_SECONDS = 3600
+
+_redis: Optional[Redis] = None
+
+
+def _connection() -> Redis:
+    global _redis
+    if _redis is None:
+        _redis = Redis.from_url(settings.REDIS_URL, socket_timeout=1, socket_connect_timeout=1)
+    return _redis
+
+
+def generate_report_job(workspace_id: str, period: str) -> str:
+    """RQ Job entrypoint: generate one DRAFT report, return its id."""
+    async def run():
+        try:
+            async with AsyncSessionLocal() as session:
+                report = await generate_draft_report(session, workspace_id, period)
+                return str(report.id)
+        finally:
+            # Pooled connections are bound to this event loop
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+async def generate_period_reports(period: str) -> Dict[str, Optional[str]]:
+    """The period report of every workspace (report id, or None on failure), sharing one LLM client."""
+    from app.modules.users.models import Workspace
+    async with AsyncSessionLocal() as session:
+        workspace_ids = [str(w) for w in (await session.execute(select(Workspace.id))).scalars().all()]
+
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def generate(workspace_id: str, llm: LLMClient) -> Optional[str]:
+        async with semaphore, AsyncSessionLocal() as session:
+            try:
+                report = await generate_draft_report(session, workspace_id, period, llm)
+                return str(report.id)
+            except Exception as e:
+                logger.error(f"Report generation failed for workspace={workspace_id}: {e}")
+                return None
+
+    async with LLMClient() as llm:
+        report_ids = await asyncio.gather(*(generate(w, llm) for w in workspace_ids))
+    return dict(zip(workspace_ids, report_ids))
+
+
+def deliver_reports_job() -> Dict[str, int]:
+    """RQ Job entrypoint: send every approved report."""
+    async def run():
+        try:
+            async with AsyncSessionLocal() as session, NotificationDispatcher() as dispatcher:
+                return await deliver_approved_reports(session, dispatcher)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+def scheduled_reports_job(period: Optional[str] = None) -> Dict[str, int]:
+    """
+    RQ Job entrypoint of the scheduled fan-out (worker/scheduler.py): every
+    workspace's report for the period, approved right away with
+    REPORT_AUTO_APPROVE, then delivery of everything approved.
+    """
+    async def run():
+        try:
+            report_ids = await generate_period_reports(period or period_start(date.today()).isoformat())
+            generated = [r for r in report_ids.values() if r]
+            async with AsyncSessionLocal() as session, NotificationDispatcher() as dispatcher:
+                if settings.REPORT_AUTO_APPROVE:
+                    await approve_drafts(session, generated)
+                delivery = await deliver_approved_reports(session, dispatcher)
+            return {"generated": len(generated), "failed_generation": len(report_ids) - len(generated), **delivery}
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+def _enqueue(fn, *args: Any, meta: Dict[str, Any]) -> Job:
+    try:
+        return Queue(connection=_connection()).enqueue(
+            fn, *args, meta=meta, job_timeout=JOB_TIMEOUT_SECONDS, result_ttl=RESULT_TTL_SECONDS,
+        )
+    except RedisError as e:
+        logger.error(f"Could not enqueue {fn.__name__}: {e}")
+        raise ServiceUnavailable("Job queue unavailable, retry shortly")
+
+
+def enqueue_report(workspace_id: str, period: str) -> Job:
+    return _enqueue(generate_report_job, workspace_id, period, meta={"workspace_id": workspace_id})
+
+
+def report_job_status(job_id: str, workspace_id: str) -> Dict[str, Any]:
+    """Status of a report job of the workspace; `report_id` once finished."""
+    try:
+        job = Job.fetch(job_id, connection=_connection())
+    except NoSuchJobError:
+        raise EntityNotFound("Report job")
+    except RedisError as e:
+        logger.error(f"Could not read job {job_id}: {e}")
+        raise ServiceUnavailable("Job queue unavailable, retry shortly")
+    if job.meta.get("workspace_id") != workspace_id:
+        raise EntityNotFound("Report job")
+
+    status = job.get_status(refresh=False)
+    return {
+        "job_id": job.id,
+        "status": getattr(status, "value", status),
+        "report_id": job.return_value() if status == "finished" else None,
+        "error": "Report generation failed" if status == "failed" else None,
+    }
@@ -0,0 +1,120 @@
+"""
+LLM client for report generation.
+
+One `LLMClient` is meant to be shared by every report of a worker run: it
+holds a single pooled HTTP client (keep-alive connections to the provider
+are reused across reports) and bounds the number of concurrent completions
+to LLM_MAX_CONCURRENCY. Use it as an async context manager so that the
+connections are closed with the run.
+
+Backends (LLM_BACKEND):
+- "openai": an OpenAI-compatible chat completions API (LLM_API_URL);
+- "stub": a local, deterministic completion after LLM_STUB_LATENCY_SECONDS,
+  to exercise caching and throughput offline.
+
+Completions go through the response cache (reports/llm_cache.py) first.
+With LLM_ENABLED off (the default), `complete` returns no text and the
+caller falls back to its template content: no network access at all.
+"""
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.logging import logging
+from app.modules.reports.llm_cache import LLMResponseCache, cache_key, default_cache
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("openai", "stub")
+
+
+@dataclass
+class Completion:
+    # None when the LLM is disabled
+    text: Optional[str]
+    cache_key: Optional[str] = None
+    cache_hit: bool = False
+
+
+class LLMClient:
+    """Pooled, concurrency-bounded, cached chat completion client."""
+
+    def __init__(
+        self,
+        enabled: Optional[bool] = None,
+        backend: Optional[str] = None,
+        cache: Optional[LLMResponseCache] = None,
+    ):
+        self.enabled = settings.LLM_ENABLED if enabled is None else enabled
+        self.backend = backend or settings.LLM_BACKEND
+        if self.backend not in BACKENDS:
+            raise ValueError(f"LLM backend must be one of {BACKENDS}")
+        if not self.enabled:
+            self.model = "mock-gpt-4"
+        elif self.backend == "stub":
+            self.model = "stub"
+        else:
+            self.model = settings.LLM_MODEL
+        self.cache = cache if cache is not None else default_cache()
+        self._semaphore = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+        self._http: Optional[httpx.AsyncClient] = None
+        # Provider calls made (cache misses)
+        self.calls = 0
+
+    async def __aenter__(self) -> "LLMClient":
+        if self.enabled and self.backend == "openai":
+            self._http = httpx.AsyncClient(
+                base_url=settings.LLM_API_URL,
+                headers={"Authorization": f"Bearer {settings.LLM_API_KEY}"},
+                timeout=settings.LLM_TIMEOUT_SECONDS,
+                limits=httpx.Limits(max_connections=settings.LLM_MAX_CONCURRENCY),
+            )
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def _call(self, system: str, prompt: str) -> str:
+        self.calls += 1
+        if self.backend == "stub":
+            await asyncio.sleep(settings.LLM_STUB_LATENCY_SECONDS)
+            return f"{prompt.rstrip()}\n\n_{system}_\n"
+        if self._http is None:
+            raise RuntimeError("LLMClient must be used as an async context manager")
+        response = await self._http.post(
+            "/chat/completions",
+            json={
+                "model": self.model,
+                "messages": [{"role": "system", "content": system}, {"role": "user", "content": prompt}],
+            },
+        )
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"]
+
+    async def complete(self, system: str, prompt: str, inputs: Any = None) -> Completion:
+        """
+        Completion of `prompt` under the `system` template.
+
+        Args:
+            inputs: the data the prompt was built from, part of the cache key
+        """
+        if not self.enabled:
+            return Completion(None)
+        key = cache_key(self.model, system, {"prompt": prompt, "inputs": inputs})
+        if self.cache is not None:
+            text = self.cache.get(key)
+            if text is not None:
+                return Completion(text, key, cache_hit=True)
+        async with self._semaphore:
+            text = await self._call(system, prompt)
+        if self.cache is not None:
+            self.cache.put(key, text)
+        return Completion(text, key)
@@ -0,0 +1,115 @@
+"""
+Content-addressed cache of LLM completions.
+
+A report regenerated for the same period with the same data sends the same
+prompt: the completion is looked up under a hash of (model, prompt template,
+normalized inputs) before calling the provider. Inputs are normalized to
+canonical JSON (sorted keys, floats rounded to 6 significant digits) so
+that key order or float noise does not defeat the cache.
+
+Entries are files under LLM_CACHE_DIR (shared by the API and the workers of
+a host, and surviving restarts). Beyond LLM_CACHE_MAX_BYTES, the least
+recently used entries (file mtime, refreshed on every hit) are deleted.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+
+from prometheus_client import Counter
+
+from app.core.config import settings
+from app.core.logging import logging
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_REQUESTS = Counter("llm_cache_requests_total", "LLM response cache lookups", ["result"])
+
+FLOAT_DIGITS = 6
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, float):
+        return float(f"{value:.{FLOAT_DIGITS}g}")
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def cache_key(model: str, prompt_template: str, inputs: Any) -> str:
+    """sha256 of (model, prompt template, normalized inputs)."""
+    payload = json.dumps([model, prompt_template, _normalize(inputs)], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class LLMResponseCache:
+    """Size-bounded on-disk store of completions, one file per key."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        # Bytes stored, as seen by this process (rescanned by every eviction)
+        self._approx_bytes: Optional[int] = None
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.txt"
+
+    def get(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        try:
+            text = path.read_text(encoding="utf-8")
+            os.utime(path)  # recently used
+        except OSError:
+            LLM_CACHE_REQUESTS.labels(result="miss").inc()
+            return None
+        LLM_CACHE_REQUESTS.labels(result="hit").inc()
+        return text
+
+    def put(self, key: str, text: str) -> None:
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename: concurrent readers never see a partial entry
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, path)
+            if self._approx_bytes is None:
+                self._approx_bytes = self.size()
+            else:
+                self._approx_bytes += len(text.encode())
+            if self._approx_bytes > self.max_bytes:
+                self.evict()
+        except OSError as e:
+            logger.warning(f"Could not store LLM response {key}: {e}")
+
+    def size(self) -> int:
+        return sum(p.stat().st_size for p in self.directory.glob("*/*.txt"))
+
+    def evict(self) -> None:
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for path in self.directory.glob("*/*.txt"):
+            try:
+                stat = path.stat()
+            except OSError:  # evicted concurrently
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+        self._approx_bytes = total
+
+
+def default_cache() -> Optional[LLMResponseCache]:
+    """The configured cache, or None when LLM_CACHE_DIR is empty."""
+    if not settings.LLM_CACHE_DIR:
+        return None
+    return LLMResponseCache(settings.LLM_CACHE_DIR, settings.LLM_CACHE_MAX_BYTES)
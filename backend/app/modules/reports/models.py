@@ -1,19 +1,46 @@
-from sqlalchemy import String, ForeignKey, JSON, Text
+from sqlalchemy import String, ForeignKey, JSON, Text, Integer, LargeBinary, DateTime, Index, func
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.dialects.postgresql import UUID
+from typing import Optional
 import uuid
+import datetime
 from app.db.models import Base
 
+# Transitions: see reports/workflow.py
+REPORT_STATUSES = ("DRAFT", "APPROVED", "SENDING", "SENT")
+
 class Report(Base):
     __tablename__ = "reports"
+    __table_args__ = (
+        # Keyset-paginated lists, newest first (optionally by status)
+        Index("ix_reports_workspace_created_at_id", "workspace_id", "created_at", "id"),
+        Index("ix_reports_workspace_status_created_at_id", "workspace_id", "status", "created_at", "id"),
+    )
     
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    status: Mapped[str] = mapped_column(String, default="DRAFT") # DRAFT, APPROVED, SENT
+    status: Mapped[str] = mapped_column(String, default="DRAFT") # DRAFT, APPROVED, SENDING, SENT
+    # Incremented by every transition (optimistic concurrency)
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default="1")
     content: Mapped[str] = mapped_column(Text)
     sources_json: Mapped[dict] = mapped_column(JSON, nullable=True)
     prompt_template: Mapped[str] = mapped_column(Text, nullable=True)
     model_info: Mapped[str] = mapped_column(String, nullable=True)
-    created_at: Mapped[str] = mapped_column(String)
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     period: Mapped[str] = mapped_column(String) # e.g. "2023-10-27"
+    # Manifest of the exact rows the report was built from, see reports/provenance.py
+    provenance_hash: Mapped[Optional[str]] = mapped_column(
+        String(64), ForeignKey("provenance_blobs.hash"), nullable=True
+    )
+    # When a delivery last moved it to SENDING (stale claims are taken over)
+    claimed_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     
     workspace_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("workspaces.id"))
+
+class ProvenanceBlob(Base):
+    """Content-addressed, zlib-compressed JSON document (a source row, or a report's manifest)."""
+    __tablename__ = "provenance_blobs"
+
+    hash: Mapped[str] = mapped_column(String(64), primary_key=True) # sha256 of the canonical JSON
+    data: Mapped[bytes] = mapped_column(LargeBinary)
+    raw_size: Mapped[int] = mapped_column(Integer)
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
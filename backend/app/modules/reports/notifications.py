@@ -0,0 +1,186 @@
+"""
+Batched asynchronous delivery of report notifications (email, Slack).
+
+`NotificationDispatcher.dispatch(notifications)` sends a whole batch at
+once: at most NOTIFY_CONCURRENCY sends are in flight, and a failed send is
+retried up to NOTIFY_MAX_ATTEMPTS times with exponential backoff and
+jitter. Transports are opened once per dispatcher (pooled HTTP client) and
+shared by every notification of the run.
+
+Transports (NOTIFY_TRANSPORT):
+- "local" (default): stand-ins writing to NOTIFY_OUTBOX_DIR, an .eml file
+  per email and a line of slack.jsonl per Slack message;
+- "live": SMTP (SMTP_HOST) and Slack incoming webhooks. A Slack notification
+  carries the webhook of its workspace (Workspace.slack_webhook_url): one
+  pooled client posts to every workspace's own channel.
+"""
+import asyncio
+import json
+import random
+import smtplib
+import uuid
+from dataclasses import dataclass, field
+from email.message import EmailMessage
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import httpx
+from prometheus_client import Counter
+
+from app.core.config import settings
+from app.core.logging import logging
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATIONS_SENT = Counter("report_notifications_total", "Report notifications by outcome", ["channel", "result"])
+
+CHANNELS = ("email", "slack")
+TRANSPORTS = ("local", "live")
+RETRY_BASE_SECONDS = 0.5
+
+
+@dataclass
+class Notification:
+    channel: str  # email, slack
+    subject: str
+    body: str
+    recipients: List[str] = field(default_factory=list)
+    # Caller's reference (the report id), to read the results back
+    key: str = ""
+    # Slack: the workspace's incoming webhook
+    webhook_url: Optional[str] = None
+
+
+class LocalEmailTransport:
+    def __init__(self, outbox: Path):
+        self.outbox = outbox / "email"
+        self.outbox.mkdir(parents=True, exist_ok=True)
+
+    async def send(self, notification: Notification) -> None:
+        message = EmailMessage()
+        message["From"] = settings.NOTIFY_EMAIL_FROM
+        message["To"] = ", ".join(notification.recipients)
+        message["Subject"] = notification.subject
+        message.set_content(notification.body)
+        path = self.outbox / f"{notification.key or 'message'}-{uuid.uuid4().hex[:8]}.eml"
+        await asyncio.to_thread(path.write_bytes, bytes(message))
+
+    async def aclose(self) -> None:
+        pass
+
+
+class LocalSlackTransport:
+    def __init__(self, outbox: Path):
+        outbox.mkdir(parents=True, exist_ok=True)
+        self.path = outbox / "slack.jsonl"
+
+    async def send(self, notification: Notification) -> None:
+        line = json.dumps({"text": f"*{notification.subject}*\n{notification.body}", "key": notification.key})
+        await asyncio.to_thread(self._append, line)
+
+    def _append(self, line: str) -> None:
+        # One write per line: lines from concurrent sends do not interleave
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    async def aclose(self) -> None:
+        pass
+
+
+class SmtpTransport:
+    async def send(self, notification: Notification) -> None:
+        message = EmailMessage()
+        message["From"] = settings.NOTIFY_EMAIL_FROM
+        message["To"] = ", ".join(notification.recipients)
+        message["Subject"] = notification.subject
+        message.set_content(notification.body)
+        await asyncio.to_thread(self._send, message)
+
+    @staticmethod
+    def _send(message: EmailMessage) -> None:
+        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=settings.NOTIFY_TIMEOUT_SECONDS) as smtp:
+            if settings.SMTP_USER:
+                smtp.starttls()
+                smtp.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+            smtp.send_message(message)
+
+    async def aclose(self) -> None:
+        pass
+
+
+class SlackWebhookTransport:
+    def __init__(self):
+        self._http = httpx.AsyncClient(
+            timeout=settings.NOTIFY_TIMEOUT_SECONDS,
+            limits=httpx.Limits(max_connections=settings.NOTIFY_CONCURRENCY),
+        )
+
+    async def send(self, notification: Notification) -> None:
+        if not notification.webhook_url:
+            raise ValueError("Slack notification without a webhook")
+        response = await self._http.post(
+            notification.webhook_url, json={"text": f"*{notification.subject}*\n{notification.body}"}
+        )
+        response.raise_for_status()
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+
+def default_transports() -> Dict[str, object]:
+    """Configured transport per channel."""
+    if settings.NOTIFY_TRANSPORT not in TRANSPORTS:
+        raise ValueError(f"NOTIFY_TRANSPORT must be one of {TRANSPORTS}")
+    if settings.NOTIFY_TRANSPORT == "local":
+        outbox = Path(settings.NOTIFY_OUTBOX_DIR)
+        return {"email": LocalEmailTransport(outbox), "slack": LocalSlackTransport(outbox)}
+    return {"email": SmtpTransport(), "slack": SlackWebhookTransport()}
+
+
+class NotificationDispatcher:
+    """Bounded-concurrency, retrying sender; use as an async context manager."""
+
+    def __init__(
+        self,
+        transports: Optional[Dict[str, object]] = None,
+        concurrency: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        retry_base_seconds: float = RETRY_BASE_SECONDS,
+    ):
+        self.transports = transports if transports is not None else default_transports()
+        self.max_attempts = max_attempts or settings.NOTIFY_MAX_ATTEMPTS
+        self.retry_base_seconds = retry_base_seconds
+        self._semaphore = asyncio.Semaphore(concurrency or settings.NOTIFY_CONCURRENCY)
+
+    async def __aenter__(self) -> "NotificationDispatcher":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        for transport in self.transports.values():
+            await transport.aclose()
+
+    @property
+    def channels(self) -> Sequence[str]:
+        return tuple(self.transports)
+
+    async def _send(self, notification: Notification) -> bool:
+        transport = self.transports[notification.channel]
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                async with self._semaphore:
+                    await transport.send(notification)
+                NOTIFICATIONS_SENT.labels(channel=notification.channel, result="sent").inc()
+                return True
+            except Exception as e:
+                if attempt == self.max_attempts:
+                    logger.error(f"Could not send {notification.channel} notification {notification.key}: {e}")
+                    break
+                NOTIFICATIONS_SENT.labels(channel=notification.channel, result="retried").inc()
+                # Backoff outside the semaphore: a waiting retry does not hold a slot
+                await asyncio.sleep(self.retry_base_seconds * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+        NOTIFICATIONS_SENT.labels(channel=notification.channel, result="failed").inc()
+        return False
+
+    async def dispatch(self, notifications: Sequence[Notification]) -> List[bool]:
+        """Send every notification concurrently; delivered or not, in order."""
+        return list(await asyncio.gather(*(self._send(n) for n in notifications)))
@@ -0,0 +1,128 @@
+"""
+Provenance of reports: the exact rows a report was built from.
+
+Every source row (metric day, risk signal, alert) is stored once as a
+content-addressed blob: the sha256 of its canonical JSON, zlib-compressed.
+A report only references a manifest (itself a blob) listing its row hashes
+per kind. Consecutive reports mostly read the same rows, and regenerating a
+period with unchanged data yields the very same manifest, so full
+provenance costs each report little more than its changed rows; nothing
+but the manifest hash lands in the `reports` table.
+
+Loading a snapshot is two primary-key lookups (the manifest, then all its
+rows at once). Two snapshots diff by row identity (metric day, signal or
+alert id) and row hash, without decoding unchanged rows.
+"""
+import hashlib
+import json
+import zlib
+from typing import Any, Dict, List, Optional, Sequence
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import inspect, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.modules.reports.models import ProvenanceBlob
+
+# Identity of a row across snapshots, per kind
+ROW_KEYS = {"metrics": "day", "risks": "id", "alerts": "id"}
+
+
+def encode(document: Any) -> tuple:
+    """(hash, compressed bytes, raw size) of a JSON document."""
+    raw = json.dumps(jsonable_encoder(document), sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.sha256(raw).hexdigest(), zlib.compress(raw), len(raw)
+
+
+def decode(data: bytes) -> Any:
+    return json.loads(zlib.decompress(data))
+
+
+def row_document(row: Any) -> Dict[str, Any]:
+    """All mapped columns of an ORM row."""
+    return {attr.key: getattr(row, attr.key) for attr in inspect(row).mapper.column_attrs}
+
+
+async def _store(session: AsyncSession, blobs: Dict[str, tuple]) -> None:
+    if not blobs:
+        return
+    await session.execute(
+        insert(ProvenanceBlob)
+        .values([{"hash": h, "data": data, "raw_size": size} for h, (data, size) in blobs.items()])
+        .on_conflict_do_nothing(index_elements=["hash"])
+    )
+
+
+async def save_snapshot(session: AsyncSession, sources: Dict[str, Sequence[Any]]) -> str:
+    """
+    Store the rows of each kind (ORM rows) and their manifest; return the
+    manifest hash. Not committed: saved with the report referencing it.
+    """
+    blobs: Dict[str, tuple] = {}
+    manifest: Dict[str, List[str]] = {}
+    for kind, rows in sources.items():
+        hashes = []
+        for row in rows:
+            digest, data, size = encode(row_document(row))
+            blobs[digest] = (data, size)
+            hashes.append(digest)
+        manifest[kind] = hashes
+    manifest_hash, data, size = encode(manifest)
+    await _store(session, blobs)
+    await _store(session, {manifest_hash: (data, size)})
+    return manifest_hash
+
+
+async def _load_blobs(session: AsyncSession, hashes: Sequence[str]) -> Dict[str, bytes]:
+    if not hashes:
+        return {}
+    result = await session.execute(
+        select(ProvenanceBlob.hash, ProvenanceBlob.data).where(ProvenanceBlob.hash.in_(set(hashes)))
+    )
+    return dict(result.all())
+
+
+async def load_manifest(session: AsyncSession, manifest_hash: str) -> Optional[Dict[str, List[str]]]:
+    data = (await _load_blobs(session, [manifest_hash])).get(manifest_hash)
+    return decode(data) if data is not None else None
+
+
+async def load_snapshot(session: AsyncSession, manifest_hash: str) -> Optional[Dict[str, List[Dict]]]:
+    """Rows per kind, in the order the report used them."""
+    manifest = await load_manifest(session, manifest_hash)
+    if manifest is None:
+        return None
+    blobs = await _load_blobs(session, [h for hashes in manifest.values() for h in hashes])
+    return {kind: [decode(blobs[h]) for h in hashes] for kind, hashes in manifest.items()}
+
+
+async def diff_snapshots(session: AsyncSession, before_hash: str, after_hash: str) -> Dict[str, Dict]:
+    """
+    Per kind: rows only in `after` (added), only in `before` (removed),
+    present in both with other values (changed: before / after), and the
+    number of identical rows.
+    """
+    before = await load_manifest(session, before_hash) or {}
+    after = await load_manifest(session, after_hash) or {}
+    kinds = sorted(set(before) | set(after))
+    if before_hash == after_hash:
+        return {k: {"added": [], "removed": [], "changed": [], "unchanged": len(after[k])} for k in kinds}
+
+    # Identical hashes are identical rows: only the differing ones are decoded
+    shared = {k: set(before.get(k, [])) & set(after.get(k, [])) for k in kinds}
+    differing = [h for k in kinds for h in (before.get(k, []) + after.get(k, [])) if h not in shared[k]]
+    blobs = await _load_blobs(session, differing)
+
+    diff = {}
+    for kind in kinds:
+        key = ROW_KEYS.get(kind, "id")
+        old = {r[key]: r for r in (decode(blobs[h]) for h in before.get(kind, []) if h not in shared[kind])}
+        new = {r[key]: r for r in (decode(blobs[h]) for h in after.get(kind, []) if h not in shared[kind])}
+        diff[kind] = {
+            "added": [new[k] for k in new if k not in old],
+            "removed": [old[k] for k in old if k not in new],
+            "changed": [{"before": old[k], "after": new[k]} for k in new if k in old],
+            "unchanged": len(shared[kind]),
+        }
+    return diff
@@ -1,60 +1,121 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
-from typing import List, Any
+from sqlalchemy import select
+from typing import List, Any, Optional
+from app.core.pagination import paginate, paginate_in, set_next_cursor, split_page
 from app.db.session import get_db
 from app.modules.users.routes import get_current_active_user
 from app.modules.users.schemas import User
-from app.modules.reports.models import Report
-from app.modules.reports.generator import generate_draft_report, send_report
+from app.modules.reports.models import REPORT_STATUSES, Report
+from app.modules.reports.workflow import send_report, transition
+from app.modules.reports.provenance import diff_snapshots, load_snapshot
+from app.modules.reports.jobs import enqueue_report, report_job_status
 
 router = APIRouter()
 
-@router.post("/generate", response_model=Any)
+@router.post("/generate", status_code=status.HTTP_202_ACCEPTED)
 async def create_report(
     period: str,
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
 ):
-    return await generate_draft_report(db, str(current_user.workspace_id), period)
+    """Queue the generation of a DRAFT report; poll /reports/jobs/{job_id} for the result."""
+    # The RQ client is synchronous: keep its round trips off the event loop
+    job = await run_in_threadpool(enqueue_report, str(current_user.workspace_id), period)
+    return {"job_id": job.get_id(), "status": "queued"}
+
+@router.get("/jobs/{job_id}")
+async def get_report_job(
+    job_id: str,
+    current_user: User = Depends(get_current_active_user),
+):
+    return await run_in_threadpool(report_job_status, job_id, str(current_user.workspace_id))
+
+# List projection: everything but the large columns (content, sources, prompt)
+SUMMARY_COLUMNS = (Report.id, Report.status, Report.version, Report.period, Report.created_at, Report.model_info)
 
 @router.get("/", response_model=List[Any])
 async def list_reports(
+    response: Response,
+    status: Optional[str] = Query(None, description="Comma-separated statuses (DRAFT, APPROVED, SENDING, SENT)"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Report summaries, newest first, one keyset page at a time (next page: X-Next-Cursor)."""
+    statuses = sorted({s.strip().upper() for s in status.split(",") if s.strip()}) if status else None
+    if statuses and any(s not in REPORT_STATUSES for s in statuses):
+        raise HTTPException(status_code=400, detail=f"status must be among {list(REPORT_STATUSES)}")
+
+    query = select(*SUMMARY_COLUMNS).where(Report.workspace_id == current_user.workspace_id)
+    if statuses:
+        page = paginate_in(query, Report.status, statuses, Report.created_at, Report.id, limit, cursor)
+    else:
+        page = paginate(query, Report.created_at, Report.id, limit, cursor)
+    result = await db.execute(page)
+    rows, next_cursor = split_page(result.all(), limit, "created_at")
+    set_next_cursor(response, next_cursor)
+    return [row._asdict() for row in rows]
+
+async def _get_report(db: AsyncSession, report_id: str, workspace_id) -> Report:
+    result = await db.execute(select(Report).where(Report.id == report_id, Report.workspace_id == workspace_id))
+    report = result.scalars().first()
+    if not report:
+        raise HTTPException(status_code=404, detail="Report not found")
+    return report
+
+@router.get("/{report_id}")
+async def get_report(
+    report_id: str,
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
-    result = await db.execute(
-        select(Report)
-        .where(Report.workspace_id == current_user.workspace_id)
-        .order_by(desc(Report.created_at))
-    )
-    return result.scalars().all()
+    return await _get_report(db, report_id, current_user.workspace_id)
+
+@router.get("/{report_id}/provenance")
+async def get_report_provenance(
+    report_id: str,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """The exact metric rows, risk signals and alerts the report was built from."""
+    report = await _get_report(db, report_id, current_user.workspace_id)
+    if not report.provenance_hash:
+        raise HTTPException(status_code=404, detail="Report has no provenance snapshot")
+    return {"provenance_hash": report.provenance_hash, "sources": await load_snapshot(db, report.provenance_hash)}
+
+@router.get("/{report_id}/provenance/diff")
+async def diff_report_provenance(
+    report_id: str,
+    against: str,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """What changed in the sources from report `against` to this report."""
+    report = await _get_report(db, report_id, current_user.workspace_id)
+    other = await _get_report(db, against, current_user.workspace_id)
+    if not report.provenance_hash or not other.provenance_hash:
+        raise HTTPException(status_code=404, detail="Report has no provenance snapshot")
+    return await diff_snapshots(db, other.provenance_hash, report.provenance_hash)
 
 @router.post("/{report_id}/approve")
 async def approve_report(
     report_id: str,
+    version: Optional[int] = Query(None, description="Version the client read: 409 if the report changed since"),
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
-    result = await db.execute(select(Report).where(Report.id == report_id, Report.workspace_id == current_user.workspace_id))
-    report = result.scalars().first()
-    if not report:
-        raise HTTPException(status_code=404, detail="Report not found")
-        
-    report.status = "APPROVED"
-    await db.commit()
-    return {"status": "APPROVED"}
+    report = await transition(db, report_id, current_user.workspace_id, "APPROVED", version)
+    return {"status": report.status, "version": report.version}
 
 @router.post("/{report_id}/send")
 async def send_report_endpoint(
     report_id: str,
+    version: Optional[int] = Query(None, description="Version the client read: 409 if the report changed since"),
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
-    # Verify ownership
-    result = await db.execute(select(Report).where(Report.id == report_id, Report.workspace_id == current_user.workspace_id))
-    if not result.scalars().first():
-        raise HTTPException(status_code=404, detail="Report not found")
-        
-    report = await send_report(db, report_id)
-    return {"status": report.status}
+    """Deliver an approved report now (email to the workspace users, Slack); APPROVED again if it fails."""
+    report = await send_report(db, report_id, current_user.workspace_id, version)
+    return {"status": report.status, "version": report.version}
@@ -0,0 +1,251 @@
+"""
+Report workflow: status transitions and delivery.
+
+    DRAFT -> APPROVED -> SENDING -> SENT
+                  ^---------'  (delivery failed: back to APPROVED)
+
+Every transition is one conditional UPDATE: it only applies if the report is
+in an allowed source status (and, when the client sends the version it
+read, still at that version), and increments `version`. Two reviewers
+approving at once, or two deliveries of the same report, cannot both win:
+the loser gets 409. SENDING is the claim a delivery holds while it sends.
+
+A delivery that fails before recording its outcome (a transport or query
+error) moves its claims back to APPROVED. One whose worker died leaves them
+SENDING: a claim older than NOTIFY_CLAIM_TIMEOUT_SECONDS (`claimed_at`) is
+taken over by the next batch delivery.
+
+Delivery of approved reports runs in batches of NOTIFY_BATCH_SIZE: one
+UPDATE claims a batch (SKIP LOCKED, so concurrent runs split the work), two
+queries load its destinations (the workspace users' emails, the workspace's
+Slack webhook), the notifications of the whole batch go out through the
+dispatcher (bounded concurrency, retries), and two UPDATEs record the
+outcome.
+"""
+import uuid
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.errors import Conflict, EntityNotFound
+from app.core.logging import logging
+from app.modules.reports.models import Report
+from app.modules.reports.notifications import Notification, NotificationDispatcher
+
+logger = logging.getLogger(__name__)
+
+TRANSITIONS: Dict[str, tuple] = {
+    "DRAFT": ("APPROVED",),
+    "APPROVED": ("SENDING",),
+    "SENDING": ("SENT", "APPROVED"),
+    "SENT": (),
+}
+
+
+def sources_of(status: str) -> List[str]:
+    """Statuses a report may move to `status` from."""
+    return [source for source, targets in TRANSITIONS.items() if status in targets]
+
+
+def period_start(today: date) -> date:
+    """Start of the scheduled period (week) containing `today`."""
+    return today - timedelta(days=(today.weekday() - settings.REPORT_SCHEDULE_WEEKDAY) % 7)
+
+
+async def transition(
+    session: AsyncSession,
+    report_id: str,
+    workspace_id: str,
+    to_status: str,
+    expected_version: Optional[int] = None,
+):
+    """
+    Move one report to `to_status` and commit; returns its (id, status, version).
+
+    Raises:
+        EntityNotFound: no such report in the workspace
+        Conflict: not allowed from the current status, or version changed
+    """
+    values = {"status": to_status, "version": Report.version + 1}
+    if to_status == "SENDING":
+        values["claimed_at"] = func.now()
+    query = (
+        update(Report)
+        .where(Report.id == report_id, Report.workspace_id == workspace_id, Report.status.in_(sources_of(to_status)))
+        .values(**values)
+        .returning(Report.id, Report.status, Report.version)
+    )
+    if expected_version is not None:
+        query = query.where(Report.version == expected_version)
+    row = (await session.execute(query)).first()
+    await session.commit()
+    if row is not None:
+        return row
+
+    current = (await session.execute(
+        select(Report.status, Report.version).where(Report.id == report_id, Report.workspace_id == workspace_id)
+    )).first()
+    if current is None:
+        raise EntityNotFound("Report")
+    if expected_version is not None and current.version != expected_version:
+        raise Conflict(f"Report was modified (version {current.version}, expected {expected_version})")
+    raise Conflict(f"Report is {current.status}: cannot move to {to_status}")
+
+
+async def _claim(session: AsyncSession, limit: int, exclude: Sequence[uuid.UUID]) -> list:
+    """APPROVED (or abandoned SENDING) -> SENDING for up to `limit` reports, oldest first."""
+    stale = func.now() - timedelta(seconds=settings.NOTIFY_CLAIM_TIMEOUT_SECONDS)
+    candidates = (
+        select(Report.id)
+        .where(or_(
+            Report.status == "APPROVED",
+            and_(Report.status == "SENDING", or_(Report.claimed_at.is_(None), Report.claimed_at < stale)),
+        ))
+        .order_by(Report.created_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    if exclude:
+        candidates = candidates.where(Report.id.notin_(exclude))
+    result = await session.execute(
+        update(Report)
+        .where(Report.id.in_(candidates.scalar_subquery()))
+        .values(status="SENDING", version=Report.version + 1, claimed_at=func.now())
+        .returning(Report.id, Report.workspace_id, Report.period, Report.content)
+    )
+    claimed = result.all()
+    await session.commit()
+    return claimed
+
+
+Destinations = Tuple[Dict[uuid.UUID, List[str]], Dict[uuid.UUID, str]]
+
+
+async def _destinations(session: AsyncSession, workspace_ids) -> Destinations:
+    """(active users' emails, Slack webhook) per workspace; workspaces without a webhook are left out."""
+    from app.modules.users.models import AppUser, Workspace
+    workspace_ids = set(workspace_ids)
+    result = await session.execute(
+        select(AppUser.workspace_id, AppUser.email)
+        .where(AppUser.workspace_id.in_(workspace_ids), AppUser.is_active.is_(True))
+    )
+    recipients = defaultdict(list)
+    for workspace_id, email in result.all():
+        recipients[workspace_id].append(email)
+    result = await session.execute(
+        select(Workspace.id, Workspace.slack_webhook_url)
+        .where(Workspace.id.in_(workspace_ids), Workspace.slack_webhook_url.is_not(None))
+    )
+    webhooks = {workspace_id: url for workspace_id, url in result.all() if url}
+    return recipients, webhooks
+
+
+def _notifications(report, recipients: List[str], webhook_url: Optional[str], channels: Sequence[str]) -> List[Notification]:
+    subject = f"Engineering Report ({report.period})"
+    notifications = []
+    if "email" in channels and recipients:
+        notifications.append(Notification("email", subject, report.content, sorted(recipients), str(report.id)))
+    if "slack" in channels and webhook_url:
+        notifications.append(Notification("slack", subject, report.content, key=str(report.id), webhook_url=webhook_url))
+    return notifications
+
+
+async def _mark(session: AsyncSession, ids: Sequence[uuid.UUID], status: str) -> None:
+    """SENDING -> `status` for the given reports (not committed)."""
+    if ids:
+        await session.execute(
+            update(Report)
+            .where(Report.id.in_(ids), Report.status == "SENDING")
+            .values(status=status, version=Report.version + 1)
+        )
+
+
+async def _deliver(
+    session: AsyncSession,
+    dispatcher: NotificationDispatcher,
+    claimed: list,
+    destinations: Optional[Destinations] = None,
+) -> Dict[str, list]:
+    """Send claimed (SENDING) reports; SENT when every notification went out, else back to APPROVED."""
+    try:
+        recipients, webhooks = destinations or await _destinations(session, [r.workspace_id for r in claimed])
+        notifications = [
+            n for r in claimed
+            for n in _notifications(r, recipients.get(r.workspace_id, []), webhooks.get(r.workspace_id), dispatcher.channels)
+        ]
+        delivered = await dispatcher.dispatch(notifications)
+    except Exception:
+        # Nothing recorded yet: release the claims rather than leave them SENDING
+        await session.rollback()
+        await _mark(session, [r.id for r in claimed], "APPROVED")
+        await session.commit()
+        raise
+
+    failed_keys = {n.key for n, ok in zip(notifications, delivered) if not ok}
+    sent = [r.id for r in claimed if str(r.id) not in failed_keys]
+    failed = [r.id for r in claimed if str(r.id) in failed_keys]
+    await _mark(session, sent, "SENT")
+    await _mark(session, failed, "APPROVED")
+    await session.commit()
+    return {"sent": sent, "failed": failed}
+
+
+async def send_report(
+    session: AsyncSession,
+    report_id: str,
+    workspace_id: str,
+    expected_version: Optional[int] = None,
+    dispatcher: Optional[NotificationDispatcher] = None,
+):
+    """Send one approved report now; returns its final (status, version)."""
+    if dispatcher is None:
+        # Transports and destinations first: if they fail, the report is still APPROVED
+        async with NotificationDispatcher() as dispatcher:
+            return await send_report(session, report_id, workspace_id, expected_version, dispatcher)
+    destinations = await _destinations(session, [workspace_id])
+    await transition(session, report_id, workspace_id, "SENDING", expected_version)
+    report = (await session.execute(
+        select(Report.id, Report.workspace_id, Report.period, Report.content).where(Report.id == report_id)
+    )).first()
+    await _deliver(session, dispatcher, [report], destinations)
+    return (await session.execute(
+        select(Report.id, Report.status, Report.version).where(Report.id == report_id)
+    )).first()
+
+
+async def deliver_approved_reports(
+    session: AsyncSession,
+    dispatcher: NotificationDispatcher,
+    batch_size: Optional[int] = None,
+) -> Dict[str, int]:
+    """Send every APPROVED report, batch by batch; failed ones stay APPROVED for the next run."""
+    batch_size = batch_size or settings.NOTIFY_BATCH_SIZE
+    totals = {"sent": 0, "failed": 0}
+    failed: List[uuid.UUID] = []
+    while True:
+        claimed = await _claim(session, batch_size, failed)
+        if not claimed:
+            break
+        outcome = await _deliver(session, dispatcher, claimed)
+        failed.extend(outcome["failed"])
+        totals["sent"] += len(outcome["sent"])
+        totals["failed"] += len(outcome["failed"])
+    logger.info(f"Report delivery: {totals['sent']} sent, {totals['failed']} failed")
+    return totals
+
+
+async def approve_drafts(session: AsyncSession, report_ids: Sequence[str]) -> int:
+    """DRAFT -> APPROVED for the given reports (scheduled runs with REPORT_AUTO_APPROVE)."""
+    if not report_ids:
+        return 0
+    result = await session.execute(
+        update(Report)
+        .where(Report.id.in_(report_ids), Report.status == "DRAFT")
+        .values(status="APPROVED", version=Report.version + 1)
+    )
+    await session.commit()
+    return result.rowcount
@@ -0,0 +1,132 @@
+"""
+Cache of authenticated users, keyed by token subject (the email).
+
+Resolving the user behind a token used to cost a query on every API call.
+Resolved users are now kept in-process for USER_CACHE_TTL_SECONDS, and,
+with USER_CACHE_REDIS, in Redis as a second tier shared by the API
+processes (a restarted or scaled-out process does not hit the database
+for every active user).
+
+A change that affects authorization (deactivation, role or workspace
+change) must call `invalidate(email)`: the entry is dropped from this
+process and from Redis. Other processes drop their in-process copy within
+the TTL, which bounds how long a revoked user keeps access there.
+
+With AUTH_TRUST_TOKEN_CLAIMS, a user missing from the cache is built from
+the token's claims without any lookup; `issued_before_invalidation` keeps
+this process from trusting tokens issued before an invalidation.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import redis.asyncio as aioredis
+from prometheus_client import Counter
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.logging import logging
+from app.modules.users.schemas import User
+
+logger = logging.getLogger(__name__)
+
+USER_CACHE_REQUESTS = Counter("auth_user_cache_requests_total", "Authenticated user lookups", ["result"])
+
+KEY_PREFIX = "auth:user:"
+
+
+class UserCache:
+    """In-process TTL + LRU map of users, with an optional Redis tier."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int, redis_url: Optional[str] = None):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.redis_url = redis_url
+        self._entries: "OrderedDict[str, Tuple[float, User]]" = OrderedDict()
+        # email -> time of the last invalidation (epoch seconds)
+        self._invalidated_at: Dict[str, float] = {}
+        self._client: Optional[aioredis.Redis] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _redis(self) -> Optional[aioredis.Redis]:
+        if not self.redis_url:
+            return None
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._client = aioredis.from_url(self.redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+            self._loop = loop
+        return self._client
+
+    def _get_local(self, email: str) -> Optional[User]:
+        entry = self._entries.get(email)
+        if entry is None:
+            return None
+        stored_at, user = entry
+        if time.monotonic() - stored_at > self.ttl_seconds:
+            del self._entries[email]
+            return None
+        self._entries.move_to_end(email)
+        return user
+
+    def _put_local(self, email: str, user: User) -> None:
+        self._entries[email] = (time.monotonic(), user)
+        self._entries.move_to_end(email)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(self, email: str) -> Optional[User]:
+        user = self._get_local(email)
+        if user is not None:
+            USER_CACHE_REQUESTS.labels(result="hit").inc()
+            return user
+        client = self._redis()
+        if client is not None:
+            try:
+                raw = await client.get(KEY_PREFIX + email)
+            except RedisError as e:
+                logger.warning(f"User cache unavailable: {e}")
+                raw = None
+            if raw is not None:
+                user = User.model_validate_json(raw)
+                self._put_local(email, user)
+                USER_CACHE_REQUESTS.labels(result="redis_hit").inc()
+                return user
+        USER_CACHE_REQUESTS.labels(result="miss").inc()
+        return None
+
+    async def put(self, user: User) -> None:
+        self._put_local(user.email, user)
+        client = self._redis()
+        if client is not None:
+            try:
+                await client.set(KEY_PREFIX + user.email, user.model_dump_json(), ex=int(self.ttl_seconds))
+            except RedisError as e:
+                logger.warning(f"User cache unavailable: {e}")
+
+    def issued_before_invalidation(self, email: str, issued_at: float) -> bool:
+        return issued_at <= self._invalidated_at.get(email, float("-inf"))
+
+    async def invalidate(self, email: str) -> None:
+        self._entries.pop(email, None)
+        self._invalidated_at[email] = time.time()
+        client = self._redis()
+        if client is not None:
+            try:
+                await client.delete(KEY_PREFIX + email)
+            except RedisError as e:
+                logger.warning(f"Could not invalidate cached user {email}: {e}")
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._invalidated_at.clear()
+
+
+user_cache = UserCache(
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+    max_entries=settings.USER_CACHE_MAX_ENTRIES,
+    redis_url=settings.REDIS_URL if settings.USER_CACHE_REDIS else None,
+)
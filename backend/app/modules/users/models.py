@@ -1,6 +1,7 @@
 from sqlalchemy import String, Column, ForeignKey, Boolean
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
+from typing import Optional
 import uuid
 from app.db.models import Base
 
@@ -10,6 +11,8 @@ class Workspace(Base):
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name: Mapped[str] = mapped_column(String, index=True)
     slug: Mapped[str] = mapped_column(String, unique=True, index=True)
+    # Incoming webhook receiving the report notifications; none: no Slack message
+    slack_webhook_url: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     
     users = relationship("AppUser", back_populates="workspace")
     integrations = relationship("Integration", back_populates="workspace")
@@ -1,11 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Annotated, List
+from typing import Annotated, List, Optional
+import uuid
 
 from app.db.session import get_db
-from app.modules.users.schemas import User, UserCreate, Token, UserUpdate, Workspace, WorkspaceCreate
-from app.modules.users.service import UserService
+from app.modules.users.cache import user_cache
+from app.modules.users.models import Workspace as WorkspaceModel
+from app.modules.users.schemas import User, UserCreate, Token, UserUpdate, Workspace, WorkspaceCreate, WorkspaceUpdate
+from app.modules.users.service import ROLES, UserService
 from app.core.security import create_access_token
 from app.core.errors import AuthError, EntityNotFound
 from app.core.config import settings
@@ -15,6 +18,15 @@ router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 user_service = UserService()
 
+def _user_from_claims(payload: dict) -> Optional[User]:
+    """User described by the token's claims, if it carries them all."""
+    if not all(payload.get(claim) for claim in ("uid", "role", "iat")):
+        return None
+    return User(
+        id=payload["uid"], email=payload["sub"], role=payload["role"],
+        workspace_id=payload.get("ws"), is_active=True,
+    )
+
 async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: Annotated[AsyncSession, Depends(get_db)]) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -28,10 +40,21 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: An
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-        
-    user = await user_service.get_user_by_email(db, email=email)
-    if user is None:
+
+    # Cache first (see users/cache.py): no query for a recently seen user
+    user = await user_cache.get(email)
+    if user is not None:
+        return user
+    if settings.AUTH_TRUST_TOKEN_CLAIMS and not user_cache.issued_before_invalidation(email, payload.get("iat", 0)):
+        user = _user_from_claims(payload)
+        if user is not None:
+            return user
+
+    db_user = await user_service.get_user_by_email(db, email=email)
+    if db_user is None:
         raise credentials_exception
+    user = User.model_validate(db_user)
+    await user_cache.put(user)
     return user
 
 async def get_current_active_user(current_user: Annotated[User, Depends(get_current_user)]):
@@ -56,7 +79,10 @@ async def login(form_data: Annotated[OAuth2PasswordRequestForm, Depends()], db:
     user = await user_service.authenticate(db, form_data.username, form_data.password)
     if not user:
         raise AuthError("Incorrect email or password")
-    access_token = create_access_token(subject=user.email)
+    access_token = create_access_token(
+        subject=user.email,
+        claims={"uid": str(user.id), "ws": str(user.workspace_id) if user.workspace_id else None, "role": user.role},
+    )
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=User)
@@ -66,10 +92,45 @@ async def read_users_me(current_user: Annotated[User, Depends(get_current_active
 @router.get("/workspaces", response_model=List[Workspace])
 async def read_workspaces(current_user: Annotated[User, Depends(get_current_active_user)], db: Annotated[AsyncSession, Depends(get_db)]):
     # Determine what workspaces user can see. For now, just their own.
-    # If user has workspace_id, return that workspace.
-    if current_user.workspace:
-        return [current_user.workspace]
-    return []
+    if current_user.workspace_id is None:
+        return []
+    workspace = await db.get(WorkspaceModel, current_user.workspace_id)
+    return [workspace] if workspace else []
+
+@router.patch("/workspaces/current", response_model=Workspace)
+async def update_current_workspace(
+    workspace_in: WorkspaceUpdate,
+    current_user: Annotated[User, Depends(get_current_admin_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    """Settings of the caller's workspace (the Slack webhook of its report notifications)."""
+    if workspace_in.slack_webhook_url and not workspace_in.slack_webhook_url.startswith("https://"):
+        raise HTTPException(status_code=400, detail="slack_webhook_url must be an https:// URL")
+    workspace = await db.get(WorkspaceModel, current_user.workspace_id) if current_user.workspace_id else None
+    if workspace is None:
+        raise EntityNotFound("Workspace")
+    return await user_service.update_workspace(db, workspace, workspace_in)
+
+@router.patch("/users/{user_id}", response_model=User)
+async def update_user(
+    user_id: uuid.UUID,
+    user_in: UserUpdate,
+    current_user: Annotated[User, Depends(get_current_admin_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    if user_in.role is not None and user_in.role not in ROLES:
+        raise HTTPException(status_code=400, detail=f"role must be one of {list(ROLES)}")
+    user = await user_service.get_user(db, user_id, current_user.workspace_id)
+    return await user_service.update_user(db, user, user_in)
+
+@router.post("/users/{user_id}/deactivate", response_model=User)
+async def deactivate_user(
+    user_id: uuid.UUID,
+    current_user: Annotated[User, Depends(get_current_admin_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    user = await user_service.get_user(db, user_id, current_user.workspace_id)
+    return await user_service.deactivate_user(db, user)
 
 # Example Create Workspace endpoint if needed
 @router.post("/workspaces", response_model=Workspace)
@@ -9,6 +9,10 @@ class WorkspaceBase(BaseModel):
 class WorkspaceCreate(WorkspaceBase):
     pass
 
+class WorkspaceUpdate(BaseModel):
+    # Slack incoming webhook for the report notifications; "" removes it
+    slack_webhook_url: Optional[str] = None
+
 class Workspace(WorkspaceBase):
     id: UUID
     model_config = ConfigDict(from_attributes=True)
@@ -1,11 +1,15 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.modules.users.models import AppUser, Workspace
-from app.modules.users.schemas import UserCreate
-from app.core.security import get_password_hash, verify_password
+from app.modules.users.cache import user_cache
+from app.modules.users.schemas import UserCreate, UserUpdate, WorkspaceUpdate
+from app.core.security import get_password_hash, verify_and_update_password
 from app.core.errors import EntityNotFound, AuthError
+from typing import Optional
 import uuid
 
+ROLES = ("ADMIN", "ANALYST", "READER")
+
 class UserService:
     async def get_user_by_email(self, db: AsyncSession, email: str) -> AppUser | None:
         result = await db.execute(select(AppUser).where(AppUser.email == email))
@@ -31,7 +35,7 @@ class UserService:
         
         db_user = AppUser(
             email=user_in.email,
-            hashed_password=get_password_hash(user_in.password),
+            hashed_password=await get_password_hash(user_in.password),
             full_name=user_in.full_name,
             workspace_id=workspace_id,
             role="ADMIN" if workspace_id else "READER" # First user of workspace is ADMIN? Simplified logic.
@@ -45,6 +49,47 @@ class UserService:
         user = await self.get_user_by_email(db, email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        valid, new_hash = await verify_and_update_password(password, user.hashed_password)
+        if not valid:
             return None
+        if new_hash is not None:
+            # Stored with another BCRYPT_ROUNDS: migrated now that the password is known
+            user.hashed_password = new_hash
+            await db.commit()
+            await db.refresh(user)
+        return user
+
+    async def get_user(self, db: AsyncSession, user_id: uuid.UUID, workspace_id: Optional[uuid.UUID] = None) -> AppUser:
+        query = select(AppUser).where(AppUser.id == user_id)
+        if workspace_id is not None:
+            query = query.where(AppUser.workspace_id == workspace_id)
+        user = (await db.execute(query)).scalars().first()
+        if user is None:
+            raise EntityNotFound("User")
+        return user
+
+    async def update_user(self, db: AsyncSession, user: AppUser, user_in: UserUpdate) -> AppUser:
+        if user_in.full_name is not None:
+            user.full_name = user_in.full_name
+        if user_in.role is not None:
+            user.role = user_in.role
+        await db.commit()
+        await db.refresh(user)
+        # The cached user carries the role
+        await user_cache.invalidate(user.email)
         return user
+
+    async def update_workspace(self, db: AsyncSession, workspace: Workspace, workspace_in: WorkspaceUpdate) -> Workspace:
+        if workspace_in.slack_webhook_url is not None:
+            workspace.slack_webhook_url = workspace_in.slack_webhook_url or None
+        await db.commit()
+        await db.refresh(workspace)
+        return workspace
+
+    async def deactivate_user(self, db: AsyncSession, user: AppUser) -> AppUser:
+        user.is_active = False
+        await db.commit()
+        await db.refresh(user)
+        await user_cache.invalidate(user.email)
+        return user
+
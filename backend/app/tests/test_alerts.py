@@ -0,0 +1,150 @@
+"""
+Risk alert lifecycle against Postgres (alerts are partitioned): set
+TEST_DATABASE_URL to run.
+"""
+import asyncio
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytestmark = pytest.mark.skipif(not os.getenv("TEST_DATABASE_URL"), reason="TEST_DATABASE_URL not set")
+
+
+def _risk(score=0.8):
+    return {"type": "DELAY", "score": score, "severity": "HIGH", "explanation": f"score {score}"}
+
+
+def _with_workspace(scenario):
+    """Run `scenario(engine, workspace_id)` with a throwaway workspace, then clean up."""
+    from sqlalchemy import delete
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from app.modules.alerts.models import Alert
+    from app.modules.integrations.models import Integration  # noqa: F401 (Workspace relationship)
+    from app.modules.users.models import Workspace
+
+    async def run():
+        engine = create_async_engine(os.environ["TEST_DATABASE_URL"])
+        workspace_id = uuid.uuid4()
+        try:
+            async with AsyncSession(engine) as session:
+                session.add(Workspace(id=workspace_id, name="alerts", slug=f"alerts-{workspace_id.hex[:8]}"))
+                await session.commit()
+            return await scenario(engine, str(workspace_id))
+        finally:
+            async with AsyncSession(engine) as session:
+                await session.execute(delete(Alert).where(Alert.workspace_id == workspace_id))
+                await session.execute(delete(Workspace).where(Workspace.id == workspace_id))
+                await session.commit()
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+def test_alert_is_created_updated_reopened_carried_over_and_resolved():
+    from sqlalchemy import select
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from app.modules.alerts.models import Alert
+    from app.modules.alerts.service import AlertService, bucket_bounds
+
+    service = AlertService()
+    # An hour into the current bucket; the next bucket starts a week later
+    t0 = bucket_bounds(datetime.now(timezone.utc))[0] + timedelta(hours=1)
+
+    async def scenario(engine, ws):
+        steps = []
+
+        async def sync(at, fired):
+            async with AsyncSession(engine) as session:
+                counts = await service.sync_risk_alerts(session, {ws: [_risk()]} if fired else {}, [ws], at)
+                await session.commit()
+                alerts = (await session.execute(select(Alert).where(Alert.workspace_id == ws))).scalars().all()
+                steps.append((counts, sorted((a.status, a.occurrences, str(a.id)) for a in alerts)))
+
+        await sync(t0, fired=True)                        # created
+        await sync(t0 + timedelta(minutes=30), fired=True)  # updated
+        await sync(t0 + timedelta(hours=1), fired=False)  # resolved
+        await sync(t0 + timedelta(hours=2), fired=True)   # reopened within its bucket
+        async with AsyncSession(engine) as session:
+            await service.acknowledge_alert(session, steps[-1][1][0][2], ws)
+        await sync(t0 + timedelta(days=7), fired=True)    # next bucket: same alert, still ACK
+        await sync(t0 + timedelta(days=7, hours=1), fired=False)
+        await sync(t0 + timedelta(days=7, hours=2), fired=True)  # later episode: new alert
+        return steps
+
+    steps = _with_workspace(scenario)
+    counts = [c for c, _ in steps]
+    assert counts == [
+        {"created": 1, "updated": 0, "resolved": 0},
+        {"created": 0, "updated": 1, "resolved": 0},
+        {"created": 0, "updated": 0, "resolved": 1},
+        {"created": 0, "updated": 1, "resolved": 0},
+        {"created": 0, "updated": 1, "resolved": 0},
+        {"created": 0, "updated": 0, "resolved": 1},
+        {"created": 1, "updated": 0, "resolved": 0},
+    ]
+    alert_id = steps[0][1][0][2]
+    assert steps[3][1] == [("NEW", 3, alert_id)]
+    # The acknowledgement survives the bucket rollover
+    assert steps[4][1] == [("ACK", 4, alert_id)]
+    assert [(status, n) for status, n, _ in steps[6][1]] == [("NEW", 1), ("RESOLVED", 4)]
+
+
+def test_concurrent_evaluations_create_a_single_alert():
+    from sqlalchemy import func, select
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from app.modules.alerts.models import Alert
+    from app.modules.alerts.service import AlertService
+
+    service = AlertService()
+    now = datetime.now(timezone.utc)
+
+    async def scenario(engine, ws):
+        async def evaluate():
+            async with AsyncSession(engine) as session:
+                counts = await service.sync_risk_alerts(session, {ws: [_risk()]}, [ws], now)
+                await asyncio.sleep(0.05)  # both runs overlap unless serialized
+                await session.commit()
+                return counts
+
+        counts = await asyncio.gather(evaluate(), evaluate())
+        async with AsyncSession(engine) as session:
+            total = (await session.execute(select(func.count()).select_from(Alert).where(Alert.workspace_id == ws))).scalar()
+        return counts, total
+
+    counts, total = _with_workspace(scenario)
+    assert total == 1
+    assert sorted(c["created"] for c in counts) == [0, 1]
+
+
+def test_alert_pages_stay_exact_while_alerts_are_seen_again():
+    from sqlalchemy import update
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from app.modules.alerts.models import Alert
+    from app.modules.alerts.service import AlertService
+
+    service = AlertService()
+    now = datetime.now(timezone.utc)
+
+    async def scenario(engine, ws):
+        async with AsyncSession(engine) as session:
+            for i in range(7):
+                session.add(Alert(
+                    workspace_id=uuid.UUID(ws), status=("NEW", "ACK", "RESOLVED")[i % 3], severity="HIGH",
+                    title=f"alert {i}", created_at=now - timedelta(hours=i), last_seen_at=now - timedelta(hours=i),
+                ))
+            await session.commit()
+
+        seen, cursor = [], None
+        while True:
+            async with AsyncSession(engine) as session:
+                page, cursor = await service.get_alerts(session, ws, statuses=["NEW", "ACK"], limit=2, cursor=cursor)
+                seen.extend(alert.title for alert in page)
+                # A sync sees every alert again between two pages
+                await session.execute(update(Alert).where(Alert.workspace_id == ws).values(last_seen_at=datetime.now(timezone.utc)))
+                await session.commit()
+            if cursor is None:
+                return seen
+
+    assert _with_workspace(scenario) == ["alert 0", "alert 1", "alert 3", "alert 4", "alert 6"]
@@ -0,0 +1,151 @@
+import asyncio
+import os
+import time
+import uuid
+
+import pytest
+
+from app.modules.users.cache import UserCache
+from app.modules.users.schemas import User
+
+
+def _user(email="dev@x.io", role="READER", active=True):
+    return User(id=uuid.uuid4(), email=email, role=role, is_active=active, workspace_id=uuid.uuid4())
+
+
+def test_user_cache_ttl_lru_and_invalidation(monkeypatch):
+    from app.modules.users import cache as cache_module
+
+    clock = [100.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: clock[0])
+    cache = UserCache(ttl_seconds=60, max_entries=2)
+
+    async def run():
+        a, b, c = _user("a@x.io"), _user("b@x.io"), _user("c@x.io")
+        for user in (a, b):
+            await cache.put(user)
+        assert await cache.get("a@x.io") == a  # "b" is now the least recently used
+        await cache.put(c)
+        assert await cache.get("b@x.io") is None and len(cache) == 2
+
+        issued_at = time.time() - 1
+        await cache.invalidate("a@x.io")
+        assert await cache.get("a@x.io") is None
+        assert cache.issued_before_invalidation("a@x.io", issued_at)
+        assert not cache.issued_before_invalidation("c@x.io", issued_at)
+
+        clock[0] += 61
+        assert await cache.get("c@x.io") is None
+
+    asyncio.run(run())
+
+
+def test_token_claims_describe_the_user():
+    from jose import jwt
+    from app.core.config import settings
+    from app.core.security import create_access_token
+    from app.modules.users.routes import _user_from_claims
+
+    user = _user(role="ADMIN")
+    token = create_access_token(
+        user.email, claims={"uid": str(user.id), "ws": str(user.workspace_id), "role": user.role}
+    )
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+
+    assert _user_from_claims(payload) == user
+    assert _user_from_claims({"sub": user.email, "iat": payload["iat"]}) is None
+
+
+@pytest.mark.skipif(not os.getenv("TEST_DATABASE_URL"), reason="TEST_DATABASE_URL not set")
+def test_current_user_is_cached_until_deactivated():
+    from fastapi import HTTPException
+    from sqlalchemy import delete, event
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from app.core.security import create_access_token
+    from app.modules.integrations.models import Integration  # noqa: F401 (Workspace relationship)
+    from app.modules.users.cache import user_cache
+    from app.modules.users.models import AppUser
+    from app.modules.users.routes import get_current_active_user, get_current_user, user_service
+
+    email = f"auth-{uuid.uuid4().hex[:8]}@x.io"
+
+    async def current(session):
+        return await get_current_active_user(await get_current_user(create_access_token(email), session))
+
+    async def run():
+        engine = create_async_engine(os.environ["TEST_DATABASE_URL"])
+        queries = []
+        event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: queries.append(args[2]))
+        try:
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                session.add(AppUser(email=email, hashed_password="x", role="READER"))
+                await session.commit()
+
+                queries.clear()
+                first = await current(session)
+                lookups = len(queries)
+                for _ in range(5):
+                    assert await current(session) == first
+
+                user = await user_service.get_user(session, first.id)
+                await user_service.deactivate_user(session, user)
+                with pytest.raises(HTTPException) as exc:
+                    await current(session)
+                return lookups, len(queries), exc.value.status_code
+        finally:
+            async with AsyncSession(engine) as session:
+                await session.execute(delete(AppUser).where(AppUser.email == email))
+                await session.commit()
+            await user_cache.invalidate(email)
+            await engine.dispose()
+
+    lookups, total, status_code = asyncio.run(run())
+    assert lookups == 1
+    # Deactivation: get_user, UPDATE, refresh; then one fresh lookup
+    assert total == lookups + 3 + 1
+    assert status_code == 400
+
+
+def test_password_hashing_runs_off_the_event_loop_and_migrates_cost():
+    from app.core.security import get_password_hash, password_executor, pwd_context, verify_and_update_password
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        probe = asyncio.create_task(ticker())
+        hashed = await get_password_hash("secret")
+        probe.cancel()
+
+        outdated = pwd_context.hash("secret", rounds=4)
+        return ticks, hashed, await verify_and_update_password("secret", outdated), await verify_and_update_password("wrong", outdated)
+
+    ticks, hashed, (valid, new_hash), (invalid, no_hash) = asyncio.run(run())
+    password_executor.shutdown()
+
+    # The loop kept running while bcrypt worked in the pool
+    assert ticks > 0
+    assert pwd_context.verify("secret", hashed) and not pwd_context.needs_update(hashed)
+    assert valid and new_hash and pwd_context.verify("secret", new_hash) and not pwd_context.needs_update(new_hash)
+    assert not invalid and no_hash is None
+
+
+def test_malformed_user_id_is_rejected_before_any_query():
+    import uuid
+    from types import SimpleNamespace
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.modules.users.routes import get_current_admin_user
+
+    app.dependency_overrides[get_current_admin_user] = lambda: SimpleNamespace(workspace_id=uuid.uuid4(), role="ADMIN")
+    try:
+        with TestClient(app) as client:
+            assert client.patch("/api/v1/users/nope", json={"full_name": "x"}).status_code == 422
+            assert client.post("/api/v1/users/nope/deactivate").status_code == 422
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,135 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from app.core.cache import ResponseCache, normalize_params
+
+
+class _MemoryRedis:
+    """Just enough of the redis.asyncio API for the cache."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return False
+        self.data[key] = value if isinstance(value, bytes) else str(value).encode()
+        return True
+
+    async def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1).encode()
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+
+class _Sessions:
+    """Session factory handing out placeholder sessions, recording which are still open."""
+
+    def __init__(self):
+        self.open = set()
+
+    @asynccontextmanager
+    async def __call__(self):
+        session = object()
+        self.open.add(session)
+        try:
+            yield session
+        finally:
+            self.open.discard(session)
+
+
+def _cache(sessions=None) -> ResponseCache:
+    cache = ResponseCache("redis://unused", ttl_seconds=60, lock_seconds=1, session_factory=sessions or _Sessions())
+    cache._client = _MemoryRedis()
+    cache._loop = asyncio.get_running_loop()
+    return cache
+
+
+def test_normalize_params_is_order_and_none_insensitive():
+    assert normalize_params({"b": 1, "a": None, "c": "x"}) == normalize_params({"c": "x", "b": 1})
+
+
+def test_concurrent_misses_compute_once_and_bump_invalidates():
+    calls = []
+
+    async def compute(session):
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"value": len(calls)}
+
+    async def run():
+        cache = _cache()
+        first = await asyncio.gather(*[cache.get_or_compute("ws", "ep", {"x": 1}, compute) for _ in range(10)])
+        cached = await cache.get_or_compute("ws", "ep", {"x": 1}, compute)
+        await cache.bump("ws")
+        fresh = await cache.get_or_compute("ws", "ep", {"x": 1}, compute)
+        return first, cached, fresh
+
+    first, cached, fresh = asyncio.run(run())
+
+    assert first == [{"value": 1}] * 10
+    assert cached == {"value": 1}
+    assert fresh == {"value": 2}
+    assert len(calls) == 2
+
+
+def test_shared_load_uses_its_own_session_and_survives_the_originator():
+    sessions = _Sessions()
+    seen = []
+
+    async def compute(session):
+        await asyncio.sleep(0.02)
+        # Still open although the request that started the load is gone
+        seen.append(session in sessions.open)
+        return {"value": 1}
+
+    async def run():
+        cache = _cache(sessions)
+        originator = asyncio.create_task(cache.get_or_compute("ws", "ep", {}, compute))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get_or_compute("ws", "ep", {}, compute))
+        await asyncio.sleep(0.005)
+        originator.cancel()  # e.g. the client disconnected
+        return await waiter
+
+    assert asyncio.run(run()) == {"value": 1}
+    assert seen == [True]
+    assert not sessions.open
+
+
+def test_date_dependent_responses_are_cached_per_day(monkeypatch):
+    import uuid
+    from datetime import date, timedelta
+    from types import SimpleNamespace
+    from fastapi.testclient import TestClient
+    from app.core.cache import response_cache
+    from app.main import app
+    from app.modules.users.routes import get_current_active_user
+
+    keys = {}
+
+    async def get_or_compute(workspace_id, namespace, params, compute):
+        keys[namespace] = params
+        return {
+            "alerts.page": {"items": [], "next_cursor": None},
+            "forecast.grid": {"backlog_sizes": [], "target_dates": [], "probabilities": [], "simulations": 0, "engine": "exact"},
+        }.get(namespace, {})
+
+    monkeypatch.setattr(response_cache, "get_or_compute", get_or_compute)
+    app.dependency_overrides[get_current_active_user] = lambda: SimpleNamespace(workspace_id=uuid.uuid4())
+    target = (date.today() + timedelta(days=30)).isoformat()
+    try:
+        with TestClient(app) as client:
+            client.get("/api/v1/forecast/", params={"target_date": target, "backlog_size": 10})
+            client.get("/api/v1/forecast/completion", params={"backlog_size": 10})
+            client.post("/api/v1/forecast/grid", json={"backlog_sizes": [10], "target_dates": [target]})
+            client.get("/api/v1/alerts/")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert set(keys) == {"forecast", "forecast.completion", "forecast.grid", "alerts.page"}
+    assert all(params["today"] == date.today().isoformat() for params in keys.values())
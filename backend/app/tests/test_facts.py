@@ -0,0 +1,168 @@
+import asyncio
+import statistics
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+
+from app.modules.analytics.facts import REFRESH_OVERLAP, FactCache, WorkspaceFacts, _Table
+from app.modules.analytics.metrics import daily_metric_values
+from app.modules.users.models import Workspace  # noqa: F401 (mapper of the integration models)
+
+
+class _Result:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+    def scalar_one(self):
+        return self.rows
+
+
+class _FactSession:
+    """Just enough of AsyncSession for WorkspaceFacts.refresh: serves the rows of `prs` / `cards`."""
+
+    def __init__(self, prs=(), cards=()):
+        self.prs, self.cards = list(prs), list(cards)
+        self.since = []
+
+    async def execute(self, statement):
+        table = statement.get_final_froms()[0].name
+        rows = self.prs if table == "pull_requests" else self.cards
+        if "count(" in str(statement):
+            return _Result(len(rows))
+        since = [v for k, v in statement.compile().params.items() if k.startswith("synced_at")]
+        self.since.append(since[0] if since else None)
+        return _Result([row for row in rows if not since or row[1] > since[0]])
+
+
+def _pr(ext_id, synced_at, created, merged=None, closed=None, size=10, user="alice"):
+    return (ext_id, synced_at, created, merged, closed or merged, size, 0, user)
+
+
+def test_table_upsert_updates_existing_rows_in_place():
+    table = _Table({"value": np.float64})
+    table.upsert([{"external_id": "a", "value": 1.0}, {"external_id": "b", "value": 2.0}])
+    table.upsert([{"external_id": "b", "value": 5.0}, {"external_id": "c", "value": 3.0}])
+
+    assert len(table) == 3
+    assert table.columns["value"].tolist() == [1.0, 5.0, 3.0]
+    assert table.index == {"a": 0, "b": 1, "c": 2}
+
+
+def test_refresh_is_incremental_from_the_watermark_and_reloads_after_deletions():
+    synced = datetime(2026, 10, 1, 12, tzinfo=timezone.utc)
+    session = _FactSession(prs=[
+        _pr("1", synced, "2026-09-30T10:00:00+00:00"),
+        _pr("2", synced - timedelta(hours=1), "2026-09-30T11:00:00+00:00"),
+    ])
+    facts = WorkspaceFacts("ws")
+
+    async def run():
+        assert await facts.refresh(session) == 2
+        assert facts.watermark == synced
+
+        # A PR merged since: only rows synced after watermark - overlap are read
+        session.prs[0] = _pr("1", synced + timedelta(hours=1), "2026-09-30T10:00:00+00:00", "2026-10-01T13:00:00+00:00")
+        assert await facts.refresh(session) == 1
+        assert session.since[-2:] == [synced - REFRESH_OVERLAP] * 2
+        assert len(facts.prs) == 2 and np.isnan(facts.pr_merged).tolist() == [False, True]
+
+        # A deleted row does not match the watermark: the row counts reveal it
+        del session.prs[1]
+        await facts.refresh(session)
+        assert session.since[-2:] == [None, None]
+        assert list(facts.prs.index) == ["1"]
+
+    asyncio.run(run())
+
+
+def test_fact_cache_evicts_least_recently_used_beyond_max_bytes():
+    synced = datetime(2026, 10, 1, tzinfo=timezone.utc)
+    session = _FactSession(prs=[_pr(str(i), synced, "2026-09-30T10:00:00+00:00") for i in range(50)])
+
+    async def run():
+        probe = WorkspaceFacts("probe")
+        await probe.refresh(session)
+        cache = FactCache(max_bytes=2 * probe.nbytes, refresh_seconds=3600)
+
+        await cache.get(session, "a")
+        await cache.get(session, "b")
+        await cache.get(session, "a")  # "b" becomes the least recently used
+        await cache.get(session, "c")
+
+        assert len(cache) == 2 and set(cache._entries) == {"a", "c"}
+        assert cache.resident_bytes <= cache.max_bytes
+        # The evicted workspace keeps its lock: coroutines may still be waiting on it
+        assert "b" in cache._locks
+
+    asyncio.run(run())
+
+
+def _reference_metrics(prs, cards, today):
+    """The original compute_daily_metrics, over raw_data dicts."""
+    window_start = today - timedelta(days=7)
+    lead_times, pr_sizes = [], []
+    for raw in prs:
+        if not raw.get("merged_at"):
+            continue
+        merged_at = datetime.fromisoformat(raw["merged_at"])
+        if merged_at.date() < window_start:
+            continue
+        created_at = datetime.fromisoformat(raw["created_at"])
+        lead_times.append((merged_at - created_at).total_seconds() / 3600)
+        pr_sizes.append(raw.get("additions", 0) + raw.get("deletions", 0))
+    lead_time_p50 = statistics.median(lead_times) if lead_times else 0
+
+    bugs = total_resolved = 0
+    for raw, list_name in cards:
+        if raw.get("status", list_name or "").lower() in ["done", "resolved", "closed", "complete"]:
+            if raw.get("resolutiondate") and datetime.fromisoformat(raw["resolutiondate"]).date() >= window_start:
+                total_resolved += 1
+                bugs += raw.get("cardtype", "").lower() == "bug"
+
+    return {
+        "lead_time_p50": lead_time_p50,
+        "lead_time_p85": statistics.quantiles(lead_times, n=100)[84] if len(lead_times) >= 100 else (max(lead_times) if lead_times else 0),
+        "wip": sum(1 for raw in prs if not raw.get("closed_at")),
+        "throughput": len(lead_times) / 7,
+        "review_time_p50": lead_time_p50 * 0.6,
+        "bug_ratio": bugs / total_resolved if total_resolved else 0,
+        "pr_size_p50": statistics.median(pr_sizes) if pr_sizes else 0,
+    }
+
+
+def test_daily_metrics_match_the_original_implementation():
+    today = date(2026, 10, 19)
+    now = datetime.combine(today, datetime.min.time(), tzinfo=timezone.utc)
+    rng = np.random.default_rng(3)
+
+    for n_prs in (40, 400):
+        prs, cards = [], []
+        for i in range(n_prs):
+            created = now - timedelta(hours=float(rng.uniform(1, 20 * 24)))
+            raw = {"created_at": created.isoformat(), "additions": int(rng.integers(0, 500)), "deletions": int(rng.integers(0, 100))}
+            if rng.random() < 0.7:
+                merged = min(created + timedelta(hours=float(rng.exponential(30))), now)
+                raw["merged_at"] = raw["closed_at"] = merged.isoformat()
+            prs.append(raw)
+        for i in range(n_prs // 2):
+            resolved = now - timedelta(hours=float(rng.uniform(0, 14 * 24)))
+            status = str(rng.choice(["Done", "In Progress", "closed"]))
+            cards.append(({"created": (resolved - timedelta(days=2)).isoformat(), "resolutiondate": resolved.isoformat(),
+                           "status": status, "cardtype": str(rng.choice(["Bug", "Story"]))}, "Board"))
+
+        facts = WorkspaceFacts("ws")
+        facts.load_rows(
+            [(str(i), now, raw["created_at"], raw.get("merged_at"), raw.get("closed_at"), raw["additions"], raw["deletions"], "u")
+             for i, raw in enumerate(prs)],
+            [(str(i), now, list_name, raw["created"], raw["resolutiondate"], raw["status"], raw["cardtype"])
+             for i, (raw, list_name) in enumerate(cards)],
+        )
+
+        expected = _reference_metrics(prs, cards, today)
+        actual = daily_metric_values(facts, today)
+        assert actual.keys() == expected.keys()
+        for name, value in expected.items():
+            assert np.isclose(actual[name], value), name
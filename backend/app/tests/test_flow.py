@@ -0,0 +1,27 @@
+from datetime import date, datetime, timezone
+
+from app.modules.analytics.flow import ListIntervalIndex, compute_flow
+
+
+def _ts(day: int, hour: int = 12) -> float:
+    return datetime(2026, 3, day, hour, tzinfo=timezone.utc).timestamp()
+
+
+def test_daily_wip_cumulative_flow_and_cycle_time():
+    index = ListIntervalIndex([
+        ("c1", None, "To Do", _ts(1)),
+        ("c1", "To Do", "In Progress", _ts(2)),
+        ("c1", "In Progress", "Done", _ts(4)),
+        ("c2", None, "To Do", _ts(2)),
+        ("c2", "To Do", "In Progress", _ts(3)),
+    ])
+
+    flow = compute_flow(index, date(2026, 3, 1), date(2026, 3, 4))
+
+    assert flow["wip"]["To Do"] == [1, 1, 0, 0]
+    assert flow["wip"]["In Progress"] == [0, 1, 2, 1]
+    assert flow["wip"]["Done"] == [0, 0, 0, 1]
+    assert flow["cumulative_flow"]["In Progress"] == [0, 1, 2, 2]
+    assert flow["cycle_time_hours"]["In Progress"]["count"] == 1
+    assert flow["cycle_time_hours"]["In Progress"]["p50"] == 48
+    assert flow["cycle_time_hours"]["To Do"]["count"] == 2
@@ -0,0 +1,240 @@
+from datetime import date, timedelta
+
+import pytest
+
+from app.modules.forecast.model import simulate_delivery, wilson_interval
+
+TODAY = date(2026, 10, 19)
+HISTORY = [0, 1, 2, 3, 5, 8, 2, 1, 0, 4]
+
+
+def test_seeded_simulation_is_reproducible():
+    a = simulate_delivery(HISTORY, 60, TODAY + timedelta(days=30), simulations=20_000, seed=42, today=TODAY)
+    b = simulate_delivery(HISTORY, 60, TODAY + timedelta(days=30), simulations=20_000, seed=42, today=TODAY)
+    assert a == b
+    assert a.ci_low <= a.probability <= a.ci_high
+
+
+def test_probability_matches_expected_throughput():
+    # Mean 2.6 items/day over 30 days: 78 items on average
+    easy = simulate_delivery(HISTORY, 40, TODAY + timedelta(days=30), seed=1, today=TODAY)
+    hard = simulate_delivery(HISTORY, 120, TODAY + timedelta(days=30), seed=1, today=TODAY)
+    median = simulate_delivery(HISTORY, 78, TODAY + timedelta(days=30), seed=1, today=TODAY)
+    assert easy.probability > 0.99
+    assert hard.probability < 0.01
+    assert 0.4 < median.probability < 0.6
+
+
+def test_constant_throughput_and_past_target():
+    assert simulate_delivery([2], 20, TODAY + timedelta(days=10), today=TODAY).probability == 1.0
+    assert simulate_delivery([2], 21, TODAY + timedelta(days=10), today=TODAY).probability == 0.0
+    assert simulate_delivery(HISTORY, 1, TODAY, today=TODAY).probability == 0.0
+    with pytest.raises(ValueError):
+        simulate_delivery(HISTORY, 1, TODAY + timedelta(days=1), simulations=0, today=TODAY)
+
+
+def test_target_date_beyond_horizon_is_rejected():
+    from app.modules.forecast.model import MAX_HORIZON_DAYS, simulate_delivery_grid
+    from app.modules.forecast.scope import simulate_scope_growth
+
+    last = TODAY + timedelta(days=MAX_HORIZON_DAYS)
+    assert simulate_delivery([2], 10, last, simulations=100, today=TODAY).days == MAX_HORIZON_DAYS
+    beyond = last + timedelta(days=1)
+    for engine in ("monte_carlo", "exact"):
+        with pytest.raises(ValueError, match="target_date"):
+            simulate_delivery(HISTORY, 10, beyond, simulations=1_000_000, today=TODAY, engine=engine)
+        with pytest.raises(ValueError, match="target_date"):
+            simulate_delivery_grid(HISTORY, [10], [TODAY, beyond], today=TODAY, engine=engine)
+    with pytest.raises(ValueError, match="target_date"):
+        simulate_scope_growth(HISTORY, HISTORY, 10, beyond, today=TODAY)
+
+
+def test_wilson_interval():
+    low, high = wilson_interval(0, 10_000)
+    assert low == 0.0 and 0 < high < 0.001
+    low, high = wilson_interval(5_000, 10_000)
+    assert low == pytest.approx(0.4902, abs=1e-3) and high == pytest.approx(0.5098, abs=1e-3)
+
+
+def test_completion_dates_match_delivery_probabilities():
+    from app.modules.forecast.simulator import simulate_completion
+
+    completion = simulate_completion(HISTORY, 78, horizon_days=365, seed=3, today=TODAY)
+    p85 = completion.percentiles[85]
+    assert completion.percentiles[50] <= completion.percentiles[70] <= p85 <= completion.percentiles[95]
+    assert completion.probability_within_horizon == 1.0
+    # The p85 date is the first date with at least an 85% chance of being done
+    assert simulate_delivery(HISTORY, 78, p85, seed=3, today=TODAY).probability >= 0.84
+    assert simulate_delivery(HISTORY, 78, p85 - timedelta(days=1), seed=3, today=TODAY).probability < 0.86
+    assert sum(b["probability"] for b in completion.histogram) == pytest.approx(1.0)
+    assert completion.histogram[-1]["cumulative"] == pytest.approx(1.0)
+
+
+def test_completion_beyond_horizon():
+    from app.modules.forecast.simulator import simulate_completion
+
+    constant = simulate_completion([2], 20, horizon_days=30, simulations=100, today=TODAY)
+    assert all(d == TODAY + timedelta(days=10) for d in constant.percentiles.values())
+    never = simulate_completion([0], 5, horizon_days=30, simulations=100, today=TODAY)
+    assert never.percentiles == {50: None, 70: None, 85: None, 95: None}
+    assert never.probability_within_horizon == 0.0
+
+
+def test_completion_simulation_over_a_year_is_vectorized(monkeypatch):
+    import time
+    from app.modules.forecast import simulator
+
+    chunks = []
+
+    def sample_throughput(*args):
+        for draws in simulator_sample(*args):
+            chunks.append(draws.shape)
+            yield draws
+
+    simulator_sample = simulator.sample_throughput
+    monkeypatch.setattr(simulator, "sample_throughput", sample_throughput)
+    start = time.perf_counter()
+    forecast = simulator.simulate_completion(HISTORY, 500, horizon_days=365, simulations=10_000, today=TODAY)
+    # Wall-clock is only a loose guard (~20 ms typically): the runs are drawn as whole arrays
+    assert time.perf_counter() - start < 1.0
+    assert chunks == [(10_000, 365)]
+    assert sum(b["probability"] for b in forecast.histogram) == pytest.approx(forecast.probability_within_horizon)
+
+
+def test_exact_engine_matches_monte_carlo():
+    target = TODAY + timedelta(days=30)
+    for backlog in (40, 78, 90):
+        exact = simulate_delivery(HISTORY, backlog, target, today=TODAY, engine="exact")
+        sampled = simulate_delivery(HISTORY, backlog, target, simulations=200_000, seed=5, today=TODAY)
+        assert exact.probability == exact.ci_low == exact.ci_high
+        assert exact.probability == pytest.approx(sampled.probability, abs=0.005)
+
+
+def test_exact_probability_on_fractional_lattice():
+    import numpy as np
+    from app.modules.forecast.convolution import delivery_probability, lattice_step
+
+    # Daily throughputs are weekly counts / 7
+    history = [3 / 7, 5 / 7, 1.0, 0.0]
+    assert lattice_step(np.array(history)) == pytest.approx(1 / 7)
+    # Two days, in sevenths: every ordered pair of draws is equally likely
+    pairs = [a + b for a in (3, 5, 7, 0) for b in (3, 5, 7, 0)]
+    assert delivery_probability(history, 10 / 7, 2) == pytest.approx(sum(p >= 10 for p in pairs) / 16)
+    assert delivery_probability([0.0], 1, 365) == 0.0
+    assert delivery_probability([2.0], 730, 365) == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize("engine", ["monte_carlo", "exact"])
+def test_grid_matches_single_forecasts(engine):
+    from app.modules.forecast.model import simulate_delivery_grid
+
+    backlogs = [20, 60, 78, 120]
+    dates = [TODAY + timedelta(days=d) for d in (45, 10, 30, 0)]
+    grid = simulate_delivery_grid(HISTORY, backlogs, dates, simulations=100_000, seed=9, today=TODAY, engine=engine)
+
+    for i, backlog in enumerate(backlogs):
+        for j, target in enumerate(dates):
+            single = simulate_delivery(HISTORY, backlog, target, simulations=100_000, seed=9, today=TODAY, engine=engine)
+            assert grid[i][j] == pytest.approx(single.probability, abs=0.01)
+    # Shared runs: more items never more likely, later dates never less likely
+    assert all(grid[i][j] >= grid[i + 1][j] for i in range(3) for j in range(4))
+    assert all(grid[i][1] <= grid[i][2] <= grid[i][0] for i in range(4))
+    assert [row[3] for row in grid] == [0.0] * 4
+
+
+def test_grid_request_bounds_both_axes():
+    from pydantic import ValidationError
+    from app.modules.forecast.model import MAX_HORIZON_DAYS
+    from app.modules.forecast.schemas import MAX_GRID_AXIS, ForecastGridRequest
+
+    last = date.today() + timedelta(days=MAX_HORIZON_DAYS)
+    assert ForecastGridRequest(backlog_sizes=[10], target_dates=[date.today(), last]).target_dates[-1] == last
+    with pytest.raises(ValidationError, match="target dates"):
+        ForecastGridRequest(backlog_sizes=[10], target_dates=[last + timedelta(days=1)])
+    with pytest.raises(ValidationError):
+        ForecastGridRequest(backlog_sizes=[10], target_dates=[last - timedelta(days=d) for d in range(MAX_GRID_AXIS + 1)])
+    with pytest.raises(ValidationError):
+        ForecastGridRequest(backlog_sizes=list(range(MAX_GRID_AXIS + 1)), target_dates=[last])
+
+
+def test_scope_growth_forecast():
+    from app.modules.forecast.scope import simulate_scope_growth
+
+    target = TODAY + timedelta(days=30)
+    completions = [3, 2, 4, 3, 1, 5, 3, 2, 4, 3]
+    no_arrivals = simulate_scope_growth(completions, [0] * 10, 90, target, seed=4, today=TODAY)
+    fixed = simulate_delivery(completions, 90, target, seed=4, today=TODAY)
+    assert no_arrivals.probability == pytest.approx(fixed.probability, abs=0.02)
+    assert no_arrivals.expected_scope == 90
+
+    arrivals = [1, 0, 2, 1, 0, 3, 1, 0, 2, 1]
+    growing = simulate_scope_growth(completions, arrivals, 90, target, seed=4, today=TODAY)
+    assert growing.probability < no_arrivals.probability
+    assert growing.expected_scope == pytest.approx(90 + 30 * 1.1, rel=0.02)
+    assert growing.scope_p85 >= growing.expected_scope
+    # Fully correlated days: one arrival per completion means no progress at all
+    assert simulate_scope_growth([2, 3], [2, 3], 1, target, today=TODAY).probability == 0.0
+
+
+def test_daily_counts_from_fact_timestamps():
+    import numpy as np
+    from datetime import datetime, timezone
+    from app.modules.forecast.scope import daily_counts
+
+    def ts(day, hour=12):
+        return datetime(day.year, day.month, day.day, hour, tzinfo=timezone.utc).timestamp()
+
+    timestamps = np.array([ts(TODAY), ts(TODAY, 0), ts(TODAY - timedelta(days=1)), ts(TODAY - timedelta(days=30)), np.nan])
+    counts = daily_counts(timestamps, TODAY, days=30)
+    assert counts.tolist()[-2:] == [1, 2] and counts.sum() == 3
+
+
+def test_memo_key_covers_every_input():
+    from app.modules.forecast.memo import memo_key
+
+    params = {"backlog_size": 60, "target_date": TODAY, "engine": "exact", "seed": None}
+    key = memo_key("ws", "delivery", [HISTORY], params)
+    assert key == memo_key("ws", "delivery", [[float(v) for v in HISTORY]], dict(params))
+    assert key != memo_key("other", "delivery", [HISTORY], params)
+    assert key != memo_key("ws", "delivery", [HISTORY + [1]], params)
+    assert key != memo_key("ws", "delivery", [HISTORY], {**params, "backlog_size": 61})
+    assert key != memo_key("ws", "delivery", [HISTORY], {**params, "target_date": TODAY + timedelta(days=1)})
+    assert key != memo_key("ws", "delivery", [HISTORY], {**params, "seed": 0})
+
+
+def test_memo_lru_and_ttl_eviction(monkeypatch):
+    from app.modules.forecast import memo
+
+    clock = [1000.0]
+    monkeypatch.setattr(memo.time, "monotonic", lambda: clock[0])
+    cache = memo.ForecastMemo(max_entries=2, ttl_seconds=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+    cache.put("c", 3)
+    assert cache.get("b") is None and len(cache) == 2
+    clock[0] += 61
+    assert cache.get("a") is None and cache.get("c") is None
+
+
+def test_memoized_forecast_runs_once():
+    import asyncio
+
+    from app.modules.forecast.memo import forecast_memo
+    from app.modules.forecast.service import run_forecast
+
+    calls = []
+
+    def forecast(history, backlog_size):
+        calls.append(backlog_size)
+        return sum(history) >= backlog_size
+
+    async def run():
+        forecast_memo.clear()
+        first = await run_forecast("ws", "test", forecast, [HISTORY], offload=False, backlog_size=20)
+        second = await run_forecast("ws", "test", forecast, [HISTORY], offload=False, backlog_size=20)
+        third = await run_forecast("ws", "test", forecast, [HISTORY], offload=False, backlog_size=30)
+        return first, second, third
+
+    assert asyncio.run(run()) == (True, True, False)
+    assert calls == [20, 30]
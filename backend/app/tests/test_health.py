@@ -7,3 +7,89 @@ def test_health_check():
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
+
+
+def _p99(latencies):
+    return sorted(latencies)[int(len(latencies) * 0.99) - 1]
+
+
+async def _probe_health(http, n=200, interval=0.005):
+    """/health at a fixed rate; latency counts from the scheduled time, so a blocked loop shows up."""
+    import asyncio
+    import time
+
+    latencies = []
+
+    async def one(scheduled):
+        assert (await http.get("/health")).status_code == 200
+        latencies.append(time.perf_counter() - scheduled)
+
+    start = time.perf_counter()
+    requests = []
+    for i in range(n):
+        scheduled = start + i * interval
+        await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+        requests.append(asyncio.ensure_future(one(scheduled)))
+    await asyncio.gather(*requests)
+    return latencies
+
+
+def test_health_latency_stays_flat_under_forecast_load():
+    import asyncio
+    import datetime
+
+    import httpx
+    from app.core.executor import ComputeExecutor
+    from app.modules.forecast.model import simulate_delivery
+
+    history = [0, 1, 2, 3, 5, 8, 2, 1, 0, 4]
+    target = datetime.date.today() + datetime.timedelta(days=365)
+    executor = ComputeExecutor("process", max_workers=2, max_pending=16, timeout_seconds=60)
+
+    async def forecast():
+        return await executor.run(simulate_delivery, history, 900, target, simulations=50_000)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+            await forecast()  # start the workers
+            idle = await _probe_health(http)
+            load = asyncio.gather(*(forecast() for _ in range(6)))
+            busy = await _probe_health(http)
+            results = await load
+        return idle, busy, results
+
+    try:
+        idle, busy, results = asyncio.run(run())
+    finally:
+        executor.shutdown()
+
+    assert len(results) == 6
+    # Run on the event loop instead, the forecasts (~0.3 s each) push p99 past a second
+    assert _p99(busy) < max(5 * _p99(idle), 0.1)
+
+
+def test_executor_backpressure_and_timeout():
+    import asyncio
+    import time
+
+    import pytest
+    from app.core.errors import ServiceUnavailable
+    from app.core.executor import ComputeExecutor
+
+    executor = ComputeExecutor("thread", max_workers=1, max_pending=1, timeout_seconds=5)
+
+    async def run():
+        first = asyncio.ensure_future(executor.run(time.sleep, 0.3))
+        await asyncio.sleep(0.01)
+        with pytest.raises(ServiceUnavailable) as saturated:
+            await executor.run(time.sleep, 0)
+        await first
+        with pytest.raises(ServiceUnavailable):
+            await executor.run(time.sleep, 0.3, timeout=0.05)
+        return saturated.value
+
+    try:
+        error = asyncio.run(run())
+    finally:
+        executor.shutdown()
+    assert error.status_code == 503 and error.headers["Retry-After"] == "1"
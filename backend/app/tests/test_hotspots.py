@@ -0,0 +1,121 @@
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.modules.analytics.hotspots import (
+    COCHANGE_MAX_FILES,
+    EPOCH,
+    aggregate_pr_files,
+    decay_to_now,
+    forward_decay,
+    path_prefixes,
+)
+
+
+def test_forward_decay_doubles_every_half_life_and_decays_back():
+    at = EPOCH + timedelta(days=90)
+    assert forward_decay(3.0, EPOCH, 30) == 3.0
+    assert forward_decay(3.0, at, 30) == pytest.approx(3.0 * 2 ** 3)
+
+    # Read back one half-life later, a change counts for half its weight
+    stored = forward_decay(10.0, at, 30) + forward_decay(10.0, at + timedelta(days=30), 30)
+    assert decay_to_now(stored, 30, now=at + timedelta(days=30)) == pytest.approx(5.0 + 10.0)
+
+
+def test_pr_files_fold_into_files_and_ancestor_directories():
+    assert path_prefixes("/src/api/app.py") == ["src", "src/api", "src/api/app.py"]
+    nodes = aggregate_pr_files([
+        {"filename": "src/api/app.py", "changes": 10},
+        {"filename": "src/api/db.py", "additions": 3, "deletions": 2, "changes": 0},
+        {"filename": "README.md", "changes": 1},
+        {"changes": 100},  # no filename
+    ])
+    assert nodes == {
+        "src": (15, True),
+        "src/api": (15, True),
+        "src/api/app.py": (10, False),
+        "src/api/db.py": (5, False),
+        "README.md": (1, False),
+    }
+
+
+@pytest.mark.skipif(not os.getenv("TEST_DATABASE_URL"), reason="TEST_DATABASE_URL not set")
+def test_malformed_repo_id_is_rejected_before_any_query():
+    import uuid
+    from types import SimpleNamespace
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.modules.users.routes import get_current_active_user
+
+    app.dependency_overrides[get_current_active_user] = lambda: SimpleNamespace(workspace_id=uuid.uuid4())
+    try:
+        with TestClient(app) as client:
+            assert client.get("/api/v1/analytics/hotspots", params={"repo_id": "nope"}).status_code == 422
+            assert client.get("/api/v1/analytics/hotspots/cochanges", params={"repo_id": "nope", "path": "a"}).status_code == 422
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_hotspots_rank_by_decayed_churn_and_pair_co_changed_files():
+    import uuid
+    from sqlalchemy import delete
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from app.modules.analytics.hotspots import co_changed_files, ingest_pr_files, top_hotspots
+    from app.modules.analytics.models import HotspotCoChange, HotspotNode
+    from app.modules.integrations.models import Repo
+    from app.modules.users.models import Workspace
+
+    now = datetime.now(timezone.utc)
+
+    async def run():
+        engine = create_async_engine(os.environ["TEST_DATABASE_URL"])
+        workspace = Workspace(id=uuid.uuid4(), name="hotspots", slug=f"hotspots-{uuid.uuid4().hex[:8]}")
+        repo = Repo(id=uuid.uuid4(), external_id="org/app", name="app", url="https://example.com", workspace_id=workspace.id)
+        try:
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                session.add(workspace)
+                await session.flush()
+                session.add(repo)
+                await session.flush()
+
+                ingest = lambda days_ago, files: ingest_pr_files(
+                    session, workspace.id, repo.id, now - timedelta(days=days_ago), files
+                )
+                # Same churn for old.py and new.py, but new.py changed recently
+                await ingest(25, [{"filename": "src/old.py", "changes": 40}, {"filename": "src/core.py", "changes": 10}])
+                await ingest(1, [{"filename": "lib/new.py", "changes": 40}, {"filename": "src/core.py", "changes": 10}])
+                await ingest(2, [{"filename": "src/core.py", "changes": 10}])
+                # Too many files: nodes only, no co-change pairs
+                await ingest(1, [{"filename": f"gen/f{i}.py", "changes": 1} for i in range(COCHANGE_MAX_FILES + 1)])
+                await session.commit()
+
+                files = await top_hotspots(session, workspace.id, limit=3)
+                directories = await top_hotspots(session, workspace.id, directories=True, window_days=90)
+                pairs = await co_changed_files(session, workspace.id, repo.id, "src/core.py")
+                generated = await co_changed_files(session, workspace.id, repo.id, "gen/f0.py")
+                return files, directories, pairs, generated
+        finally:
+            async with AsyncSession(engine) as session:
+                await session.execute(delete(HotspotCoChange).where(HotspotCoChange.repo_id == repo.id))
+                await session.execute(delete(HotspotNode).where(HotspotNode.repo_id == repo.id))
+                await session.execute(delete(Repo).where(Repo.id == repo.id))
+                await session.execute(delete(Workspace).where(Workspace.id == workspace.id))
+                await session.commit()
+            await engine.dispose()
+
+    files, directories, pairs, generated = asyncio.run(run())
+
+    # core.py: three small recent changes outweigh old.py's single older one
+    assert [f["path"] for f in files] == ["lib/new.py", "src/core.py", "src/old.py"]
+    assert files[0]["score"] == pytest.approx(40 * 2 ** (-1 / 30), rel=1e-3)
+    assert files[1]["score"] == pytest.approx(10 * sum(2 ** (-d / 30) for d in (25, 1, 2)), rel=1e-3)
+    assert files[1]["changes"] == 3 and files[1]["churn"] == 30
+    assert files[2]["score"] == pytest.approx(40 * 2 ** (-25 / 30), rel=1e-3)
+    assert [d["path"] for d in directories] == ["src", "lib", "gen"]
+
+    # Both partners co-changed once; the more recent pair scores higher
+    assert [(p["path"], p["count"]) for p in pairs] == [("lib/new.py", 1), ("src/old.py", 1)]
+    assert pairs[0]["score"] > pairs[1]["score"]
+    assert generated == []
@@ -0,0 +1,110 @@
+import asyncio
+import os
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from app.core.etag import etag_matches, strong_etag
+from app.modules.analytics.cube import build_dimension_cells
+from app.modules.analytics.rollups import METRIC_COLUMNS
+from app.modules.analytics.timeseries import parse_fields
+from app.modules.analytics.sketch import QuantileSketch
+
+
+def test_sketch_quantiles_within_relative_accuracy():
+    values = np.random.default_rng(7).lognormal(mean=3, sigma=1, size=5000)
+    sketch = QuantileSketch(relative_accuracy=0.02).add(values)
+    for q in (0.5, 0.85, 0.95):
+        assert abs(sketch.quantile(q) - np.quantile(values, q)) / np.quantile(values, q) < 0.03
+
+
+def test_sketch_roundtrip_and_merge():
+    a = QuantileSketch().add([0, 1, 2, 3])
+    b = QuantileSketch.from_bytes(QuantileSketch().add([10, 20]).to_bytes())
+    merged = QuantileSketch.from_bytes(a.to_bytes()).merge(b)
+    assert merged.count == 6
+    assert merged.zero_count == 1
+    assert merged.quantile(1.0) > 19
+
+
+def test_dimension_cells_split_by_repo_author_and_label():
+    today = date.today()
+    merged = f"{today.isoformat()}T12:00:00Z"
+    created = f"{(today - timedelta(days=1)).isoformat()}T12:00:00Z"
+    prs = [
+        ({"created_at": created, "merged_at": merged, "user": "alice", "base_ref": "main",
+          "additions": 10, "deletions": 5}, "org/api"),
+        ({"created_at": created, "merged_at": None, "user": "bob", "base_ref": "main"}, "org/api"),
+    ]
+    cards = [({"created": created, "resolutiondate": merged, "cardtype": "Bug", "labels": ["bug", "ui"]}, "Done")]
+
+    cells = build_dimension_cells(prs, cards, today - timedelta(days=7))
+
+    repo_merged = cells[(today, "repo", "org/api")]
+    assert repo_merged.prs_merged == 1
+    assert repo_merged.lead_time_sum_h == 24
+    assert cells[(today - timedelta(days=1), "repo", "org/api")].prs_opened == 2
+    assert cells[(today - timedelta(days=1), "base_branch", "main")].prs_opened == 2
+    assert (today, "author", "bob") not in cells
+    assert cells[(today, "label", "ui")].bugs_resolved == 1
+    assert cells[(today, "trello_list", "Done")].cards_resolved == 1
+
+
+def test_parse_fields_dedupes_and_rejects_unknown():
+    assert parse_fields(None) == METRIC_COLUMNS
+    assert parse_fields("wip, throughput,wip") == ("wip", "throughput")
+    with pytest.raises(ValueError):
+        parse_fields("wip,id")
+
+
+def test_etag_depends_on_watermark_and_matches_if_none_match():
+    etag = strong_etag("ws", "2026-10-19T10:00:00+00:00", "week")
+    assert etag != strong_etag("ws", "2026-10-19T10:05:00+00:00", "week")
+    assert etag_matches(f'W/"other", {etag}', etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
+
+
+@pytest.mark.skipif(not os.getenv("TEST_DATABASE_URL"), reason="TEST_DATABASE_URL not set")
+def test_dimension_rollup_rewrite_moves_the_drill_down_watermark():
+    import uuid
+    from sqlalchemy import delete
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from app.modules.analytics.models import MetricDimensionDaily
+    from app.modules.analytics.timeseries import dimension_watermark, metric_watermark
+    from app.modules.integrations.models import Integration  # noqa: F401 (Workspace relationship)
+    from app.modules.users.models import Workspace
+
+    def rollup_row(workspace_id, prs_merged):
+        return MetricDimensionDaily(
+            workspace_id=workspace_id, day=date.today(), dimension="repo", dimension_value="org/api", prs_merged=prs_merged
+        )
+
+    async def run():
+        engine = create_async_engine(os.environ["TEST_DATABASE_URL"])
+        workspace = Workspace(id=uuid.uuid4(), name="drill", slug=f"drill-{uuid.uuid4().hex[:8]}")
+        try:
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                session.add(workspace)
+                await session.flush()
+                session.add(rollup_row(workspace.id, 1))
+                await session.commit()
+                before = await dimension_watermark(session, workspace.id)
+
+                # What refresh_dimension_rollups does: the window is deleted and rewritten
+                await session.execute(delete(MetricDimensionDaily).where(MetricDimensionDaily.workspace_id == workspace.id))
+                session.add(rollup_row(workspace.id, 2))
+                await session.commit()
+                return before, await dimension_watermark(session, workspace.id), await metric_watermark(session, workspace.id, "day")
+        finally:
+            async with AsyncSession(engine) as session:
+                await session.execute(delete(MetricDimensionDaily).where(MetricDimensionDaily.workspace_id == workspace.id))
+                await session.execute(delete(Workspace).where(Workspace.id == workspace.id))
+                await session.commit()
+            await engine.dispose()
+
+    before, after, daily = asyncio.run(run())
+    # metrics_daily did not change, the drill-down ETag still must
+    assert daily is None
+    assert before is not None and after > before
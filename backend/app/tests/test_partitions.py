@@ -0,0 +1,77 @@
+"""
+Monthly partitions (app/db/partitions.py). The maintenance tests work on
+partitions of 2001, far behind any real data; set TEST_DATABASE_URL to run
+them.
+"""
+import asyncio
+import os
+import uuid
+from datetime import date, datetime, timezone
+
+import pytest
+
+from app.core.config import settings
+from app.db.partitions import PARTITIONED_TABLES, add_months, month_start, partition_name
+
+
+def test_monthly_partition_names_and_bounds():
+    assert month_start(date(2026, 10, 19)) == date(2026, 10, 1)
+    assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+    assert partition_name("alerts", date(2027, 2, 1)) == "alerts_p202702"
+
+
+@pytest.mark.skipif(not os.getenv("TEST_DATABASE_URL"), reason="TEST_DATABASE_URL not set")
+def test_detach_expired_keeps_partitions_with_open_alerts(monkeypatch):
+    from sqlalchemy import delete, text
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from app.db.partitions import detach_expired, ensure_partitions, list_partitions
+    from app.modules.alerts.models import Alert
+    from app.modules.integrations.models import Integration  # noqa: F401 (Workspace relationship)
+    from app.modules.users.models import Workspace
+
+    for _, retention_setting, _ in PARTITIONED_TABLES.values():
+        monkeypatch.setattr(settings, retention_setting, 30)
+    monkeypatch.setattr(settings, "PARTITION_ARCHIVE", False)
+    january, february = date(2001, 1, 1), date(2001, 2, 1)
+
+    async def run():
+        engine = create_async_engine(os.environ["TEST_DATABASE_URL"])
+        workspace_id = uuid.uuid4()
+        try:
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                created = await ensure_partitions(session, now=datetime(2001, 1, 15, tzinfo=timezone.utc), months_ahead=1)
+                assert partition_name("alerts", january) in created
+                session.add(Workspace(id=workspace_id, name="partitions", slug=f"partitions-{workspace_id.hex[:8]}"))
+                await session.commit()
+                session.add(Alert(
+                    workspace_id=workspace_id, status="ACK", severity="HIGH", title="open",
+                    created_at=datetime(2001, 1, 10, tzinfo=timezone.utc),
+                ))
+                await session.commit()
+
+                # Cutoff 2001-03-02: both months of 2001 are past retention
+                detached = await detach_expired(session, now=datetime(2001, 4, 1, tzinfo=timezone.utc))
+                assert detached["alerts"] == [partition_name("alerts", february)]
+                assert detached["risk_signals"] == [partition_name("risk_signals", m) for m in (january, february)]
+                alert_months = [month for _, month in await list_partitions(session, "alerts")]
+                assert january in alert_months and february not in alert_months
+
+                # Once resolved, the partition goes too
+                await session.execute(text(
+                    f"UPDATE alerts SET status = 'RESOLVED' WHERE workspace_id = '{workspace_id}'"
+                ))
+                await session.commit()
+                detached = await detach_expired(session, now=datetime(2001, 4, 1, tzinfo=timezone.utc))
+                assert detached["alerts"] == [partition_name("alerts", january)]
+        finally:
+            async with AsyncSession(engine) as session:
+                await session.execute(delete(Alert).where(Alert.workspace_id == workspace_id))
+                await session.execute(delete(Workspace).where(Workspace.id == workspace_id))
+                for table in PARTITIONED_TABLES:
+                    for month in (january, february):
+                        await session.execute(text(f"DROP TABLE IF EXISTS {partition_name(table, month)}"))
+                await session.commit()
+            await engine.dispose()
+
+    asyncio.run(run())
@@ -0,0 +1,470 @@
+import asyncio
+import os
+import time
+
+import pytest
+from redis import Redis
+
+from app.core.errors import ServiceUnavailable
+
+
+def test_disabled_llm_keeps_template_content():
+    from types import SimpleNamespace
+    from app.modules.reports.generator import build_content
+    from app.modules.reports.llm import LLMClient
+
+    async def run():
+        async with LLMClient(enabled=False) as llm:
+            return llm.model, (await llm.complete("system", "prompt")).text
+
+    assert asyncio.run(run()) == ("mock-gpt-4", None)
+
+    metrics = [SimpleNamespace(lead_time_p85=30.25, throughput=4.0)]
+    risks = [SimpleNamespace(type="WIP_HIGH", explanation="Too much in progress")]
+    content = build_content("2026-10-19", metrics, risks)
+    assert content.startswith("# Engineering Report (2026-10-19)")
+    assert "- Lead Time P85: 30.2h" in content
+    assert "- **WIP_HIGH**: Too much in progress" in content
+
+
+def test_enqueue_fails_fast_without_queue(monkeypatch):
+    from app.modules.reports import jobs
+
+    monkeypatch.setattr(jobs, "_redis", Redis.from_url("redis://127.0.0.1:1", socket_connect_timeout=1))
+    started = time.perf_counter()
+    with pytest.raises(ServiceUnavailable):
+        jobs.enqueue_report("workspace", "2026-10-19")
+    assert time.perf_counter() - started < 1.5
+
+
+def test_report_routes_enqueue_off_the_event_loop(monkeypatch):
+    import threading
+    import uuid
+    from types import SimpleNamespace
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.modules.reports import routes
+    from app.modules.users.routes import get_current_active_user
+
+    threads = []
+
+    def enqueue_report(workspace_id, period):
+        threads.append(threading.current_thread())
+        return SimpleNamespace(get_id=lambda: "job-1")
+
+    def report_job_status(job_id, workspace_id):
+        threads.append(threading.current_thread())
+        return {"job_id": job_id, "status": "queued", "report_id": None, "error": None}
+
+    monkeypatch.setattr(routes, "enqueue_report", enqueue_report)
+    monkeypatch.setattr(routes, "report_job_status", report_job_status)
+    app.dependency_overrides[get_current_active_user] = lambda: SimpleNamespace(workspace_id=uuid.uuid4())
+    try:
+        with TestClient(app) as client:
+            loop_thread = client.portal.call(threading.current_thread)
+            assert client.post("/api/v1/reports/generate", params={"period": "2026-10-19"}).json()["job_id"] == "job-1"
+            assert client.get("/api/v1/reports/jobs/job-1").json()["status"] == "queued"
+            # The batch over every workspace is the scheduler's alone
+            assert client.post("/api/v1/reports/generate/all").status_code in (404, 405)
+    finally:
+        app.dependency_overrides.clear()
+    assert len(threads) == 2 and loop_thread not in threads
+
+
+def test_llm_cache_serves_repeated_prompts(tmp_path, monkeypatch):
+    from app.core.config import settings
+    from app.modules.reports.llm import LLMClient
+    from app.modules.reports.llm_cache import LLMResponseCache
+
+    monkeypatch.setattr(settings, "LLM_STUB_LATENCY_SECONDS", 0.2)
+    sources = {"metrics_count": 7, "metrics_sample": [30.25, 12.0]}
+
+    async def run():
+        async with LLMClient(enabled=True, backend="stub", cache=LLMResponseCache(str(tmp_path), 1 << 20)) as llm:
+            first = await llm.complete("Summarize.", "# Report", inputs=sources)
+            # Same data, different key order and float noise
+            again = await llm.complete("Summarize.", "# Report", inputs={"metrics_sample": [30.2500000001, 12.0], "metrics_count": 7})
+            other = await llm.complete("Summarize.", "# Report", inputs={**sources, "metrics_count": 8})
+            return llm.calls, first, again, other
+
+    calls, first, again, other = asyncio.run(run())
+    assert not first.cache_hit and again.cache_hit and not other.cache_hit
+    assert again.text == first.text and again.cache_key == first.cache_key
+    # The hit never reached the (slow) stub backend
+    assert calls == 2
+
+
+def test_llm_cache_evicts_least_recently_used(tmp_path):
+    from app.modules.reports.llm_cache import LLMResponseCache
+
+    cache = LLMResponseCache(str(tmp_path), max_bytes=2500)
+    cache.put("aa1", "x" * 1000)
+    cache.put("aa2", "x" * 1000)
+    # Older mtime for aa2 (hits refresh it): aa1 is now the most recently used
+    os.utime(cache._path("aa2"), (0, 0))
+    cache.put("bb3", "x" * 1000)
+
+    assert cache.get("aa2") is None
+    assert cache.get("aa1") is not None and cache.get("bb3") is not None
+    assert cache.size() <= 2500
+
+
+@pytest.mark.skipif(not os.getenv("TEST_DATABASE_URL"), reason="TEST_DATABASE_URL not set")
+def test_provenance_snapshots_are_deduplicated_and_diffable():
+    import uuid
+    from datetime import date
+    from sqlalchemy import func, select
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from app.modules.analytics.models import MetricDaily
+    from app.modules.reports.models import ProvenanceBlob
+    from app.modules.reports.provenance import diff_snapshots, load_snapshot, save_snapshot
+
+    workspace_id = uuid.uuid4()
+
+    def metric(day, throughput):
+        return MetricDaily(id=uuid.UUID(int=day), day=date(2026, 10, day), throughput=throughput, workspace_id=workspace_id)
+
+    async def run():
+        engine = create_async_engine(os.environ["TEST_DATABASE_URL"])
+        try:
+            async with AsyncSession(engine) as session:
+                blobs = select(func.count()).select_from(ProvenanceBlob)
+                before = await save_snapshot(session, {"metrics": [metric(1, 3.0), metric(2, 4.0)], "risks": []})
+                count = await session.scalar(blobs)
+                same = await save_snapshot(session, {"metrics": [metric(1, 3.0), metric(2, 4.0)], "risks": []})
+                assert same == before and await session.scalar(blobs) == count
+
+                after = await save_snapshot(session, {"metrics": [metric(2, 5.0), metric(3, 1.0)], "risks": []})
+                snapshot = await load_snapshot(session, after)
+                diff = await diff_snapshots(session, before, after)
+                await session.rollback()
+                return snapshot, diff
+        finally:
+            await engine.dispose()
+
+    snapshot, diff = asyncio.run(run())
+    assert [row["throughput"] for row in snapshot["metrics"]] == [5.0, 1.0]
+    assert snapshot["metrics"][0]["workspace_id"] == str(workspace_id)
+    metrics = diff["metrics"]
+    assert [r["day"] for r in metrics["added"]] == ["2026-10-03"]
+    assert [r["day"] for r in metrics["removed"]] == ["2026-10-01"]
+    assert [(c["before"]["throughput"], c["after"]["throughput"]) for c in metrics["changed"]] == [(4.0, 5.0)]
+    assert metrics["unchanged"] == 0 and diff["risks"]["unchanged"] == 0
+
+
+def test_pagination_cursor_round_trip():
+    import uuid
+    from datetime import datetime, timezone
+    from fastapi import HTTPException
+    from app.core.pagination import decode_cursor, encode_cursor, split_page
+    from types import SimpleNamespace
+
+    created_at, row_id = datetime(2026, 10, 19, 15, 0, tzinfo=timezone.utc), uuid.uuid4()
+    assert decode_cursor(encode_cursor(created_at, row_id)) == (created_at, row_id)
+    with pytest.raises(HTTPException):
+        decode_cursor("not-a-cursor")
+
+    rows = [SimpleNamespace(id=uuid.UUID(int=i), created_at=created_at) for i in range(3)]
+    page, next_cursor = split_page(rows, 2, "created_at")
+    assert page == rows[:2] and decode_cursor(next_cursor) == (created_at, rows[1].id)
+    assert split_page(rows, 3, "created_at") == (rows, None)
+
+
+class _RecordingTransport:
+    """Stand-in transport: fixed latency, fails the first `failures` sends of each key."""
+
+    def __init__(self, latency=0.0, failures=0):
+        self.latency, self.failures = latency, failures
+        self.sent, self.attempts, self.in_flight, self.max_in_flight = [], {}, 0, 0
+        self.notifications = []
+
+    async def send(self, notification):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            attempt = self.attempts[notification.key] = self.attempts.get(notification.key, 0) + 1
+            if attempt <= self.failures:
+                raise ConnectionError("transient")
+            self.sent.append(notification.key)
+            self.notifications.append(notification)
+        finally:
+            self.in_flight -= 1
+
+    async def aclose(self):
+        pass
+
+
+def test_dispatcher_retries_then_gives_up():
+    from app.modules.reports.notifications import Notification, NotificationDispatcher
+
+    flaky, broken = _RecordingTransport(failures=1), _RecordingTransport(failures=5)
+
+    async def run():
+        async with NotificationDispatcher(
+            {"email": flaky, "slack": broken}, concurrency=4, max_attempts=3, retry_base_seconds=0.001
+        ) as dispatcher:
+            return await dispatcher.dispatch([
+                Notification("email", "s", "b", ["a@x.io"], key="r1"),
+                Notification("slack", "s", "b", key="r2"),
+            ])
+
+    assert asyncio.run(run()) == [True, False]
+    assert flaky.attempts == {"r1": 2} and broken.attempts == {"r2": 3}
+
+
+def test_dispatcher_fans_out_a_thousand_workspaces_with_bounded_concurrency():
+    from app.modules.reports.notifications import Notification, NotificationDispatcher
+
+    email, slack = _RecordingTransport(latency=0.02), _RecordingTransport(latency=0.02)
+    notifications = [
+        Notification(channel, "s", "b", ["a@x.io"], key=f"r{i}") for i in range(1000) for channel in ("email", "slack")
+    ]
+
+    async def run():
+        async with NotificationDispatcher({"email": email, "slack": slack}, concurrency=32) as dispatcher:
+            return await dispatcher.dispatch(notifications)
+
+    started = time.perf_counter()
+    assert all(asyncio.run(run()))
+    elapsed = time.perf_counter() - started
+    # 2,000 sends of 20 ms, 32 at a time: ~1.3 s (40 s sequentially)
+    assert elapsed < 5
+    assert email.max_in_flight + slack.max_in_flight <= 32 + 1
+    assert len(email.sent) == len(slack.sent) == 1000
+
+
+def test_live_slack_posts_to_the_notification_webhook(monkeypatch):
+    import httpx
+    from app.core.config import settings
+    from app.modules.reports.notifications import Notification, SlackWebhookTransport, default_transports
+
+    monkeypatch.setattr(settings, "NOTIFY_TRANSPORT", "live")
+    assert set(default_transports()) == {"email", "slack"}
+
+    posted = []
+
+    def handler(request):
+        posted.append(str(request.url))
+        return httpx.Response(200)
+
+    async def run():
+        transport = SlackWebhookTransport()
+        await transport.aclose()
+        transport._http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            await transport.send(Notification("slack", "s", "b", key="r1", webhook_url="https://hooks.example/ws-a"))
+            with pytest.raises(ValueError):
+                await transport.send(Notification("slack", "s", "b", key="r2"))
+        finally:
+            await transport.aclose()
+
+    asyncio.run(run())
+    assert posted == ["https://hooks.example/ws-a"]
+
+
+def test_local_slack_appends_whole_lines_under_concurrency(tmp_path):
+    import json
+    from app.modules.reports.notifications import LocalSlackTransport, Notification
+
+    transport = LocalSlackTransport(tmp_path)
+
+    async def run():
+        await asyncio.gather(*(
+            transport.send(Notification("slack", f"s{i}", "b" * 4096, key=f"r{i}")) for i in range(200)
+        ))
+
+    asyncio.run(run())
+    lines = transport.path.read_text(encoding="utf-8").splitlines()
+    assert sorted(json.loads(line)["key"] for line in lines) == sorted(f"r{i}" for i in range(200))
+
+
+def test_workflow_transitions_and_schedule(monkeypatch):
+    from datetime import date, datetime, timezone
+    from app.core.config import settings
+    from app.modules.reports.workflow import TRANSITIONS, period_start, sources_of
+    from worker.scheduler import due_period
+
+    assert sources_of("APPROVED") == ["DRAFT", "SENDING"]
+    assert sources_of("SENT") == ["SENDING"] and TRANSITIONS["SENT"] == ()
+
+    monkeypatch.setattr(settings, "REPORT_SCHEDULE_WEEKDAY", 0)
+    monkeypatch.setattr(settings, "REPORT_SCHEDULE_HOUR", 7)
+    assert period_start(date(2026, 10, 22)) == date(2026, 10, 19)  # Thursday -> Monday
+    assert due_period(datetime(2026, 10, 19, 6, tzinfo=timezone.utc)) is None
+    assert due_period(datetime(2026, 10, 19, 7, tzinfo=timezone.utc)) == date(2026, 10, 19)
+    assert due_period(datetime(2026, 10, 25, 23, tzinfo=timezone.utc)) == date(2026, 10, 19)
+
+
+@pytest.mark.skipif(not os.getenv("TEST_DATABASE_URL"), reason="TEST_DATABASE_URL not set")
+def test_report_transitions_are_optimistic():
+    import uuid
+    from sqlalchemy import delete
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from app.core.errors import Conflict
+    from app.modules.reports.models import Report
+    from app.modules.reports.notifications import NotificationDispatcher
+    from app.modules.reports.workflow import send_report, transition
+    from app.modules.integrations.models import Integration  # noqa: F401 (Workspace relationship)
+    from app.modules.users.models import AppUser, Workspace
+
+    async def run():
+        engine = create_async_engine(os.environ["TEST_DATABASE_URL"])
+        workspace = Workspace(id=uuid.uuid4(), name="workflow", slug=f"workflow-{uuid.uuid4().hex[:8]}")
+        report_id = uuid.uuid4()
+        outcome = {}
+        try:
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                session.add(workspace)
+                await session.flush()
+                session.add(AppUser(email=f"{workspace.slug}@x.io", hashed_password="x", workspace_id=workspace.id))
+                session.add(Report(id=report_id, workspace_id=workspace.id, content="# Report", period="2026-10-19"))
+                await session.commit()
+
+                with pytest.raises(Conflict):  # not approved yet
+                    await transition(session, report_id, workspace.id, "SENDING")
+                approved = await transition(session, report_id, workspace.id, "APPROVED", expected_version=1)
+                outcome["approved"] = (approved.status, approved.version)
+                with pytest.raises(Conflict):  # stale version
+                    await transition(session, report_id, workspace.id, "APPROVED", expected_version=1)
+
+                email, slack = _RecordingTransport(failures=5), _RecordingTransport()
+                async with NotificationDispatcher({"email": email, "slack": slack}, max_attempts=2, retry_base_seconds=0.001) as d:
+                    failed = await send_report(session, report_id, workspace.id, dispatcher=d)
+                    outcome["failed"] = (failed.status, failed.version)
+                    email.failures = 0
+                    sent = await send_report(session, report_id, workspace.id, expected_version=failed.version, dispatcher=d)
+                    outcome["sent"] = (sent.status, sent.version)
+        finally:
+            async with AsyncSession(engine) as session:
+                await session.execute(delete(Report).where(Report.workspace_id == workspace.id))
+                await session.execute(delete(AppUser).where(AppUser.workspace_id == workspace.id))
+                await session.execute(delete(Workspace).where(Workspace.id == workspace.id))
+                await session.commit()
+            await engine.dispose()
+        return outcome
+
+    outcome = asyncio.run(run())
+    assert outcome["approved"] == ("APPROVED", 2)
+    # SENDING then back to APPROVED, then SENDING and SENT
+    assert outcome["failed"] == ("APPROVED", 4)
+    assert outcome["sent"] == ("SENT", 6)
+
+
+def _with_report_workspaces(scenario):
+    """Run `scenario(session, [workspace, workspace])`: the first has a Slack webhook, the second none."""
+    import uuid
+    from sqlalchemy import delete
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from app.modules.reports.models import Report
+    from app.modules.integrations.models import Integration  # noqa: F401 (Workspace relationship)
+    from app.modules.users.models import AppUser, Workspace
+
+    async def run():
+        engine = create_async_engine(os.environ["TEST_DATABASE_URL"])
+        workspaces = [
+            Workspace(id=uuid.uuid4(), name="delivery", slug=f"delivery-{uuid.uuid4().hex[:8]}", slack_webhook_url=url)
+            for url in ("https://hooks.example/delivery", None)
+        ]
+        workspace_ids = [w.id for w in workspaces]
+        try:
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                session.add_all(workspaces)
+                await session.flush()
+                session.add_all(AppUser(email=f"{w.slug}@x.io", hashed_password="x", workspace_id=w.id) for w in workspaces)
+                await session.commit()
+                return await scenario(session, workspaces)
+        finally:
+            async with AsyncSession(engine) as session:
+                await session.execute(delete(Report).where(Report.workspace_id.in_(workspace_ids)))
+                await session.execute(delete(AppUser).where(AppUser.workspace_id.in_(workspace_ids)))
+                await session.execute(delete(Workspace).where(Workspace.id.in_(workspace_ids)))
+                await session.commit()
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+@pytest.mark.skipif(not os.getenv("TEST_DATABASE_URL"), reason="TEST_DATABASE_URL not set")
+def test_delivery_uses_each_workspace_webhook_and_reclaims_stale_claims():
+    import uuid
+    from datetime import datetime, timedelta, timezone
+    from sqlalchemy import select
+    from app.modules.reports.models import Report
+    from app.modules.reports.notifications import NotificationDispatcher
+    from app.modules.reports.workflow import _claim, _deliver
+
+    # Oldest reports in the table, so that the claim picks them first
+    stale, fresh, approved = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    now = datetime.now(timezone.utc)
+
+    async def scenario(session, workspaces):
+        with_slack, without_slack = workspaces
+        session.add_all([
+            # A worker died while sending it: reclaimed
+            Report(id=stale, workspace_id=with_slack.id, content="stale", period="2026-10-19", status="SENDING",
+                   claimed_at=now - timedelta(hours=2), created_at=datetime(1970, 1, 2, tzinfo=timezone.utc)),
+            # Being sent right now: left alone
+            Report(id=fresh, workspace_id=with_slack.id, content="fresh", period="2026-10-19", status="SENDING",
+                   claimed_at=now, created_at=datetime(1970, 1, 1, tzinfo=timezone.utc)),
+            Report(id=approved, workspace_id=without_slack.id, content="approved", period="2026-10-19", status="APPROVED",
+                   created_at=datetime(1970, 1, 3, tzinfo=timezone.utc)),
+        ])
+        await session.commit()
+
+        claimed = await _claim(session, 2, [])
+        email, slack = _RecordingTransport(), _RecordingTransport()
+        async with NotificationDispatcher({"email": email, "slack": slack}) as dispatcher:
+            outcome = await _deliver(session, dispatcher, claimed)
+        statuses = dict((await session.execute(
+            select(Report.id, Report.status).where(Report.id.in_([stale, fresh, approved]))
+        )).all())
+        return claimed, outcome, email, slack, statuses
+
+    claimed, outcome, email, slack, statuses = _with_report_workspaces(scenario)
+    assert [r.id for r in claimed] == [stale, approved]
+    assert sorted(outcome["sent"]) == sorted([stale, approved]) and outcome["failed"] == []
+    assert statuses == {stale: "SENT", fresh: "SENDING", approved: "SENT"}
+    assert sorted(email.sent) == sorted([str(stale), str(approved)])
+    # Only the workspace with a webhook gets a Slack message, through its own webhook
+    assert [(n.key, n.webhook_url) for n in slack.notifications] == [(str(stale), "https://hooks.example/delivery")]
+
+
+@pytest.mark.skipif(not os.getenv("TEST_DATABASE_URL"), reason="TEST_DATABASE_URL not set")
+def test_failed_delivery_releases_the_claim(monkeypatch):
+    import uuid
+    from sqlalchemy import select
+    from app.core.config import settings
+    from app.modules.reports.models import Report
+    from app.modules.reports.notifications import NotificationDispatcher
+    from app.modules.reports.workflow import send_report
+
+    class BrokenDispatcher(NotificationDispatcher):
+        async def dispatch(self, notifications):
+            raise ConnectionError("transport down")
+
+    report_id = uuid.uuid4()
+
+    async def scenario(session, workspaces):
+        workspace_id = workspaces[0].id
+        session.add(Report(id=report_id, workspace_id=workspace_id, content="#", period="2026-10-19", status="APPROVED"))
+        await session.commit()
+        status = select(Report.status, Report.version).where(Report.id == report_id)
+
+        # The transports cannot even be built: nothing was claimed
+        monkeypatch.setattr(settings, "NOTIFY_TRANSPORT", "carrier-pigeon")
+        with pytest.raises(ValueError):
+            await send_report(session, report_id, workspace_id)
+        not_built = (await session.execute(status)).first()
+
+        # Delivery blows up after the claim: released
+        async with BrokenDispatcher({"email": _RecordingTransport(), "slack": _RecordingTransport()}) as dispatcher:
+            with pytest.raises(ConnectionError):
+                await send_report(session, report_id, workspace_id, dispatcher=dispatcher)
+        released = (await session.execute(status)).first()
+        return tuple(not_built), tuple(released)
+
+    not_built, released = _with_report_workspaces(scenario)
+    assert not_built == ("APPROVED", 1)
+    # APPROVED -> SENDING -> APPROVED
+    assert released == ("APPROVED", 3)
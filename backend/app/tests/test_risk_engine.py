@@ -0,0 +1,157 @@
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from app.modules.alerts.service import alert_fingerprint
+from app.modules.analytics.history import build_metric_matrix, ewma_zscores
+from app.modules.analytics.risk_engine import detect_risks, legacy_risks
+from app.modules.analytics.rollups import METRIC_COLUMNS
+from app.modules.analytics.rules import CompiledRule, RuleError, compile_rule, default_rules, evaluate_rules
+
+END = date(2026, 10, 19)
+
+BASE = {
+    "lead_time_p50": 20.0, "lead_time_p85": 40.0, "wip": 10.0, "throughput": 5.0,
+    "review_time_p50": 12.0, "bug_ratio": 0.1, "pr_size_p50": 200.0,
+}
+
+
+def _rows(workspace_id, history, today, seed=1):
+    """59 noisy days around `history`, then `today` on END."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for d in range(59, 0, -1):
+        noisy = {m: history[m] * (1 + rng.normal(0, 0.03)) for m in METRIC_COLUMNS}
+        rows.append({"workspace_id": workspace_id, "day": END - timedelta(days=d), **noisy})
+    rows.append({"workspace_id": workspace_id, "day": END, **today})
+    return rows
+
+
+def test_zscores_need_history():
+    values = np.array([[np.nan] * 10 + [5.0], [1.0] * 10 + [1.0]])
+    z = ewma_zscores(values)
+    assert np.isnan(z[0])
+    assert z[1] == 0
+
+
+def test_batch_flags_only_the_anomalous_workspace():
+    slow = dict(BASE, throughput=2.0, lead_time_p85=80.0)
+    rows = _rows("calm", BASE, BASE) + _rows("slow", BASE, slow)
+    rows.append({"workspace_id": "new", "day": END, **dict(BASE, bug_ratio=0.5)})
+
+    risks = detect_risks(build_metric_matrix(rows, END))
+
+    assert set(risks) == {"slow"}
+    assert [r["type"] for r in risks["slow"]] == ["DELAY"]
+    assert 0.5 < risks["slow"][0]["score"] <= 1
+
+
+def test_legacy_mode_keeps_day_over_day_rules():
+    rows = [
+        {"workspace_id": "ws", "day": END - timedelta(days=1), **BASE},
+        {"workspace_id": "ws", "day": END, **dict(BASE, throughput=4.0, lead_time_p50=25.0,
+                                                 lead_time_p85=50.0, wip=12.0, bug_ratio=0.3)},
+    ]
+
+    risks = legacy_risks(build_metric_matrix(rows, END))
+
+    assert [r["type"] for r in risks["ws"]] == ["DELAY", "OVERLOAD", "INSTABILITY"]
+    assert risks["ws"][2]["score"] == pytest.approx(0.8)
+    assert risks["ws"][2]["explanation"] == "High bug ratio detected: 30.0% of resolved issues are bugs."
+
+
+def test_workspace_rule_overrides_threshold():
+    rows = [
+        {"workspace_id": "a", "day": END, **dict(BASE, wip=15.0)},
+        {"workspace_id": "b", "day": END, **dict(BASE, wip=15.0)},
+    ]
+    strict = compile_rule("wip_cap", {
+        "type": "OVERLOAD",
+        "when": [{"metric": "wip", "op": ">", "threshold": 12}],
+        "score": "clip(value_wip / 20, 0, 1)",
+        "severity": "HIGH",
+        "explanation": "WIP at {value_wip:.0f}",
+    })
+
+    risks = evaluate_rules(build_metric_matrix(rows, END), {"a": [strict], "b": []})
+
+    assert risks == {"a": [{"rule": "wip_cap", "type": "OVERLOAD", "score": 0.75,
+                            "severity": "HIGH", "explanation": "WIP at 15"}]}
+
+
+def test_rule_failing_to_format_is_skipped_for_its_workspace_only():
+    from dataclasses import replace
+
+    rows = [
+        {"workspace_id": "a", "day": END, **dict(BASE, wip=15.0)},
+        {"workspace_id": "b", "day": END, **dict(BASE, wip=15.0)},
+    ]
+    good = compile_rule("wip_cap", {
+        "type": "OVERLOAD", "when": [{"metric": "wip", "op": ">", "threshold": 12}], "explanation": "WIP at {value_wip:.0f}",
+    })
+    # Stored before templates were checked at compile time
+    broken = replace(good, name="wip_broken", explanation="WIP at {value_wip:d}")
+
+    risks = evaluate_rules(build_metric_matrix(rows, END), {"a": [broken], "b": [good]})
+
+    assert risks["a"] == []
+    assert [r["explanation"] for r in risks["b"]] == ["WIP at 15"]
+
+
+@pytest.mark.parametrize("spec", [
+    {"type": "X", "when": [{"metric": "nope", "op": ">", "threshold": 1}]},
+    {"type": "X", "when": [{"metric": "wip", "op": "=>", "threshold": 1}]},
+    {"type": "X", "when": [{"metric": "wip", "op": ">", "threshold": 1}], "score": "__import__('os')"},
+    {"type": "X", "when": [{"metric": "wip", "op": ">", "threshold": 1}], "score": "value_wip.real"},
+    {"type": "X", "when": [{"metric": "wip", "op": ">", "threshold": 1}], "score": "9 ** 9 ** 9"},
+    {"type": "X", "when": [{"metric": "wip", "op": ">", "threshold": 1}], "explanation": "{secret}"},
+    {"type": "X", "when": [{"metric": "wip", "op": ">", "threshold": 1}], "explanation": "{value_wip:d}"},
+    {"type": "X", "when": [{"metric": "wip", "op": ">", "threshold": 1}], "explanation": "{value_wip[0]}"},
+])
+def test_invalid_specs_are_rejected(spec):
+    with pytest.raises(RuleError):
+        compile_rule("bad", spec)
+
+
+def test_fifty_rules_over_a_thousand_workspaces_is_fast(monkeypatch):
+    rng = np.random.default_rng(3)
+    n_ws, n_days = 1000, 60
+    rows = [
+        {"workspace_id": f"ws{w}", "day": END - timedelta(days=d),
+         **{m: BASE[m] * (1 + rng.normal(0, 0.1)) for m in METRIC_COLUMNS}}
+        for w in range(n_ws) for d in range(n_days)
+    ]
+    matrix = build_metric_matrix(rows, END)
+    rules = list(default_rules().values()) + [
+        compile_rule(f"wip_{i}", {"type": "OVERLOAD", "when": [
+            {"metric": "wip", "measure": "zscore", "op": ">=", "threshold": 1 + i / 10, "window": 14 + i % 40},
+            {"metric": "throughput", "op": "<", "threshold": 6},
+        ], "score": "min(z_wip / 4, 1)"})
+        for i in range(47)
+    ]
+
+    evaluated = []
+    evaluate = CompiledRule.evaluate
+
+    def counting_evaluate(rule, features, rows):
+        evaluated.append(len(rows))
+        return evaluate(rule, features, rows)
+
+    monkeypatch.setattr(CompiledRule, "evaluate", counting_evaluate)
+    started = time.perf_counter()
+    evaluate_rules(matrix, {ws: rules for ws in matrix.workspace_ids})
+    # Wall-clock is only a loose guard (~50 ms typically): each shared rule runs once over every workspace
+    assert time.perf_counter() - started < 5
+    assert evaluated == [n_ws] * len(rules)
+
+
+def test_alert_fingerprint_is_stable_within_a_bucket():
+    monday = datetime(2026, 10, 19, 9, tzinfo=timezone.utc)  # epoch-day buckets of 7 start on Thursdays
+    same_bucket = alert_fingerprint("ws", "DELAY", monday + timedelta(days=2))
+
+    assert alert_fingerprint("ws", "DELAY", monday) == same_bucket
+    assert alert_fingerprint("ws", "OVERLOAD", monday) != same_bucket
+    assert alert_fingerprint("other", "DELAY", monday) != same_bucket
+    assert alert_fingerprint("ws", "DELAY", monday + timedelta(days=7)) != same_bucket
@@ -0,0 +1,59 @@
+"""
+Enqueues the scheduled jobs:
+- the weekly report fan-out (generation for every workspace, then delivery
+  of approved reports), at REPORT_SCHEDULE_WEEKDAY / REPORT_SCHEDULE_HOUR
+  (UTC);
+- the daily partition maintenance (app/db/partitions.py), so the upcoming
+  monthly partitions exist and expired ones are retired even when no sync
+  runs.
+
+Several schedulers may run: a Redis key per period (SET NX) makes sure each
+period is enqueued once. A scheduler started late in the period still
+enqueues it.
+"""
+import time
+from datetime import datetime, timezone
+
+import redis
+from rq import Queue
+
+from app.core.config import settings
+from app.core.logging import logging, setup_logging
+from app.modules.ingestion.jobs import partition_maintenance_job
+from app.modules.reports.jobs import JOB_TIMEOUT_SECONDS, scheduled_reports_job
+from app.modules.reports.workflow import period_start
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+POLL_SECONDS = 60
+# Kept past the end of the period
+MARKER_TTL_SECONDS = 8 * 24 * 3600
+PARTITION_MARKER_TTL_SECONDS = 2 * 24 * 3600
+
+
+def due_period(now: datetime):
+    """Start date of the period due at `now`, or None before its scheduled hour."""
+    start = period_start(now.date())
+    if now.date() == start and now.hour < settings.REPORT_SCHEDULE_HOUR:
+        return None
+    return start
+
+
+def main():
+    conn = redis.from_url(settings.REDIS_URL)
+    queue = Queue(connection=conn)
+    while True:
+        now = datetime.now(timezone.utc)
+        period = due_period(now)
+        if period is not None and conn.set(f"scheduler:reports:{period.isoformat()}", 1, nx=True, ex=MARKER_TTL_SECONDS):
+            job = queue.enqueue(scheduled_reports_job, period.isoformat(), job_timeout=JOB_TIMEOUT_SECONDS * 6)
+            logger.info(f"Enqueued scheduled reports for period={period} (job {job.get_id()})")
+        if conn.set(f"scheduler:partitions:{now.date().isoformat()}", 1, nx=True, ex=PARTITION_MARKER_TTL_SECONDS):
+            job = queue.enqueue(partition_maintenance_job)
+            logger.info(f"Enqueued partition maintenance for {now.date()} (job {job.get_id()})")
+        time.sleep(POLL_SECONDS)
+
+
+if __name__ == '__main__':
+    main()
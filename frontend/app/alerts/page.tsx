@@ -7,15 +7,18 @@ import { formatDate } from '@/lib/utils'; // Assumed utils
 
 export default function AlertsPage() {
     const [alerts, setAlerts] = useState<any[]>([]);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
 
     useEffect(() => {
         fetchAlerts();
     }, []);
 
-    const fetchAlerts = async () => {
+    // First page, or the page after `cursor` (appended)
+    const fetchAlerts = async (cursor?: string) => {
         try {
-            const res = await api.get('/alerts');
-            setAlerts(res.data);
+            const res = await api.get('/alerts', { params: cursor ? { cursor } : {} });
+            setAlerts(cursor ? (prev) => [...prev, ...res.data] : res.data);
+            setNextCursor(res.headers['x-next-cursor'] || null);
         } catch (err) {
             console.error(err);
         }
@@ -47,6 +50,9 @@ export default function AlertsPage() {
                                             {alert.severity}
                                         </span>
                                         <p className="text-sm font-medium text-blue-600 truncate">{alert.title}</p>
+                                        {alert.occurrences > 1 && (
+                                            <span className="ml-2 text-xs text-gray-500">seen {alert.occurrences}×</span>
+                                        )}
                                     </div>
                                     <div className="mt-2 text-sm text-gray-500">
                                         <p>{alert.history}</p>
@@ -69,6 +75,15 @@ export default function AlertsPage() {
                         ))}
                     </ul>
                 </div>
+
+                {nextCursor && (
+                    <button
+                        onClick={() => fetchAlerts(nextCursor)}
+                        className="mt-6 w-full text-blue-600 py-2 rounded border border-blue-200 hover:bg-blue-50"
+                    >
+                        Load more
+                    </button>
+                )}
             </div>
         </div>
     );
@@ -28,17 +28,20 @@ ChartJS.register(
 export default function Dashboard() {
     const [metrics, setMetrics] = useState<any[]>([]);
     const [risks, setRisks] = useState<any[]>([]);
+    const [forecast, setForecast] = useState<any>(null);
     const [loading, setLoading] = useState(true);
 
     useEffect(() => {
         const fetchData = async () => {
             try {
-                const [mRes, rRes] = await Promise.all([
+                const [mRes, rRes, fRes] = await Promise.all([
                     api.get('/analytics/metrics'),
-                    api.get('/analytics/risks')
+                    api.get('/analytics/risks'),
+                    api.get('/forecast/standard')
                 ]);
                 setMetrics(mRes.data);
                 setRisks(rRes.data);
+                setForecast(fRes.data);
             } catch (err) {
                 console.error(err);
             } finally {
@@ -103,6 +106,25 @@ export default function Dashboard() {
                     </div>
                 </div>
 
+                {/* Standard forecasts (precomputed after each sync) */}
+                {forecast && (
+                    <div className="mt-6 bg-white p-6 rounded shadow">
+                        <h2 className="text-lg font-medium mb-4">Forecast ({forecast.backlog_size} open items)</h2>
+                        <div className="grid grid-cols-2 md:grid-cols-4 gap-4 text-sm">
+                            {forecast.horizons.map((h: any) => (
+                                <div key={h.weeks}>
+                                    <div className="text-gray-500">Done in {h.weeks} weeks ({h.target_date})</div>
+                                    <div className="text-xl font-bold">{(h.probability * 100).toFixed(0)}%</div>
+                                </div>
+                            ))}
+                            <div>
+                                <div className="text-gray-500">85% sure by</div>
+                                <div className="text-xl font-bold">{forecast.percentiles.p85 ?? 'beyond a year'}</div>
+                            </div>
+                        </div>
+                    </div>
+                )}
+
                 {/* Metrics Table */}
                 <div className="mt-6 bg-white p-6 rounded shadow overflow-x-auto">
                     <h2 className="text-lg font-medium mb-4">Daily Metrics</h2>
@@ -118,7 +140,7 @@ export default function Dashboard() {
                         </thead>
                         <tbody className="divide-y divide-gray-200">
                             {metrics.map((m: any) => (
-                                <tr key={m.id}>
+                                <tr key={m.day}>
                                     <td className="px-4 py-2">{m.day}</td>
                                     <td className="px-4 py-2">{m.lead_time_p85?.toFixed(1)}h</td>
                                     <td className="px-4 py-2">{m.wip}</td>
@@ -18,13 +18,8 @@ export default function ReportDetailPage() {
 
     const fetchReport = async () => {
         try {
-            // We didn't make a GET /reports/{id} endpoint in plan!
-            // But we have LIST. Let's filter client side for MVP or fix backend?
-            // Actually best to fix backend or just iterate list.
-            // Let's assume we can fetch list and find it for now to save backend task.
-            const res = await api.get('/reports');
-            const r = res.data.find((x: any) => x.id === id);
-            setReport(r);
+            const res = await api.get(`/reports/${id}`);
+            setReport(res.data);
         } catch (err) {
             console.error(err);
         }
@@ -33,9 +28,14 @@ export default function ReportDetailPage() {
     const handleAction = async (action: 'approve' | 'send') => {
         setLoading(true);
         try {
-            await api.post(`/reports/${id}/${action}`);
+            // The version we read: 409 if someone else changed the report meanwhile
+            await api.post(`/reports/${id}/${action}`, null, { params: { version: report.version } });
             fetchReport();
-        } catch (err) {
+        } catch (err: any) {
+            if (err.response?.status === 409) {
+                alert(err.response.data.detail);
+                fetchReport();
+            }
             console.error(err);
         } finally {
             setLoading(false);
@@ -8,15 +8,18 @@ import { Nav } from '@/components/Nav';
 export default function ReportsPage() {
     const [reports, setReports] = useState<any[]>([]);
     const [generating, setGenerating] = useState(false);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
 
     useEffect(() => {
         fetchReports();
     }, []);
 
-    const fetchReports = async () => {
+    // First page, or the page after `cursor` (appended)
+    const fetchReports = async (cursor?: string) => {
         try {
-            const res = await api.get('/reports');
-            setReports(res.data);
+            const res = await api.get('/reports', { params: cursor ? { cursor } : {} });
+            setReports(cursor ? (prev) => [...prev, ...res.data] : res.data);
+            setNextCursor(res.headers['x-next-cursor'] || null);
         } catch (err) {
             console.error(err);
         }
@@ -27,7 +30,14 @@ export default function ReportsPage() {
         try {
             // Just hardcoded period for demo
             const period = new Date().toISOString().split('T')[0];
-            await api.post(`/reports/generate?period=${period}`);
+            const res = await api.post(`/reports/generate?period=${period}`);
+            // Generation runs in the worker: poll the job until the report is saved
+            let job = res.data;
+            while (job.status === 'queued' || job.status === 'started' || job.status === 'deferred' || job.status === 'scheduled') {
+                await new Promise((resolve) => setTimeout(resolve, 1000));
+                job = (await api.get(`/reports/jobs/${job.job_id}`)).data;
+            }
+            if (job.status === 'failed') console.error(job.error);
             fetchReports();
         } catch (err) {
             console.error(err);
@@ -71,6 +81,15 @@ export default function ReportsPage() {
                         </Link>
                     ))}
                 </div>
+
+                {nextCursor && (
+                    <button
+                        onClick={() => fetchReports(nextCursor)}
+                        className="mt-6 w-full text-blue-600 py-2 rounded border border-blue-200 hover:bg-blue-50"
+                    >
+                        Load more
+                    </button>
+                )}
             </div>
         </div>
     );
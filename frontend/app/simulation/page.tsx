@@ -9,15 +9,21 @@ export default function SimulationPage() {
     const [backlogSize, setBacklogSize] = useState(10);
     const [result, setResult] = useState<any>(null);
     const [loading, setLoading] = useState(false);
+    const [completion, setCompletion] = useState<any>(null);
+    const [scopeGrowth, setScopeGrowth] = useState(false);
 
     const handleSimulate = async (e: React.FormEvent) => {
         e.preventDefault();
         setLoading(true);
         try {
             const res = await api.get('/forecast', {
-                params: { target_date: targetDate, backlog_size: backlogSize }
+                params: { target_date: targetDate, backlog_size: backlogSize, scope_growth: scopeGrowth }
             });
             setResult(res.data);
+            const completionRes = await api.get('/forecast/completion', {
+                params: { backlog_size: backlogSize }
+            });
+            setCompletion(completionRes.data);
         } catch (err) {
             console.error(err);
         } finally {
@@ -55,6 +61,15 @@ export default function SimulationPage() {
                                 required
                             />
                         </div>
+                        <label className="flex items-center text-sm text-gray-700">
+                            <input
+                                type="checkbox"
+                                checked={scopeGrowth}
+                                onChange={(e) => setScopeGrowth(e.target.checked)}
+                                className="mr-2"
+                            />
+                            Account for new items arriving (scope growth)
+                        </label>
                         <button
                             type="submit"
                             disabled={loading}
@@ -77,6 +92,39 @@ export default function SimulationPage() {
                         <p className="mt-4 text-gray-600">
                             There is a {(result.probability * 100).toFixed(1)}% chance of completing {result.backlog_size} items by {result.target_date} based on historical throughput.
                         </p>
+                        {result.scope_growth && (
+                            <p className="mt-2 text-sm text-gray-500">
+                                Expected scope by then: {result.expected_scope.toFixed(0)} items (85%: up to {result.scope_p85.toFixed(0)})
+                            </p>
+                        )}
+                        {result.confidence_interval && (
+                            <p className="mt-2 text-sm text-gray-500">
+                                95% CI: {(result.confidence_interval[0] * 100).toFixed(1)}% – {(result.confidence_interval[1] * 100).toFixed(1)}% ({result.simulations.toLocaleString()} simulations)
+                            </p>
+                        )}
+                    </div>
+                )}
+
+                {completion && (
+                    <div className="bg-white p-8 rounded shadow mt-8">
+                        <h3 className="text-lg font-medium text-gray-500 mb-4">When will it be done?</h3>
+                        <div className="grid grid-cols-4 gap-4 text-center">
+                            {Object.entries(completion.percentiles).map(([p, day]: [string, any]) => (
+                                <div key={p}>
+                                    <div className="text-sm text-gray-500">{p.toUpperCase()}</div>
+                                    <div className="text-lg font-semibold">{day ?? `> ${completion.horizon_days} days`}</div>
+                                </div>
+                            ))}
+                        </div>
+                        <div className="mt-6 space-y-1">
+                            {completion.histogram.map((bin: any) => (
+                                <div key={bin.start} className="flex items-center text-xs">
+                                    <span className="w-24 text-gray-500">{bin.start}</span>
+                                    <div className="bg-indigo-500 h-3" style={{ width: `${bin.probability * 100}%` }} />
+                                    <span className="ml-2 text-gray-500">{(bin.cumulative * 100).toFixed(0)}%</span>
+                                </div>
+                            ))}
+                        </div>
                     </div>
                 )}
             </div>
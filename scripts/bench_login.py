@@ -0,0 +1,91 @@
+"""
+Benchmark of a login storm against another endpoint: latency of a cheap
+endpoint while many logins verify bcrypt hashes, with the hashing done on
+the event loop (the original implementation) vs. in the password executor.
+
+The app is built here with the real hashing functions, and requests go
+through httpx's in-process ASGI transport: no database or server needed.
+
+Run from backend/: python ../scripts/bench_login.py
+"""
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.core.security import password_executor, pwd_context, verify_password
+
+LOGINS = 40
+PROBE_INTERVAL_SECONDS = 0.02
+PASSWORD = "correct horse battery staple"
+HASHED = pwd_context.hash(PASSWORD)
+
+app = FastAPI()
+
+
+@app.post("/login/blocking")
+async def login_blocking():
+    return {"ok": pwd_context.verify(PASSWORD, HASHED)}
+
+
+@app.post("/login")
+async def login():
+    return {"ok": await verify_password(PASSWORD, HASHED)}
+
+
+@app.get("/ping")
+async def ping():
+    return {"status": "ok"}
+
+
+async def probe(client: httpx.AsyncClient, stop: asyncio.Event) -> list:
+    """
+    /ping latencies (ms), one request every PROBE_INTERVAL_SECONDS until
+    `stop`, counted from when the request was due: a blocked event loop
+    delays the request itself, not only its handling.
+    """
+    latencies = []
+    while True:
+        due = time.perf_counter() + PROBE_INTERVAL_SECONDS
+        await asyncio.sleep(PROBE_INTERVAL_SECONDS)
+        await client.get("/ping")
+        latencies.append((time.perf_counter() - due) * 1000)
+        # The request in flight when the storm ends is still measured
+        if stop.is_set():
+            return latencies
+
+
+async def storm(client: httpx.AsyncClient, path: str):
+    stop = asyncio.Event()
+    prober = asyncio.create_task(probe(client, stop))
+    start = time.perf_counter()
+    if path:
+        await asyncio.gather(*(client.post(path) for _ in range(LOGINS)))
+    else:
+        await asyncio.sleep(1)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    return elapsed, await prober
+
+
+async def main():
+    print(f"bcrypt rounds={pwd_context.to_dict()['bcrypt__rounds']}, {LOGINS} concurrent logins, "
+          f"executor workers={password_executor.max_workers}")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for label, path in (("idle", None), ("on the event loop", "/login/blocking"), ("in the executor", "/login")):
+            elapsed, latencies = await storm(client, path)
+            latencies.sort()
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+            logins = f"{LOGINS / elapsed:5.1f} logins/s" if path else " " * 15
+            print(
+                f"{label:>18}: {logins} | /ping n={len(latencies):3d} "
+                f"p50 {statistics.median(latencies):7.1f} ms  p99 {p99:7.1f} ms  max {latencies[-1]:7.1f} ms"
+            )
+    password_executor.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())